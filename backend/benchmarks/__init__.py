@@ -0,0 +1,4 @@
+"""Performance benchmarks for the Kos Taxi backend.
+
+Run from the ``backend`` directory, e.g. ``python -m benchmarks.http_load --help``.
+"""
@@ -0,0 +1,166 @@
+"""Synthetic data generation for benchmark databases."""
+from __future__ import annotations
+
+import os
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Type
+
+from src.config import Config
+from src.models import Payment, db
+from src.models.driver import Driver
+from src.models.ride import PricingConfig, Ride
+from src.services import estimate_distance_km, estimate_duration_minutes
+from src.services.password_hashing import hash_password
+
+KOS_PLACES = [
+    "Kos Town Square",
+    "Kos International Airport",
+    "Kos Port Ferry Terminal",
+    "Kardamena Beach",
+    "Tigaki Beach",
+    "Marmari Village",
+    "Mastichari Harbour",
+    "Kefalos Bay",
+    "Asklepieion",
+    "Zia Village",
+    "Psalidi Hotels Strip",
+    "Lambi Beach",
+    "Antimachia Castle",
+    "Pyli Old Village",
+    "Agios Stefanos Beach",
+]
+
+BENCHMARK_PASSWORD = "benchmark-password"
+
+_HISTORICAL_STATUSES = ["completed"] * 7 + ["cancelled"] * 2 + ["pending"]
+
+
+def make_benchmark_config(database_path: Path) -> Type[Config]:
+    """Return a config class pointing at ``database_path`` with external side effects disabled."""
+
+    class BenchmarkConfig(Config):
+        TESTING = False
+        DEBUG = False
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{database_path}"
+        STRIPE_SECRET_KEY = None
+        STRIPE_PUBLISHABLE_KEY = None
+        SENTRY_DSN = None
+        SCHEMA_AUTO_CREATE = True
+        LOG_LEVEL = "WARNING"
+        NOTIFICATIONS_EMAIL_PROVIDER = "disabled"
+        NOTIFICATIONS_SMS_PROVIDER = "disabled"
+        PASSWORD_HASH_WORKERS = 0
+        SLOW_QUERY_THRESHOLD_MS = 60_000
+        # Load generators book from one address; per-client limits would throttle them.
+        RATE_LIMIT_ENABLED = False
+
+    return BenchmarkConfig
+
+
+def benchmark_environment(database_path: Path) -> Dict[str, str]:
+    """Environment for running the app in a subprocess with the settings of :func:`make_benchmark_config`."""
+
+    environment = dict(os.environ)
+    environment.update(
+        {
+            "FLASK_ENV": "production",
+            "DATABASE_URL": f"sqlite:///{database_path}",
+            "STRIPE_SECRET_KEY": "",
+            "STRIPE_PUBLISHABLE_KEY": "",
+            "SENTRY_DSN": "",
+            "LOG_LEVEL": "WARNING",
+            "NOTIFICATIONS_EMAIL_PROVIDER": "disabled",
+            "NOTIFICATIONS_SMS_PROVIDER": "disabled",
+            "PASSWORD_HASH_WORKERS": "0",
+            "SLOW_QUERY_THRESHOLD_MS": "60000",
+            "RATE_LIMIT_ENABLED": "false",
+        }
+    )
+    environment.pop("PROMETHEUS_MULTIPROC_DIR", None)
+    return environment
+
+
+def random_trip(rng: random.Random) -> Dict[str, str]:
+    pickup, dropoff = rng.sample(KOS_PLACES, 2)
+    return {"pickup_address": pickup, "dropoff_address": dropoff}
+
+
+def seed_database(drivers: int, rides: int, *, seed: int = 42) -> List[int]:
+    """Insert ``drivers`` drivers and ``rides`` historical rides; return the driver ids.
+
+    Must run inside an application context. A single bcrypt hash is shared by
+    every driver so seeding cost does not scale with the hashing work factor.
+    """
+
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+
+    if PricingConfig.query.first() is None:
+        db.session.add(PricingConfig(base_fare=3.0, price_per_km=1.5))
+
+    password_hash = hash_password(BENCHMARK_PASSWORD)
+    driver_rows = [
+        {
+            "name": f"Benchmark Driver {index}",
+            "email": f"driver{index}@bench.kos-taxi.test",
+            "phone": f"+3022420{index:05d}",
+            "vehicle_model": rng.choice(["Skoda Octavia", "Toyota Corolla", "Mercedes Vito"]),
+            "vehicle_plate": f"KOS-{index:04d}",
+            "password_hash": password_hash,
+            "is_available": rng.random() < 0.7,
+            "created_at": now - timedelta(days=rng.randint(1, 365)),
+        }
+        for index in range(drivers)
+    ]
+    db.session.bulk_insert_mappings(Driver, driver_rows)
+    db.session.flush()
+    driver_ids = [driver_id for (driver_id,) in db.session.query(Driver.id).all()]
+
+    ride_rows = []
+    for index in range(rides):
+        trip = random_trip(rng)
+        distance = estimate_distance_km(trip["pickup_address"], trip["dropoff_address"])
+        created_at = now - timedelta(minutes=rng.randint(10, 90 * 24 * 60))
+        status = rng.choice(_HISTORICAL_STATUSES)
+        ride_rows.append(
+            {
+                "rider_name": f"Rider {index}",
+                "user_email": f"rider{index}@bench.kos-taxi.test",
+                "pickup_address": trip["pickup_address"],
+                "dest_address": trip["dropoff_address"],
+                "status": status,
+                "driver_id": rng.choice(driver_ids) if driver_ids and status != "pending" else None,
+                "fare": round(3.0 + distance * 1.5, 2),
+                "distance_km": distance,
+                "estimated_duration_minutes": estimate_duration_minutes(distance, scheduled_time=created_at),
+                "passenger_count": rng.randint(1, 4),
+                "scheduled_time": created_at + timedelta(minutes=30),
+                "payment_status": "succeeded" if status == "completed" else "pending",
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+        )
+    db.session.bulk_insert_mappings(Ride, ride_rows)
+    db.session.flush()
+
+    completed = db.session.query(Ride.id, Ride.fare, Ride.created_at).filter(Ride.status == "completed").all()
+    payment_rows = [
+        {
+            "ride_id": ride_id,
+            "stripe_payment_intent_id": f"pi_bench_{ride_id}",
+            "status": "succeeded",
+            "amount": int(round(fare * 100)),
+            "currency": "eur",
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+        for ride_id, fare, created_at in completed
+    ]
+    db.session.bulk_insert_mappings(Payment, payment_rows)
+    db.session.commit()
+    return driver_ids
+
+
+__all__ = ["KOS_PLACES", "make_benchmark_config", "random_trip", "seed_database"]
@@ -0,0 +1,217 @@
+"""Concurrent end-to-end load test of the ride booking lifecycle.
+
+Each virtual user repeatedly estimates a fare, books a ride, lists pending
+rides, accepts and completes the booking, and periodically loads the admin
+overview. Requests go over HTTP to a real threaded WSGI server wrapping
+``create_app`` with Stripe and notifications disabled. Per-endpoint
+throughput and p50/p95/p99 latency are written as JSON for comparison
+across commits::
+
+    python -m benchmarks.http_load --drivers 50 --rides 5000 --users 8 --iterations 50 \\
+        --output bench-results/http_load.json
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import requests
+from flask import Flask
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from src.app import create_app
+
+from .datagen import make_benchmark_config, random_trip, seed_database
+from .reporting import build_report, summarise_latencies, write_report
+
+
+class _KeepAliveRequestHandler(WSGIRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_request(self, *args, **kwargs) -> None:  # pragma: no cover - silence access log
+        pass
+
+
+@contextmanager
+def serve_app(app: Flask) -> Iterator[str]:
+    """Serve ``app`` on an ephemeral port in a background thread and yield its base URL."""
+
+    server = make_server(
+        "127.0.0.1",
+        0,
+        app,
+        threaded=True,
+        request_handler=_KeepAliveRequestHandler,
+    )
+    thread = threading.Thread(target=server.serve_forever, name="benchmark-wsgi", daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        thread.join()
+
+
+class _Recorder:
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, name: str, latency: float, ok: bool) -> None:
+        with self._lock:
+            self.latencies[name].append(latency)
+            if not ok:
+                self.errors[name] += 1
+
+
+def _timed(
+    recorder: _Recorder,
+    session: requests.Session,
+    name: str,
+    method: str,
+    url: str,
+    **kwargs,
+) -> Optional[dict]:
+    started = time.perf_counter()
+    response = session.request(method, url, timeout=30, **kwargs)
+    recorder.record(name, time.perf_counter() - started, response.ok)
+    if not response.ok:
+        return None
+    return response.json()
+
+
+def _virtual_user(
+    base_url: str,
+    user_index: int,
+    iterations: int,
+    driver_ids: Sequence[int],
+    admin_every: int,
+    recorder: _Recorder,
+    start_gate: threading.Barrier,
+) -> None:
+    rng = random.Random(user_index)
+    api = f"{base_url}/api"
+    with requests.Session() as session:
+        start_gate.wait()
+        for iteration in range(iterations):
+            trip = random_trip(rng)
+            booking = {
+                **trip,
+                "scheduled_time": (datetime.utcnow() + timedelta(minutes=rng.randint(1, 20))).isoformat() + "Z",
+                "passenger_count": rng.randint(1, 4),
+                "rider_name": f"Load User {user_index}",
+                "rider_email": f"load{user_index}@bench.kos-taxi.test",
+            }
+            _timed(recorder, session, "POST /rides/estimate", "POST", f"{api}/rides/estimate", json=booking)
+            created = _timed(recorder, session, "POST /rides", "POST", f"{api}/rides", json=booking)
+            _timed(recorder, session, "GET /rides/pending", "GET", f"{api}/rides/pending")
+            if created:
+                ride_id = created["ride"]["id"]
+                accepted = _timed(
+                    recorder,
+                    session,
+                    "POST /rides/<id>/accept",
+                    "POST",
+                    f"{api}/rides/{ride_id}/accept",
+                    json={"driver_id": rng.choice(driver_ids)},
+                )
+                if accepted:
+                    _timed(recorder, session, "POST /rides/<id>/complete", "POST", f"{api}/rides/{ride_id}/complete")
+            if admin_every and iteration % admin_every == 0:
+                _timed(recorder, session, "GET /admin/overview", "GET", f"{api}/admin/overview")
+
+
+def run_load(
+    base_url: str,
+    *,
+    driver_ids: Sequence[int],
+    users: int,
+    iterations: int,
+    admin_every: int = 10,
+) -> Tuple[Dict[str, Dict[str, float]], float]:
+    """Drive ``users`` concurrent lifecycles against ``base_url``.
+
+    Returns per-endpoint summaries (including an ``error_count``) and the wall
+    clock duration of the run.
+    """
+
+    recorder = _Recorder()
+    start_gate = threading.Barrier(users + 1)
+    threads = [
+        threading.Thread(
+            target=_virtual_user,
+            args=(base_url, index, iterations, driver_ids, admin_every, recorder, start_gate),
+            name=f"virtual-user-{index}",
+        )
+        for index in range(users)
+    ]
+    for thread in threads:
+        thread.start()
+    start_gate.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    summaries = {}
+    for name, latencies in sorted(recorder.latencies.items()):
+        summary = summarise_latencies(latencies, elapsed)
+        summary["error_count"] = recorder.errors.get(name, 0)
+        summaries[name] = summary
+    return summaries, elapsed
+
+
+def prepare_app(database_path: Path, drivers: int, rides: int) -> Tuple[Flask, List[int]]:
+    """Create an app against a fresh database seeded with synthetic data."""
+
+    app = create_app(make_benchmark_config(database_path))
+    with app.app_context():
+        driver_ids = seed_database(drivers, rides)
+    return app, driver_ids
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--drivers", type=int, default=50, help="Drivers to seed.")
+    parser.add_argument("--rides", type=int, default=5000, help="Historical rides to seed.")
+    parser.add_argument("--users", type=int, default=8, help="Concurrent virtual users.")
+    parser.add_argument("--iterations", type=int, default=25, help="Booking lifecycles per user.")
+    parser.add_argument("--admin-every", type=int, default=10, help="Load /admin/overview every N lifecycles (0 disables).")
+    parser.add_argument("--output", type=Path, help="Write the JSON report here instead of stdout.")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="kos-taxi-bench-") as workdir:
+        app, driver_ids = prepare_app(Path(workdir) / "bench.db", args.drivers, args.rides)
+        with serve_app(app) as base_url:
+            results, elapsed = run_load(
+                base_url,
+                driver_ids=driver_ids,
+                users=args.users,
+                iterations=args.iterations,
+                admin_every=args.admin_every,
+            )
+
+    parameters = {
+        "drivers": args.drivers,
+        "rides": args.rides,
+        "users": args.users,
+        "iterations": args.iterations,
+        "admin_every": args.admin_every,
+        "server": "werkzeug-threaded",
+        "elapsed_s": round(elapsed, 3),
+    }
+    write_report(build_report("http_load", parameters, results), args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,228 @@
+"""Microbenchmarks for pure hot-path functions with regression baselines.
+
+Each case is timed with :mod:`timeit` (best of several repeats, reported as
+nanoseconds per call) and compared with ``benchmarks/baselines/micro.json``.
+The run exits non-zero when any case is slower than its baseline by more than
+``--tolerance``::
+
+    python -m benchmarks.micro                      # compare with the baseline
+    python -m benchmarks.micro --update-baseline    # re-record after an intended change
+
+Baselines are hardware dependent; re-record them on the machine that runs the
+comparison.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import timeit
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+from flask import Flask
+
+from src.app import create_app
+from src.auth.jwt import create_token, decode_token
+from src.models import Payment, db
+from src.models.driver import Driver
+from src.models.ride import Ride
+from src.routes.ride import _prepare_ride_payload, calculate_fare
+from src.services import estimate_distance_km, estimate_duration_minutes
+
+from .datagen import KOS_PLACES, make_benchmark_config
+from .reporting import build_report, write_report
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines" / "micro.json"
+DEFAULT_TOLERANCE = 0.30
+
+Case = Callable[[], object]
+
+
+def _sample_ride() -> Ride:
+    now = datetime(2025, 7, 14, 8, 30)
+    ride = Ride(
+        id=1042,
+        rider_name="Eleni Papadopoulou",
+        user_email="eleni@example.com",
+        user_phone="+306900000000",
+        driver_id=7,
+        pickup_address="Kos Port Ferry Terminal",
+        dest_address="Kos International Airport",
+        status="accepted",
+        fare=41.7,
+        distance_km=25.8,
+        estimated_duration_minutes=50,
+        passenger_count=3,
+        scheduled_time=now + timedelta(hours=2),
+        payment_status="requires_payment_method",
+        created_at=now,
+        updated_at=now,
+    )
+    ride.payment = Payment(
+        id=88,
+        ride_id=1042,
+        stripe_payment_intent_id="pi_3PbenchmarkIntent",
+        status="requires_payment_method",
+        amount=4170,
+        currency="eur",
+        metadata_json={"ride_id": 1042, "provider": "placeholder"},
+        customer_email="eleni@example.com",
+        created_at=now,
+        updated_at=now,
+    )
+    return ride
+
+
+def _sample_driver() -> Driver:
+    now = datetime(2025, 7, 14, 8, 30)
+    return Driver(
+        id=7,
+        name="Nikos Georgiou",
+        email="nikos@example.com",
+        phone="+306911111111",
+        vehicle_model="Mercedes Vito",
+        vehicle_plate="KOS-0007",
+        is_available=True,
+        current_lat=36.893,
+        current_lon=27.288,
+        created_at=now,
+        updated_at=now,
+        last_login_at=now,
+    )
+
+
+def build_cases() -> Dict[str, Case]:
+    """Return benchmark cases keyed by name. Callers must hold an app context."""
+
+    pairs = [(KOS_PLACES[i], KOS_PLACES[(i * 7 + 3) % len(KOS_PLACES)]) for i in range(len(KOS_PLACES))]
+    scheduled = datetime(2025, 7, 14, 17, 45)
+    booking = {
+        "pickupAddress": "  Kos Port Ferry Terminal ",
+        "dropoffAddress": "Kos International Airport",
+        "scheduledTime": "2025-07-14T17:45:00Z",
+        "passengerCount": "3",
+        "riderName": "Eleni Papadopoulou",
+        "riderEmail": "eleni@example.com",
+        "notes": "Two large suitcases",
+    }
+    token = create_token(1042, "access", 900)
+    ride = _sample_ride()
+    driver = _sample_driver()
+    payment = ride.payment
+
+    def estimate_distance() -> None:
+        for pickup, dropoff in pairs:
+            estimate_distance_km(pickup, dropoff)
+
+    return {
+        "estimate_distance_km[15 pairs]": estimate_distance,
+        "estimate_duration_minutes": lambda: estimate_duration_minutes(
+            25.8, scheduled_time=scheduled, passenger_count=3
+        ),
+        "calculate_fare": lambda: calculate_fare(25.8),
+        "_prepare_ride_payload": lambda: _prepare_ride_payload(booking),
+        "create_token": lambda: create_token(1042, "access", 900),
+        "decode_token": lambda: decode_token(token, expected_type="access"),
+        "Ride.to_dict": ride.to_dict,
+        "Driver.to_dict": driver.to_dict,
+        "Payment.to_dict": payment.to_dict,
+    }
+
+
+def time_case(case: Case, *, repeat: int = 5, min_time: float = 0.2) -> float:
+    """Return the best observed nanoseconds per call for ``case``."""
+
+    timer = timeit.Timer(case)
+    number, elapsed = timer.autorange()
+    if elapsed < min_time:
+        number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    best = min(timer.repeat(repeat=repeat, number=number))
+    return best / number * 1e9
+
+
+def compare_to_baseline(
+    results: Dict[str, float],
+    baseline: Dict[str, float],
+    tolerance: float,
+) -> List[str]:
+    """Return a description of each case slower than ``baseline * (1 + tolerance)``."""
+
+    regressions = []
+    for name, ns_per_call in sorted(results.items()):
+        reference = baseline.get(name)
+        if reference is None or reference <= 0:
+            continue
+        ratio = ns_per_call / reference
+        if ratio > 1 + tolerance:
+            regressions.append(
+                f"{name}: {ns_per_call:,.0f} ns/call vs baseline {reference:,.0f} ns/call (+{(ratio - 1) * 100:.0f}%)"
+            )
+    return regressions
+
+
+def load_baseline(path: Path = BASELINE_PATH) -> Dict[str, float]:
+    if not path.exists():
+        return {}
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    return {name: float(entry["ns_per_call"]) for name, entry in payload.get("results", {}).items()}
+
+
+@contextmanager
+def benchmark_app() -> Iterator[Flask]:
+    """Yield an app context backed by a throwaway SQLite database."""
+
+    with tempfile.TemporaryDirectory(prefix="kos-taxi-micro-") as workdir:
+        app = create_app(make_benchmark_config(Path(workdir) / "micro.db"))
+        with app.app_context():
+            yield app
+            db.session.remove()
+
+
+def run_cases(selected: Optional[Sequence[str]] = None, *, repeat: int = 5, min_time: float = 0.2) -> Dict[str, float]:
+    with benchmark_app():
+        cases = build_cases()
+        names = [name for name in cases if not selected or any(part in name for part in selected)]
+        return {name: round(time_case(cases[name], repeat=repeat, min_time=min_time), 1) for name in names}
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed slowdown as a fraction (0.3 = 30%%).")
+    parser.add_argument("--update-baseline", action="store_true", help="Record results as the new baseline.")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="Baseline JSON file.")
+    parser.add_argument("--filter", action="append", help="Only run cases whose name contains this text.")
+    parser.add_argument("--output", type=Path, help="Also write the full JSON report here.")
+    args = parser.parse_args(argv)
+
+    results = run_cases(args.filter)
+    baseline = load_baseline(args.baseline)
+    for name, ns_per_call in results.items():
+        reference = baseline.get(name)
+        delta = f"{(ns_per_call / reference - 1) * 100:+.0f}%" if reference else "new"
+        print(f"{name:<34} {ns_per_call:>12,.0f} ns/call  {delta}")
+
+    report = build_report(
+        "micro",
+        {"tolerance": args.tolerance},
+        {name: {"ns_per_call": value} for name, value in results.items()},
+    )
+    if args.output:
+        write_report(report, args.output)
+    if args.update_baseline:
+        # Keep entries for cases excluded by --filter.
+        merged = {**baseline, **results}
+        report["results"] = {name: {"ns_per_call": value} for name, value in sorted(merged.items())}
+        write_report(report, args.baseline)
+        return 0
+
+    regressions = compare_to_baseline(results, baseline, args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,110 @@
+"""Payload size and encode time of v1 ride lists versus the compact v2 profile.
+
+Serialises the same list of rides as a v1 JSON response, a v2 JSON response
+and a v2 MessagePack response, and reports raw and gzip sizes together with
+the best-of-N encode time per list::
+
+    python -m benchmarks.payloads --rides 200 --output payloads.json
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import timeit
+from datetime import timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import msgpack
+
+from src.models import Payment
+from src.models.ride import Ride
+from src.services.compact import compact_ride
+
+from .datagen import KOS_PLACES
+from .micro import _sample_ride, benchmark_app
+from .reporting import build_report, write_report
+
+STATUSES = ("pending", "accepted", "in_progress", "completed", "scheduled")
+
+
+def sample_rides(count: int) -> List[Ride]:
+    """Build ``count`` detached rides shaped like production rows."""
+
+    template = _sample_ride()
+    rides = []
+    for index in range(count):
+        ride = _sample_ride()
+        ride.id = template.id + index
+        ride.status = STATUSES[index % len(STATUSES)]
+        ride.pickup_address = KOS_PLACES[index % len(KOS_PLACES)]
+        ride.dest_address = KOS_PLACES[(index * 7 + 3) % len(KOS_PLACES)]
+        ride.updated_at = template.updated_at + timedelta(minutes=index)
+        if index % 3:
+            ride.payment = Payment(
+                ride_id=ride.id,
+                stripe_payment_intent_id=f"pi_bench{index:06d}",
+                status="succeeded" if ride.status == "completed" else "requires_payment_method",
+                amount=int(ride.fare * 100),
+                currency="eur",
+                metadata_json={"ride_id": ride.id},
+                created_at=ride.created_at,
+                updated_at=ride.updated_at,
+            )
+        else:
+            ride.payment = None
+        rides.append(ride)
+    return rides
+
+
+def encoders(rides: Sequence[Ride]) -> Dict[str, Callable[[], bytes]]:
+    return {
+        "v1_json": lambda: json.dumps({"rides": [ride.to_dict() for ride in rides]}).encode(),
+        "v2_json": lambda: json.dumps({"rides": [compact_ride(ride) for ride in rides]}).encode(),
+        "v2_msgpack": lambda: msgpack.packb({"rides": [compact_ride(ride) for ride in rides]}, use_bin_type=True),
+    }
+
+
+def measure(rides: int = 200, repeat: int = 5) -> Dict[str, Dict[str, float]]:
+    with benchmark_app():
+        cases = encoders(sample_rides(rides))
+        results = {}
+        for name, encode in cases.items():
+            body = encode()
+            timer = timeit.Timer(encode)
+            number, _ = timer.autorange()
+            best = min(timer.repeat(repeat=repeat, number=number)) / number
+            results[name] = {
+                "bytes": len(body),
+                "gzip_bytes": len(gzip.compress(body, compresslevel=6)),
+                "encode_us": round(best * 1e6, 1),
+            }
+    baseline = results["v1_json"]
+    for entry in results.values():
+        entry["bytes_vs_v1"] = round(entry["bytes"] / baseline["bytes"], 3)
+        entry["encode_vs_v1"] = round(entry["encode_us"] / baseline["encode_us"], 3)
+    return results
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rides", type=int, default=200, help="Rides per serialised list.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repeats (best is kept).")
+    parser.add_argument("--output", type=Path, help="Write the JSON report here.")
+    args = parser.parse_args(argv)
+
+    results = measure(args.rides, args.repeat)
+    print(f"{'profile':<12} {'bytes':>9} {'gzip':>8} {'encode µs':>11} {'size vs v1':>11}")
+    for name, entry in results.items():
+        print(
+            f"{name:<12} {entry['bytes']:>9,} {entry['gzip_bytes']:>8,} "
+            f"{entry['encode_us']:>11,.1f} {entry['bytes_vs_v1']:>11.2f}"
+        )
+    if args.output:
+        write_report(build_report("payloads", {"rides": args.rides, "repeat": args.repeat}, results), args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,107 @@
+"""CPU time and memory of list serialisation through the ORM versus the read models.
+
+Seeds ``--rows`` rides (completed ones with a payment) and ``--rows`` drivers,
+then serialises all of them both ways: ORM instances plus ``to_dict`` (payments
+batch-loaded with ``selectinload``, as the list endpoints did) and the Core
+``select`` row tuples from :mod:`src.services.read_models`. Reports the best
+CPU time of ``--repeat`` runs and the peak traced allocation, both scaled to
+10k rows::
+
+    python -m benchmarks.read_path --rows 10000 --output read_path.json
+"""
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, Optional, Sequence
+
+from sqlalchemy.orm import selectinload
+
+from src.models import db
+from src.models.driver import Driver
+from src.models.ride import Ride
+from src.services.read_models import driver_rows, ride_rows
+
+from .datagen import seed_database
+from .micro import benchmark_app
+from .reporting import build_report, write_report
+
+PER_ROWS = 10_000
+
+
+def cases() -> Dict[str, Callable[[], list]]:
+    return {
+        "rides_orm": lambda: [ride.to_dict() for ride in Ride.query.options(selectinload(Ride.payment))],
+        "rides_read_model": lambda: [ride.to_dict() for ride in ride_rows()],
+        "drivers_orm": lambda: [driver.to_dict() for driver in Driver.query],
+        "drivers_read_model": lambda: [driver.to_dict() for driver in driver_rows()],
+    }
+
+
+def _run(case: Callable[[], list]) -> int:
+    try:
+        return len(case())
+    finally:
+        db.session.remove()  # each request starts with an empty identity map
+
+
+def _cpu_seconds(case: Callable[[], list], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.process_time()
+        _run(case)
+        timings.append(time.process_time() - started)
+    return min(timings)
+
+
+def _peak_bytes(case: Callable[[], list]) -> int:
+    tracemalloc.start()
+    try:
+        _run(case)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def measure(rows: int = PER_ROWS, repeat: int = 3) -> Dict[str, Dict[str, float]]:
+    with benchmark_app():
+        seed_database(drivers=rows, rides=rows)
+        results = {}
+        for name, case in cases().items():
+            _run(case)  # warm the statement caches
+            scale = PER_ROWS / rows
+            results[name] = {
+                "rows": rows,
+                "cpu_ms_per_10k": round(_cpu_seconds(case, repeat) * 1000 * scale, 1),
+                "peak_kib_per_10k": round(_peak_bytes(case) / 1024 * scale, 1),
+            }
+    for name, entry in results.items():
+        baseline = results[name.replace("_read_model", "_orm")]
+        entry["cpu_vs_orm"] = round(entry["cpu_ms_per_10k"] / baseline["cpu_ms_per_10k"], 3)
+        entry["memory_vs_orm"] = round(entry["peak_kib_per_10k"] / baseline["peak_kib_per_10k"], 3)
+    return results
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=PER_ROWS, help="Rides and drivers to seed and list.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repeats (best is kept).")
+    parser.add_argument("--output", type=Path, help="Write the JSON report here.")
+    args = parser.parse_args(argv)
+
+    results = measure(args.rows, args.repeat)
+    print(f"{'case':<20} {'cpu ms/10k':>11} {'peak KiB/10k':>13} {'cpu vs ORM':>11} {'mem vs ORM':>11}")
+    for name, entry in results.items():
+        print(
+            f"{name:<20} {entry['cpu_ms_per_10k']:>11,.1f} {entry['peak_kib_per_10k']:>13,.1f} "
+            f"{entry['cpu_vs_orm']:>11.2f} {entry['memory_vs_orm']:>11.2f}"
+        )
+    if args.output:
+        write_report(build_report("read_path", {"rows": args.rows, "repeat": args.repeat}, results), args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,76 @@
+"""Latency summaries and JSON reports shared by the benchmark entry points."""
+from __future__ import annotations
+
+import json
+import math
+import platform
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Return the nearest-rank percentile of an already sorted list."""
+
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarise_latencies(latencies: Iterable[float], elapsed: float) -> Dict[str, float]:
+    """Summarise per-request latencies (seconds) into milliseconds and throughput."""
+
+    ordered = sorted(latencies)
+    count = len(ordered)
+    return {
+        "requests": count,
+        "req_per_s": round(count / elapsed, 2) if elapsed > 0 else 0.0,
+        "mean_ms": round(sum(ordered) / count * 1000, 3) if count else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3) if count else 0.0,
+    }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_report(kind: str, parameters: Dict[str, Any], results: Dict[str, Any]) -> Dict[str, Any]:
+    """Wrap benchmark results with enough context to compare runs across commits."""
+
+    return {
+        "kind": kind,
+        "commit": _git_revision(),
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": parameters,
+        "results": results,
+    }
+
+
+def write_report(report: Dict[str, Any], output: Optional[Path]) -> None:
+    """Write ``report`` as JSON to ``output``, or print it when no path is given."""
+
+    payload = json.dumps(report, indent=2, sort_keys=True)
+    if output is None:
+        print(payload)
+        return
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(payload + "\n", encoding="utf-8")
+    print(f"Wrote {report['kind']} report to {output}")
+
+
+__all__ = ["build_report", "percentile", "summarise_latencies", "write_report"]
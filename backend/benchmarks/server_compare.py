@@ -0,0 +1,161 @@
+"""Compare the Werkzeug development server with the production ``src.serve`` command.
+
+Both servers run as subprocesses, each against its own copy of one seeded
+database, and receive the booking-lifecycle load from
+:mod:`benchmarks.http_load`. The report holds per-endpoint latency and
+overall throughput for each server::
+
+    python -m benchmarks.server_compare --workers 4 --threads 4 --users 16 \\
+        --output bench-results/servers.json
+"""
+from __future__ import annotations
+
+import argparse
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import requests
+
+from src.models import db
+
+from .datagen import benchmark_environment
+from .http_load import prepare_app, run_load
+from .reporting import build_report, write_report
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+_DEV_SERVER = (
+    "import sys\n"
+    "from src.main import app\n"
+    "app.run(host='127.0.0.1', port=int(sys.argv[1]), debug=False, threaded=True)\n"
+)
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def dev_server_command(port: int) -> List[str]:
+    return [sys.executable, "-c", _DEV_SERVER, str(port)]
+
+
+def prefork_server_command(port: int, workers: int, threads: int) -> List[str]:
+    return [
+        sys.executable, "-m", "src.serve",
+        "--bind", f"127.0.0.1:{port}",
+        "--workers", str(workers),
+        "--threads", str(threads),
+    ]
+
+
+@contextmanager
+def launch_server(
+    command: Sequence[str],
+    database_path: Path,
+    port: int,
+    *,
+    log_path: Path,
+    startup_timeout: float = 30.0,
+) -> Iterator[str]:
+    """Start ``command`` against ``database_path`` and yield its base URL once it answers."""
+
+    base_url = f"http://127.0.0.1:{port}"
+    with log_path.open("wb") as log:
+        process = subprocess.Popen(
+            list(command),
+            cwd=BACKEND_DIR,
+            env=benchmark_environment(database_path),
+            stdout=log,
+            stderr=subprocess.STDOUT,
+        )
+        try:
+            deadline = time.monotonic() + startup_timeout
+            while True:
+                if process.poll() is not None:
+                    raise RuntimeError(f"Server exited during start-up:\n{log_path.read_text(errors='replace')}")
+                try:
+                    if requests.get(f"{base_url}/metrics", timeout=1).ok:
+                        break
+                except requests.RequestException:
+                    pass
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"Server did not start within {startup_timeout}s")
+                time.sleep(0.1)
+            yield base_url
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=35)
+            except subprocess.TimeoutExpired:  # pragma: no cover - hung server
+                process.kill()
+                process.wait()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--drivers", type=int, default=50, help="Drivers to seed.")
+    parser.add_argument("--rides", type=int, default=5000, help="Historical rides to seed.")
+    parser.add_argument("--users", type=int, default=16, help="Concurrent virtual users.")
+    parser.add_argument("--iterations", type=int, default=25, help="Booking lifecycles per user.")
+    parser.add_argument("--admin-every", type=int, default=10, help="Load /admin/overview every N lifecycles (0 disables).")
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes for src.serve.")
+    parser.add_argument("--threads", type=int, default=4, help="Threads per src.serve worker.")
+    parser.add_argument("--output", type=Path, help="Write the JSON report here instead of stdout.")
+    args = parser.parse_args(argv)
+
+    results: Dict[str, Dict[str, object]] = {}
+    with tempfile.TemporaryDirectory(prefix="kos-taxi-servers-") as workdir_name:
+        workdir = Path(workdir_name)
+        seeded = workdir / "seed.db"
+        app, driver_ids = prepare_app(seeded, args.drivers, args.rides)
+        with app.app_context():
+            db.engine.dispose()
+
+        servers = {
+            "werkzeug-dev": dev_server_command,
+            "gunicorn-prefork": lambda port: prefork_server_command(port, args.workers, args.threads),
+        }
+        for name, command in servers.items():
+            database_path = workdir / f"{name}.db"
+            shutil.copyfile(seeded, database_path)
+            port = free_port()
+            with launch_server(command(port), database_path, port, log_path=workdir / f"{name}.log") as base_url:
+                summaries, elapsed = run_load(
+                    base_url,
+                    driver_ids=driver_ids,
+                    users=args.users,
+                    iterations=args.iterations,
+                    admin_every=args.admin_every,
+                )
+            total_requests = sum(summary["requests"] for summary in summaries.values())
+            results[name] = {
+                "elapsed_s": round(elapsed, 3),
+                "req_per_s": round(total_requests / elapsed, 2) if elapsed > 0 else 0.0,
+                "errors": sum(summary["error_count"] for summary in summaries.values()),
+                "endpoints": summaries,
+            }
+
+    parameters = {
+        "drivers": args.drivers,
+        "rides": args.rides,
+        "users": args.users,
+        "iterations": args.iterations,
+        "admin_every": args.admin_every,
+        "workers": args.workers,
+        "threads": args.threads,
+    }
+    write_report(build_report("server_compare", parameters, results), args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,20 @@
+"""Gunicorn hooks that keep Prometheus multiprocess metrics consistent.
+
+Usage: ``PROMETHEUS_MULTIPROC_DIR=/tmp/kos-taxi-metrics gunicorn -c gunicorn.conf.py 'src.main:app'``
+"""
+from __future__ import annotations
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from src.services.metrics_registry import mark_worker_dead, prepare_multiprocess_dir  # noqa: E402
+
+
+def on_starting(server) -> None:
+    prepare_multiprocess_dir()
+
+
+def child_exit(server, worker) -> None:
+    mark_worker_dead(worker.pid)
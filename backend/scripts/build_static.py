@@ -1,46 +1,215 @@
 #!/usr/bin/env python3
-"""Copy the built frontend assets into the Flask static directory."""
+"""Publish the built frontend assets into the Flask static directory.
+
+Each build is staged as a new release under ``src/.static-releases/`` and
+published by atomically repointing the ``src/static`` symlink, so a running
+server never sees a half-copied tree. Files whose content hash matches the
+previous release are hard-linked rather than copied, changed files are copied
+and precompressed (``.gz`` always, ``.br`` when the ``brotli`` package is
+installed) in parallel, and a ``static-manifest.json`` describing every file
+is written for the Flask app to load at startup.
+"""
 
 from __future__ import annotations
 
+import argparse
+import gzip
+import hashlib
+import json
+import os
 import shutil
 import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:  # Optional: brotli variants are skipped when the package is unavailable.
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
 FRONTEND_DIR = REPO_ROOT / 'frontend'
 DIST_DIR = FRONTEND_DIR / 'dist'
 STATIC_DIR = REPO_ROOT / 'backend' / 'src' / 'static'
+RELEASES_DIR = STATIC_DIR.parent / '.static-releases'
+MANIFEST_NAME = 'static-manifest.json'
+
+COMPRESSIBLE_SUFFIXES = {'.html', '.js', '.mjs', '.css', '.json', '.map', '.svg', '.txt', '.xml', '.webmanifest', '.wasm'}
+MIN_COMPRESS_BYTES = 256
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open('rb') as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _load_manifest(release: Optional[Path]) -> Dict[str, Dict[str, object]]:
+    if release is None or not (release / MANIFEST_NAME).is_file():
+        return {}
+    return json.loads((release / MANIFEST_NAME).read_text(encoding='utf-8')).get('files', {})
+
+
+def _current_release() -> Optional[Path]:
+    if STATIC_DIR.is_symlink() or STATIC_DIR.is_dir():
+        return STATIC_DIR.resolve()
+    return None
+
+
+def _link_or_copy(source: Path, destination: Path) -> None:
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copy2(source, destination)
+
+
+def _compress(destination: Path, data: bytes, use_brotli: bool) -> Dict[str, int]:
+    encodings: Dict[str, int] = {}
+    if destination.suffix not in COMPRESSIBLE_SUFFIXES or len(data) < MIN_COMPRESS_BYTES:
+        return encodings
+
+    gzipped = gzip.compress(data, compresslevel=9, mtime=0)
+    if len(gzipped) < len(data):
+        destination.with_name(destination.name + '.gz').write_bytes(gzipped)
+        encodings['gzip'] = len(gzipped)
+    if use_brotli and brotli is not None:
+        compressed = brotli.compress(data, quality=11)
+        if len(compressed) < len(data):
+            destination.with_name(destination.name + '.br').write_bytes(compressed)
+            encodings['br'] = len(compressed)
+    return encodings
 
 
-def copy_assets() -> None:
+def _publish_file(
+    source: Path,
+    relative: str,
+    staging: Path,
+    previous_release: Optional[Path],
+    previous_entry: Optional[Dict[str, object]],
+    use_brotli: bool,
+) -> Tuple[str, Dict[str, object], bool]:
+    """Place one file into ``staging``; return its manifest entry and whether it changed."""
+
+    destination = staging / relative
+    digest = _sha256(source)
+
+    if previous_release is not None and previous_entry and previous_entry.get('sha256') == digest:
+        previous_encodings = dict(previous_entry.get('encodings') or {})
+        wants_brotli = use_brotli and brotli is not None
+        # Recompress if brotli became available since the file was last built.
+        missing_brotli = wants_brotli and 'gzip' in previous_encodings and 'br' not in previous_encodings
+        if not missing_brotli:
+            encodings = {name: size for name, size in previous_encodings.items() if name != 'br' or wants_brotli}
+            _link_or_copy(previous_release / relative, destination)
+            for encoding, suffix in (('gzip', '.gz'), ('br', '.br')):
+                if encoding in encodings:
+                    _link_or_copy(previous_release / (relative + suffix), destination.with_name(destination.name + suffix))
+            return relative, {**previous_entry, 'encodings': encodings}, False
+
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    data = source.read_bytes()
+    destination.write_bytes(data)
+    shutil.copystat(source, destination)
+    entry: Dict[str, object] = {
+        'sha256': digest,
+        'size': len(data),
+        'encodings': _compress(destination, data, use_brotli),
+    }
+    return relative, entry, True
+
+
+def _swap_release(staging: Path) -> None:
+    """Point ``STATIC_DIR`` at ``staging`` with a single atomic rename."""
+
+    if STATIC_DIR.exists() and not STATIC_DIR.is_symlink():
+        # One-off migration from the old copy-in-place layout.
+        legacy = RELEASES_DIR / f'legacy-{int(time.time())}'
+        STATIC_DIR.rename(legacy)
+
+    temporary_link = STATIC_DIR.with_name(f'.static-link-{os.getpid()}')
+    if temporary_link.is_symlink():
+        temporary_link.unlink()
+    temporary_link.symlink_to(os.path.relpath(staging, STATIC_DIR.parent), target_is_directory=True)
+    os.replace(temporary_link, STATIC_DIR)
+
+
+def _prune_releases(keep: int) -> List[Path]:
+    current = STATIC_DIR.resolve()
+    releases = sorted(
+        (path for path in RELEASES_DIR.iterdir() if path.is_dir() and path != current),
+        key=lambda path: path.stat().st_mtime,
+        reverse=True,
+    )
+    # Older releases stay around so servers still holding their manifests keep working.
+    removed = releases[max(0, keep - 1):]
+    for path in removed:
+        shutil.rmtree(path, ignore_errors=True)
+    return removed
+
+
+def copy_assets(*, use_brotli: bool = True, workers: Optional[int] = None, keep_releases: int = 2) -> Dict[str, int]:
     if not DIST_DIR.exists() or not any(DIST_DIR.iterdir()):
         raise FileNotFoundError(
             'frontend/dist/ is missing or empty. Run "pnpm run build" in the frontend directory first.'
         )
 
-    STATIC_DIR.mkdir(parents=True, exist_ok=True)
+    RELEASES_DIR.mkdir(parents=True, exist_ok=True)
+    previous_release = _current_release()
+    previous_manifest = _load_manifest(previous_release)
+
+    staging = RELEASES_DIR / f'{time.strftime("%Y%m%dT%H%M%S")}-{uuid.uuid4().hex[:8]}'
+    staging.mkdir()
+
+    sources = [
+        (path, path.relative_to(DIST_DIR).as_posix())
+        for path in sorted(DIST_DIR.rglob('*'))
+        if path.is_file()
+    ]
+    try:
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+            results = list(
+                executor.map(
+                    lambda item: _publish_file(
+                        item[0], item[1], staging, previous_release, previous_manifest.get(item[1]), use_brotli
+                    ),
+                    sources,
+                )
+            )
+
+        files = {relative: entry for relative, entry, _ in results}
+        manifest = {'version': 1, 'generated_at': int(time.time()), 'files': files}
+        (staging / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding='utf-8')
+        _swap_release(staging)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
 
-    # Clear existing assets to avoid stale files.
-    for item in STATIC_DIR.iterdir():
-        if item.name == '.gitignore':
-            continue
-        if item.is_dir():
-            shutil.rmtree(item)
-        else:
-            item.unlink()
+    removed = _prune_releases(keep_releases)
+    changed = sum(1 for _, _, was_changed in results if was_changed)
+    return {
+        'files': len(results),
+        'changed': changed,
+        'reused': len(results) - changed,
+        'deleted': len(set(previous_manifest) - set(files)),
+        'pruned_releases': len(removed),
+    }
 
-    for item in DIST_DIR.iterdir():
-        destination = STATIC_DIR / item.name
-        if item.is_dir():
-            shutil.copytree(item, destination)
-        else:
-            shutil.copy2(item, destination)
 
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Publish frontend/dist into the Flask static directory.')
+    parser.add_argument('--no-brotli', action='store_true', help='Skip .br variants even if brotli is installed.')
+    parser.add_argument('--workers', type=int, help='Parallel copy/compression workers (default: CPU count).')
+    parser.add_argument('--keep-releases', type=int, default=2, help='Releases to retain, including the live one.')
+    args = parser.parse_args(argv)
 
-def main() -> int:
     try:
-        copy_assets()
+        stats = copy_assets(use_brotli=not args.no_brotli, workers=args.workers, keep_releases=args.keep_releases)
     except FileNotFoundError as exc:
         print(f"Error: {exc}", file=sys.stderr)
         return 1
@@ -48,7 +217,12 @@ def main() -> int:
         print(f"Unexpected error while copying assets: {exc}", file=sys.stderr)
         return 1
 
-    print(f"Copied assets from {DIST_DIR} to {STATIC_DIR}")
+    print(
+        f"Published {stats['files']} files from {DIST_DIR} to {STATIC_DIR} "
+        f"({stats['changed']} changed, {stats['reused']} reused, {stats['deleted']} removed)"
+    )
+    if brotli is None and not args.no_brotli:
+        print("Note: install 'brotli' to also emit .br variants.")
     return 0
 
 
@@ -3,62 +3,111 @@
 from __future__ import annotations
 
 import logging
+import os
 import time
+from contextlib import contextmanager
+from datetime import timedelta
 from logging.config import dictConfig
 from pathlib import Path
-from typing import Optional, Type
+from typing import Dict, Iterator, Optional, Type
 
-from flask import Flask, Response, g, request, send_from_directory
+import click
+from flask import Flask, Response, g, request
 from flask_cors import CORS
-from flask_migrate import Migrate
-from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
-from sentry_sdk import init as sentry_init
-from sentry_sdk.integrations.flask import FlaskIntegration
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram
 
 from .config import BASE_DIR, Config, DATABASE_DIR, get_config
 from .models import db
+from .models.schema import SchemaDriftError, ensure_schema, rebuild_autoincrement_tables, schema_is_current
 from .auth import auth_bp
 from .routes.admin import admin_bp
 from .routes.drivers import driver_bp
 from .routes.payments import payments_bp
 from .routes.ride import ride_bp
 from .routes.user import user_bp
+from .routes.v2 import v2_bp
+from .services.admission import init_admission
+from .services.archive import archive_finished_rides
+from .services.compression import init_compression
+from .services.idempotency import init_idempotency
+from .services.metrics_registry import render_latest
+from .services.password_hashing import init_password_hashing
+from .services.profiling import init_profiling
+from .services.read_replica import init_read_replica, sync_sqlite_replica
+from .services.query_metrics import init_query_metrics
+from .services.ride_scheduler import init_ride_scheduler
+from .services.rollups import rebuild_rollups
+from .services.stripe_gateway import init_stripe_gateway
+from .services.surge import init_surge
+from .services.static_assets import INDEX_FILE, AssetManifest, serve_asset
 
 STATIC_DIR = BASE_DIR / "static"
 MIGRATIONS_DIR = BASE_DIR / "migrations"
 
-migrate = Migrate()
-
 _REQUEST_LATENCY: Optional[Histogram] = None
 _REQUEST_COUNT: Optional[Counter] = None
+_LOGGING_CONFIGURED_LEVEL: Optional[str] = None
 
 
 def create_app(config_class: Optional[Type[Config]] = None) -> Flask:
     """Create and configure the Flask application."""
 
-    app = Flask(__name__, static_folder=str(STATIC_DIR))
-    config_obj = config_class or get_config()
-    app.config.from_object(config_obj)
-
-    _init_observability(app)
-
-    CORS(app, resources={r"/api/*": {"origins": "*"}})
-
-    db.init_app(app)
-    migrate.init_app(app, db, directory=str(MIGRATIONS_DIR))
+    timings: Dict[str, float] = {}
+
+    with _startup_phase(timings, "config"):
+        config_obj = config_class or get_config()
+        app = Flask(__name__, static_folder=getattr(config_obj, "STATIC_FOLDER", None) or str(STATIC_DIR))
+        app.config.from_object(config_obj)
+
+    with _startup_phase(timings, "observability"):
+        _init_observability(app)
+
+    with _startup_phase(timings, "extensions"):
+        CORS(app, resources={r"/api/*": {"origins": "*"}})
+        db.init_app(app)
+        init_read_replica(app)
+        init_admission(app)
+        init_password_hashing(app)
+        init_compression(app)
+        init_idempotency(app)
+        init_stripe_gateway(app)
+        init_surge(app)
+        init_ride_scheduler(app)
+        _init_migrations(app)
+
+    with _startup_phase(timings, "schema_check"):
+        _bootstrap_filesystem(app)
+
+    with _startup_phase(timings, "blueprints"):
+        app.register_blueprint(auth_bp, url_prefix='/api')
+        app.register_blueprint(ride_bp, url_prefix='/api')
+        app.register_blueprint(driver_bp, url_prefix='/api')
+        app.register_blueprint(user_bp, url_prefix='/api')
+        app.register_blueprint(payments_bp, url_prefix='/api')
+        app.register_blueprint(admin_bp, url_prefix='/api')
+        app.register_blueprint(v2_bp, url_prefix='/api/v2')
+        _register_commands(app)
+
+    with _startup_phase(timings, "static_manifest"):
+        _register_static_routes(app)
+
+    app.extensions["startup_timings"] = timings
+    app.logger.info(
+        "create_app finished in %.1fms (%s)",
+        sum(timings.values()),
+        ", ".join(f"{phase}={duration:.1f}ms" for phase, duration in timings.items()),
+    )
 
-    _bootstrap_filesystem(app)
+    return app
 
-    app.register_blueprint(auth_bp, url_prefix='/api')
-    app.register_blueprint(ride_bp, url_prefix='/api')
-    app.register_blueprint(driver_bp, url_prefix='/api')
-    app.register_blueprint(user_bp, url_prefix='/api')
-    app.register_blueprint(payments_bp, url_prefix='/api')
-    app.register_blueprint(admin_bp, url_prefix='/api')
 
-    _register_static_routes(app)
-
-    return app
+@contextmanager
+def _startup_phase(timings: Dict[str, float], phase: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[phase] = round((time.perf_counter() - started) * 1000, 3)
 
 
 def _init_observability(app: Flask) -> None:
@@ -67,12 +116,18 @@ def _init_observability(app: Flask) -> None:
     _configure_logging(app)
     _init_sentry(app)
     _init_metrics(app)
+    init_query_metrics(app)
+    init_profiling(app)
 
 
 def _configure_logging(app: Flask) -> None:
     """Initialise structured logging for the application."""
 
+    global _LOGGING_CONFIGURED_LEVEL
     log_level = app.config.get("LOG_LEVEL", "INFO").upper()
+    # dictConfig rebuilds every handler; skip it when nothing would change.
+    if _LOGGING_CONFIGURED_LEVEL == log_level:
+        return
     dictConfig(
         {
             "version": 1,
@@ -95,6 +150,7 @@ def _configure_logging(app: Flask) -> None:
             },
         }
     )
+    _LOGGING_CONFIGURED_LEVEL = log_level
     logging.getLogger(__name__).debug("Logging configured with level %s", log_level)
 
 
@@ -113,6 +169,10 @@ def _init_sentry(app: Flask) -> None:
         or "production"
     )
 
+    # Imported here so deployments without Sentry never pay for the SDK import.
+    from sentry_sdk import init as sentry_init
+    from sentry_sdk.integrations.flask import FlaskIntegration
+
     sentry_init(
         dsn=dsn,
         integrations=[FlaskIntegration()],
@@ -128,24 +188,24 @@ def _init_metrics(app: Flask) -> None:
     """Expose Prometheus metrics and instrument request lifecycle."""
 
     global _REQUEST_LATENCY, _REQUEST_COUNT
-    if _REQUEST_LATENCY is not None and _REQUEST_COUNT is not None:
-        return
-
-    namespace = (app.config.get("METRICS_NAMESPACE") or "kos_taxi").replace("-", "_")
-
-    _REQUEST_LATENCY = Histogram(
-        "http_request_duration_seconds",
-        "Time spent processing HTTP requests.",
-        ("method", "endpoint"),
-        namespace=namespace,
-        buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
-    )
-    _REQUEST_COUNT = Counter(
-        "http_requests_total",
-        "Total number of HTTP requests.",
-        ("method", "endpoint", "http_status"),
-        namespace=namespace,
-    )
+    # Collectors live in the process-wide registry, so only create them once;
+    # the hooks and route below still need registering on every app instance.
+    if _REQUEST_LATENCY is None or _REQUEST_COUNT is None:
+        namespace = (app.config.get("METRICS_NAMESPACE") or "kos_taxi").replace("-", "_")
+
+        _REQUEST_LATENCY = Histogram(
+            "http_request_duration_seconds",
+            "Time spent processing HTTP requests.",
+            ("method", "endpoint"),
+            namespace=namespace,
+            buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+        )
+        _REQUEST_COUNT = Counter(
+            "http_requests_total",
+            "Total number of HTTP requests.",
+            ("method", "endpoint", "http_status"),
+            namespace=namespace,
+        )
 
     @app.before_request
     def _metrics_before_request() -> None:  # pragma: no cover - flask hook
@@ -163,48 +223,161 @@ def _init_metrics(app: Flask) -> None:
 
     @app.route("/metrics")
     def metrics() -> Response:
-        payload = generate_latest()
+        payload = render_latest()
         return Response(payload, mimetype=CONTENT_TYPE_LATEST)
 
 
+def _init_migrations(app: Flask) -> None:
+    """Wire Flask-Migrate for the ``flask db`` commands.
+
+    Alembic is one of the most expensive imports in the app, and only the
+    Flask CLI can use it, so it is skipped for WSGI workers and tests.
+    """
+
+    if os.environ.get("FLASK_RUN_FROM_CLI") != "true":
+        return
+
+    from flask_migrate import Migrate
+
+    Migrate(app, db, directory=str(MIGRATIONS_DIR))
+
+
 def _bootstrap_filesystem(app: Flask) -> None:
-    """Ensure required directories and database migrations are initialised."""
+    """Ensure required directories exist and the database schema is current."""
 
-    STATIC_DIR.mkdir(parents=True, exist_ok=True)
+    Path(app.static_folder or STATIC_DIR).mkdir(parents=True, exist_ok=True)
     DATABASE_DIR.mkdir(parents=True, exist_ok=True)
 
     with app.app_context():
-        if not MIGRATIONS_DIR.exists():
-            app.logger.info(
-                "Migrations directory missing at %s. Run 'flask db init --directory %s' "
-                "to initialise Alembic before creating migrations.",
-                MIGRATIONS_DIR,
-                MIGRATIONS_DIR,
-            )
-
-        db.create_all()
+        if schema_is_current():
+            return
+
+        if app.config.get("SCHEMA_AUTO_CREATE"):
+            try:
+                version = ensure_schema()
+            except SchemaDriftError as exc:
+                app.logger.warning(
+                    "Existing tables differ from the models and need a migration (%s). "
+                    "Run 'flask db upgrade' once Alembic migrations exist in %s.",
+                    exc,
+                    MIGRATIONS_DIR,
+                )
+                return
+            app.logger.info("Database schema is at version %s", version)
+            return
+
+        app.logger.warning(
+            "Database schema is missing or out of date. Run 'flask --app src.main init-db' "
+            "(or 'flask db upgrade' once Alembic migrations exist in %s).",
+            MIGRATIONS_DIR,
+        )
+
+
+def _register_commands(app: Flask) -> None:
+    """Register maintenance CLI commands."""
+
+    @app.cli.command("init-db")
+    @click.option(
+        "--rebuild-autoincrement",
+        is_flag=True,
+        help="First rebuild SQLite tables created without AUTOINCREMENT, keeping their rows.",
+    )
+    def init_db_command(rebuild_autoincrement: bool) -> None:
+        """Create missing tables and indexes and record the schema version."""
+
+        if rebuild_autoincrement:
+            for name in rebuild_autoincrement_tables():
+                click.echo(f"Rebuilt {name} with AUTOINCREMENT")
+        try:
+            version = ensure_schema()
+        except SchemaDriftError as exc:
+            raise click.ClickException(
+                f"Existing tables need a migration before the schema version can be recorded: {exc}"
+            ) from exc
+        click.echo(f"Database schema is at version {version}")
+
+    @app.cli.command("rollups-rebuild")
+    def rollups_rebuild_command() -> None:
+        """Recompute the hourly/daily ride rollups from live and archived rides."""
+
+        rides = rebuild_rollups()
+        click.echo(f"Rebuilt ride rollups from {rides} rides")
+
+    @app.cli.command("archive-rides")
+    @click.option("--older-than-days", type=float, default=None, help="Defaults to RIDE_ARCHIVE_AFTER_DAYS.")
+    @click.option("--batch-size", type=int, default=None, help="Defaults to RIDE_ARCHIVE_BATCH_SIZE.")
+    def archive_rides_command(older_than_days: Optional[float], batch_size: Optional[int]) -> None:
+        """Move finished rides, their payments and events into the archive tables."""
+
+        days = older_than_days if older_than_days is not None else app.config["RIDE_ARCHIVE_AFTER_DAYS"]
+        result = archive_finished_rides(
+            timedelta(days=days),
+            batch_size=batch_size or app.config["RIDE_ARCHIVE_BATCH_SIZE"],
+        )
+        click.echo(
+            f"Archived {result.rides} rides, {result.payments} payments and "
+            f"{result.events} events in {result.batches} batches"
+        )
+
+    @app.cli.command("replica-sync")
+    @click.option("--interval", type=float, default=0, help="Keep syncing every N seconds (0 = once).")
+    def replica_sync_command(interval: float) -> None:
+        """Copy a SQLite primary onto the SQLite stand-in replica (local testing only)."""
+
+        replica_url = app.config.get("DATABASE_REPLICA_URL")
+        if not replica_url:
+            raise click.ClickException("DATABASE_REPLICA_URL is not set")
+        while True:
+            sync_sqlite_replica(app.config["SQLALCHEMY_DATABASE_URI"], replica_url)
+            click.echo(f"Synced replica {replica_url}")
+            if interval <= 0:
+                return
+            time.sleep(interval)
 
 
 def _register_static_routes(app: Flask) -> None:
-    """Register routes for serving the built frontend assets."""
+    """Register routes for serving the built frontend assets from a startup manifest."""
+
+    static_folder_path = Path(app.static_folder or STATIC_DIR)
+    memory_limit = int(app.config.get("STATIC_MEMORY_CACHE_MAX_BYTES", 64 * 1024))
+    default_max_age = int(app.config.get("STATIC_DEFAULT_MAX_AGE", 3600))
+    auto_reload = bool(app.config.get("STATIC_MANIFEST_AUTO_RELOAD", app.debug))
+    state = {
+        "manifest": AssetManifest.build(static_folder_path, memory_limit=memory_limit),
+        "mtime": _static_mtime(static_folder_path),
+    }
+
+    def _current_manifest() -> AssetManifest:
+        if auto_reload:
+            mtime = _static_mtime(static_folder_path)
+            if mtime != state["mtime"]:
+                state["manifest"] = AssetManifest.build(static_folder_path, memory_limit=memory_limit)
+                state["mtime"] = mtime
+        return state["manifest"]
 
     @app.route('/', defaults={'path': ''})
     @app.route('/<path:path>')
     def serve_frontend(path: str):
-        static_folder_path = Path(app.static_folder or STATIC_DIR)
-        if not static_folder_path.exists():
+        manifest = _current_manifest()
+        if not manifest.root.exists():
             app.logger.error("Static assets directory missing: %s", static_folder_path)
             return "Static assets not found", 404
 
-        requested_path = static_folder_path / path
-        if path and requested_path.exists():
-            return send_from_directory(static_folder_path, path)
+        if path and manifest.get(path) is not None:
+            return serve_asset(manifest, path, default_max_age=default_max_age)
 
-        index_path = static_folder_path / 'index.html'
-        if index_path.exists():
-            return send_from_directory(static_folder_path, 'index.html')
+        if manifest.get(INDEX_FILE) is not None:
+            return serve_asset(manifest, INDEX_FILE, default_max_age=default_max_age)
 
         return "index.html not found", 404
 
 
-__all__ = ["create_app", "migrate", "db"]
+def _static_mtime(path: Path) -> Optional[int]:
+    # Every frontend build rewrites index.html, so its mtime tracks the whole tree.
+    try:
+        return (path / INDEX_FILE).stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+__all__ = ["create_app", "db"]
@@ -21,6 +21,12 @@ class Config:
         "DATABASE_URL", f"sqlite:///{DATABASE_DIR / 'app.db'}"
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Optional read replica for dashboards and list endpoints; clients that just wrote
+    # keep reading from the primary for REPLICA_STICKY_SECONDS
+    DATABASE_REPLICA_URL = os.environ.get("DATABASE_REPLICA_URL")
+    REPLICA_STICKY_SECONDS = float(os.environ.get("REPLICA_STICKY_SECONDS", 5))
+    # When False, start-up only checks the schema version; run 'flask init-db' to create tables.
+    SCHEMA_AUTO_CREATE = os.environ.get("SCHEMA_AUTO_CREATE", "false").lower() in {"1", "true", "yes"}
 
     JWT_SECRET_KEY = os.environ.get("JWT_SECRET_KEY", SECRET_KEY)
     JWT_ACCESS_TOKEN_EXPIRES = int(os.environ.get("JWT_ACCESS_TOKEN_EXPIRES", 15 * 60))
@@ -28,18 +34,109 @@ class Config:
         os.environ.get("JWT_REFRESH_TOKEN_EXPIRES", 7 * 24 * 60 * 60)
     )
 
+    # Production server (python -m src.serve); WEB_CONCURRENCY defaults to 2 x CPUs + 1
+    WEB_BIND = os.environ.get("WEB_BIND", "0.0.0.0:5000")
+    WEB_CONCURRENCY = int(os.environ.get("WEB_CONCURRENCY", 0))
+    WEB_THREADS = int(os.environ.get("WEB_THREADS", 4))
+    WEB_KEEPALIVE = int(os.environ.get("WEB_KEEPALIVE", 5))
+    WEB_TIMEOUT = int(os.environ.get("WEB_TIMEOUT", 30))
+    WEB_GRACEFUL_TIMEOUT = int(os.environ.get("WEB_GRACEFUL_TIMEOUT", 30))
+    WEB_MAX_REQUESTS = int(os.environ.get("WEB_MAX_REQUESTS", 0))
+    WEB_MAX_REQUESTS_JITTER = int(os.environ.get("WEB_MAX_REQUESTS_JITTER", 0))
+
+    # Frontend asset serving
+    STATIC_FOLDER = os.environ.get("STATIC_FOLDER")
+    STATIC_MEMORY_CACHE_MAX_BYTES = int(os.environ.get("STATIC_MEMORY_CACHE_MAX_BYTES", 64 * 1024))
+    STATIC_DEFAULT_MAX_AGE = int(os.environ.get("STATIC_DEFAULT_MAX_AGE", 3600))
+
+    # Surge pricing: per-zone sliding windows of ride requests vs. driver availability pings
+    SURGE_ENABLED = os.environ.get("SURGE_ENABLED", "false").lower() in {"1", "true", "yes"}
+    SURGE_WINDOW_SECONDS = float(os.environ.get("SURGE_WINDOW_SECONDS", 600))
+    SURGE_SLOT_SECONDS = float(os.environ.get("SURGE_SLOT_SECONDS", 30))
+    SURGE_MAX_MULTIPLIER = float(os.environ.get("SURGE_MAX_MULTIPLIER", 2.5))
+    SURGE_SENSITIVITY = float(os.environ.get("SURGE_SENSITIVITY", 0.5))
+    SURGE_SMOOTHING = float(os.environ.get("SURGE_SMOOTHING", 0.3))
+    SURGE_DRIVER_PING_SECONDS = float(os.environ.get("SURGE_DRIVER_PING_SECONDS", 30))
+    SURGE_MIN_DRIVERS = float(os.environ.get("SURGE_MIN_DRIVERS", 1))
+    SURGE_MIN_REQUESTS = float(os.environ.get("SURGE_MIN_REQUESTS", 5))
+
+    # Rides booked further ahead than this are held as "scheduled" and released on time
+    RIDE_SCHEDULER_ENABLED = os.environ.get("RIDE_SCHEDULER_ENABLED", "true").lower() in {"1", "true", "yes"}
+    RIDE_RELEASE_LEAD_MINUTES = float(os.environ.get("RIDE_RELEASE_LEAD_MINUTES", 30))
+
+    # Dynamic responses: encodings in preference order (br/zstd need the optional brotli/zstandard packages)
+    COMPRESSION_ENABLED = os.environ.get("COMPRESSION_ENABLED", "true").lower() in {"1", "true", "yes"}
+    COMPRESSION_ENCODINGS = os.environ.get("COMPRESSION_ENCODINGS", "br,zstd,gzip")
+    COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", 1024))
+    COMPRESSION_LEVEL = int(os.environ.get("COMPRESSION_LEVEL", 6))
+
+    # Largest partner booking accepted by POST /rides/bulk
+    RIDE_BULK_MAX_ITEMS = int(os.environ.get("RIDE_BULK_MAX_ITEMS", 100))
+
+    # Signed quotes from /rides/estimate are honoured by POST /rides for this long
+    FARE_QUOTE_TTL_SECONDS = int(os.environ.get("FARE_QUOTE_TTL_SECONDS", 300))
+
+    # Responses to requests carrying an Idempotency-Key are replayed for this long
+    IDEMPOTENCY_TTL_SECONDS = float(os.environ.get("IDEMPOTENCY_TTL_SECONDS", 24 * 3600))
+    # Duplicates wait this long for the first request; a claim older than the lock is taken over
+    IDEMPOTENCY_WAIT_SECONDS = float(os.environ.get("IDEMPOTENCY_WAIT_SECONDS", 10))
+    IDEMPOTENCY_LOCK_SECONDS = float(os.environ.get("IDEMPOTENCY_LOCK_SECONDS", 60))
+
+    # Token buckets per client: "<endpoint>=<count>/<second|minute|hour>;..."
+    RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "true").lower() in {"1", "true", "yes"}
+    RATE_LIMITS = os.environ.get(
+        "RATE_LIMITS",
+        "ride.estimate_ride=60/minute;ride.create_ride_request=10/minute;"
+        "ride.request_ride=10/minute;ride.create_ride_batch=5/minute;auth.driver_login=10/minute",
+    )
+    # Comma-separated X-API-Key values that get their own bucket; other keys are ignored
+    PARTNER_API_KEYS = os.environ.get("PARTNER_API_KEYS", "")
+    # Empty keeps buckets per process; sqlite:///path shares them between workers on one host
+    RATE_LIMIT_STORAGE_URL = os.environ.get("RATE_LIMIT_STORAGE_URL", "")
+    # Shed load with 503s past these thresholds (0 disables each check)
+    LOAD_SHED_MAX_IN_FLIGHT = int(os.environ.get("LOAD_SHED_MAX_IN_FLIGHT", 0))
+    LOAD_SHED_MAX_QUEUE_MS = float(os.environ.get("LOAD_SHED_MAX_QUEUE_MS", 0))
+    LOAD_SHED_RETRY_AFTER = int(os.environ.get("LOAD_SHED_RETRY_AFTER", 1))
+
+    # Finished rides older than this move to the *_archive tables via `flask archive-rides`
+    RIDE_ARCHIVE_AFTER_DAYS = float(os.environ.get("RIDE_ARCHIVE_AFTER_DAYS", 90))
+    RIDE_ARCHIVE_BATCH_SIZE = int(os.environ.get("RIDE_ARCHIVE_BATCH_SIZE", 500))
+
+    # Password hashing runs in a bounded process pool; 0 workers hashes inline.
+    PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", 2))
+    PASSWORD_HASH_MAX_PENDING = int(os.environ.get("PASSWORD_HASH_MAX_PENDING", 8))
+    PASSWORD_HASH_RETRY_AFTER = int(os.environ.get("PASSWORD_HASH_RETRY_AFTER", 1))
+
     # Logging & observability
     LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
     SENTRY_DSN = os.environ.get("SENTRY_DSN")
     SENTRY_TRACES_SAMPLE_RATE = float(os.environ.get("SENTRY_TRACES_SAMPLE_RATE", 0.1))
     SENTRY_PROFILES_SAMPLE_RATE = float(os.environ.get("SENTRY_PROFILES_SAMPLE_RATE", 0.0))
     METRICS_NAMESPACE = os.environ.get("METRICS_NAMESPACE", "kos_taxi")
+    # Read by prometheus_client at import time; listed here for visibility only.
+    PROMETHEUS_MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    SLOW_QUERY_THRESHOLD_MS = float(os.environ.get("SLOW_QUERY_THRESHOLD_MS", 200))
+    SLOW_QUERY_EXPLAIN = os.environ.get("SLOW_QUERY_EXPLAIN", "true").lower() in {"1", "true", "yes"}
+    PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "false").lower() in {"1", "true", "yes"}
+    PROFILING_SECRET = os.environ.get("PROFILING_SECRET")
+    PROFILE_DIR = os.environ.get("PROFILE_DIR", str(BASE_DIR / "profiles"))
+    PROFILE_TOKEN_MAX_AGE = int(os.environ.get("PROFILE_TOKEN_MAX_AGE", 3600))
+    PROFILE_SAMPLING_HZ = float(os.environ.get("PROFILE_SAMPLING_HZ", 0))
 
     # Stripe configuration - values must be supplied via environment variables
     STRIPE_SECRET_KEY = os.environ.get("STRIPE_SECRET_KEY")
     STRIPE_PUBLISHABLE_KEY = os.environ.get("STRIPE_PUBLISHABLE_KEY")
     STRIPE_WEBHOOK_SECRET = os.environ.get("STRIPE_WEBHOOK_SECRET")
 
+    # Stripe API client: timeouts, retries with jitter and the circuit breaker
+    STRIPE_CONNECT_TIMEOUT_SECONDS = float(os.environ.get("STRIPE_CONNECT_TIMEOUT_SECONDS", 3))
+    STRIPE_READ_TIMEOUT_SECONDS = float(os.environ.get("STRIPE_READ_TIMEOUT_SECONDS", 10))
+    STRIPE_MAX_RETRIES = int(os.environ.get("STRIPE_MAX_RETRIES", 2))
+    STRIPE_RETRY_BACKOFF_SECONDS = float(os.environ.get("STRIPE_RETRY_BACKOFF_SECONDS", 0.25))
+    STRIPE_HTTP_POOL_SIZE = int(os.environ.get("STRIPE_HTTP_POOL_SIZE", 10))
+    STRIPE_BREAKER_THRESHOLD = int(os.environ.get("STRIPE_BREAKER_THRESHOLD", 5))
+    STRIPE_BREAKER_RESET_SECONDS = float(os.environ.get("STRIPE_BREAKER_RESET_SECONDS", 30))
+
     # Notification providers configuration
     NOTIFICATIONS_EMAIL_PROVIDER = os.environ.get(
         "NOTIFICATIONS_EMAIL_PROVIDER", "console"
@@ -61,6 +158,7 @@ class Config:
 
 class DevelopmentConfig(Config):
     DEBUG = True
+    SCHEMA_AUTO_CREATE = os.environ.get("SCHEMA_AUTO_CREATE", "true").lower() in {"1", "true", "yes"}
 
 
 class ProductionConfig(Config):
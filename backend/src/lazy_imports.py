@@ -0,0 +1,31 @@
+"""Deferred imports for heavy SDKs that most requests never touch."""
+from __future__ import annotations
+
+import importlib.util
+import sys
+from types import ModuleType
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Return ``name`` as a module whose body executes on first attribute access.
+
+    Used for SDKs such as ``stripe`` whose import cost dominates worker start-up
+    but which only a few code paths need.
+    """
+
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"No module named {name!r}")
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+__all__ = ["lazy_import"]
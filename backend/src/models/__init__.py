@@ -3,8 +3,10 @@ from __future__ import annotations
 
 from flask_sqlalchemy import SQLAlchemy
 
+from .session import RoutingSession
+
 # Single shared SQLAlchemy instance used across the application.
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 
 from .payment import Payment  # noqa: E402  # Import after db is defined
 
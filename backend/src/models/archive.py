@@ -0,0 +1,65 @@
+"""Archive tables for finished rides moved out of the hot ``rides`` table."""
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Index, Table
+
+from . import db
+from .payment import Payment
+from .ride import Ride, RideEvent
+
+
+def _archive_table(source: Table, name: str) -> Table:
+    """Copy ``source``'s columns (without foreign keys) plus an ``archived_at`` stamp."""
+
+    columns = []
+    for column in source.columns:
+        copied = column._copy()
+        copied.foreign_keys.clear()
+        copied.constraints.clear()
+        columns.append(copied)
+    columns.append(Column("archived_at", DateTime, nullable=False, default=datetime.utcnow))
+    return Table(name, db.metadata, *columns)
+
+
+class ArchivedRide(db.Model):
+    """Read-only view of an archived ride; serialises exactly like :class:`Ride`."""
+
+    __table__ = _archive_table(Ride.__table__, "rides_archive")
+
+    payment = db.relationship(
+        "ArchivedPayment",
+        primaryjoin="ArchivedRide.id == foreign(ArchivedPayment.ride_id)",
+        uselist=False,
+        viewonly=True,
+    )
+
+    SPARSE_FIELDS = Ride.SPARSE_FIELDS
+    to_dict = Ride.to_dict
+
+
+Index(
+    "ix_rides_archive_driver_id_created_at_id",
+    ArchivedRide.__table__.c.driver_id,
+    ArchivedRide.__table__.c.created_at,
+    ArchivedRide.__table__.c.id,
+)
+
+
+class ArchivedPayment(db.Model):
+    __table__ = _archive_table(Payment.__table__, "payments_archive")
+
+    metadata_json = __table__.c.metadata
+
+    amount_eur = Payment.amount_eur
+    to_dict = Payment.to_dict
+
+
+class ArchivedRideEvent(db.Model):
+    __table__ = _archive_table(RideEvent.__table__, "ride_events_archive")
+
+    to_dict = RideEvent.to_dict
+
+
+__all__ = ["ArchivedPayment", "ArchivedRide", "ArchivedRideEvent"]
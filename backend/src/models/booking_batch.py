@@ -0,0 +1,77 @@
+"""Rides booked together by a partner through ``POST /rides/bulk``."""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import update
+
+from . import db
+from .ride import Ride
+
+
+class BookingBatch(db.Model):
+    """One partner booking covering several rides, paid with a single payment intent.
+
+    The batch's rides carry its intent id in ``Ride.payment_intent_id``, so
+    webhook updates reach them with one ``UPDATE``.
+    """
+
+    __tablename__ = "booking_batches"
+
+    id = db.Column(db.Integer, primary_key=True)
+    partner_name = db.Column(db.String(120), nullable=True)
+    partner_email = db.Column(db.String(120), nullable=True)
+    partner_phone = db.Column(db.String(30), nullable=True)
+    ride_count = db.Column(db.Integer, nullable=False)
+    amount = db.Column(db.Integer, nullable=False)  # Smallest currency unit (cents)
+    currency = db.Column(db.String(10), nullable=False, default="eur")
+    stripe_payment_intent_id = db.Column(db.String(120), nullable=True, index=True)
+    client_secret = db.Column(db.String(255), nullable=True)
+    payment_status = db.Column(db.String(50), nullable=False, default="requires_payment_method")
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @classmethod
+    def for_ride(cls, ride: Ride) -> Optional["BookingBatch"]:
+        """The batch whose payment intent covers ``ride``, if it was bulk-booked."""
+
+        if ride.payment is not None or not ride.payment_intent_id:
+            return None
+        return cls.query.filter_by(stripe_payment_intent_id=ride.payment_intent_id).first()
+
+    @property
+    def is_placeholder(self) -> bool:
+        return bool(self.client_secret and self.client_secret.endswith("_secret_placeholder"))
+
+    def update_from_intent(self, intent: Dict[str, Any]) -> None:
+        """Apply the intent's status to the batch and all of its rides (no commit)."""
+
+        self.payment_status = intent.get("status", self.payment_status)
+        self.client_secret = intent.get("client_secret") or self.client_secret
+        db.session.execute(
+            update(Ride)
+            .where(Ride.payment_intent_id == self.stripe_payment_intent_id)
+            .values(payment_status=self.payment_status)
+        )
+
+    def to_dict(self, include_client_secret: bool = False) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {
+            "id": self.id,
+            "partner_name": self.partner_name,
+            "partner_email": self.partner_email,
+            "partner_phone": self.partner_phone,
+            "ride_count": self.ride_count,
+            "amount": self.amount,
+            "amount_eur": round(self.amount / 100, 2),
+            "currency": self.currency,
+            "payment_intent_id": self.stripe_payment_intent_id,
+            "status": self.payment_status,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
+        if include_client_secret:
+            payload["client_secret"] = self.client_secret
+        return payload
+
+
+__all__ = ["BookingBatch"]
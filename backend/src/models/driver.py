@@ -4,17 +4,16 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Any, Dict
 
-from passlib.context import CryptContext
+from src.services.password_hashing import hash_password, verify_password
 
 from . import db
 
-_pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 
 class Driver(db.Model):
     """Represents a driver that can accept ride requests."""
 
     __tablename__ = "drivers"
+    __table_args__ = (db.Index("ix_drivers_created_at_id", "created_at", "id"),)
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -30,19 +29,39 @@ class Driver(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     last_login_at = db.Column(db.DateTime, nullable=True)
 
-    rides = db.relationship("Ride", backref="driver", lazy=True)
+    # Dynamic so a driver's ride history is always queried (and paginated), never loaded whole.
+    rides = db.relationship("Ride", backref="driver", lazy="dynamic")
+
+    # Response keys selectable with ``?fields=``; never includes ``password_hash``.
+    SPARSE_FIELDS = {
+        name: name
+        for name in (
+            "id",
+            "name",
+            "email",
+            "phone",
+            "vehicle_model",
+            "vehicle_plate",
+            "is_available",
+            "current_lat",
+            "current_lon",
+            "created_at",
+            "updated_at",
+            "last_login_at",
+        )
+    }
 
     def set_password(self, password: str) -> None:
-        """Hash and store the provided password."""
+        """Hash and store the provided password using the bounded hashing pool."""
 
-        self.password_hash = _pwd_context.hash(password)
+        self.password_hash = hash_password(password)
 
     def check_password(self, password: str) -> bool:
         """Verify the provided password against the stored hash."""
 
         if not self.password_hash:
             return False
-        return _pwd_context.verify(password, self.password_hash)
+        return verify_password(password, self.password_hash)
 
     def to_dict(self) -> Dict[str, Any]:
         """Serialise the driver to a dictionary, excluding sensitive fields."""
@@ -0,0 +1,28 @@
+"""Stored outcomes of requests made with an ``Idempotency-Key`` header."""
+from __future__ import annotations
+
+from . import db
+
+
+class IdempotencyKey(db.Model):
+    """One client key per endpoint: claimed while running, then the stored response.
+
+    ``locked_until`` bounds how long an in-progress claim blocks duplicates, so
+    a worker that died mid-request does not wedge the key until it expires.
+    """
+
+    __tablename__ = "idempotency_keys"
+
+    scope = db.Column(db.String(100), primary_key=True)
+    key = db.Column(db.String(255), primary_key=True)
+    fingerprint = db.Column(db.String(64), nullable=False)
+    status = db.Column(db.String(16), nullable=False, default="in_progress")  # in_progress, completed
+    response_status = db.Column(db.Integer, nullable=True)
+    response_mimetype = db.Column(db.String(100), nullable=True)
+    response_body = db.Column(db.LargeBinary, nullable=True)
+    locked_until = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    created_at = db.Column(db.DateTime, nullable=False)
+
+
+__all__ = ["IdempotencyKey"]
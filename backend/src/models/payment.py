@@ -11,6 +11,8 @@ class Payment(db.Model):
     """Persisted record of a Stripe payment intent linked to a ride."""
 
     __tablename__ = "payments"
+    # Archived ids must never be handed out again, or the next archive run collides.
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id = db.Column(db.Integer, primary_key=True)
     ride_id = db.Column(db.Integer, db.ForeignKey("rides.id"), nullable=False, unique=True)
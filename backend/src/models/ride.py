@@ -9,6 +9,14 @@ if TYPE_CHECKING:  # pragma: no cover - import for typing only
 
 class Ride(db.Model):
     __tablename__ = 'rides'
+    __table_args__ = (
+        # Keyset pagination walks these newest first: all rides, per driver, per status.
+        db.Index('ix_rides_created_at_id', 'created_at', 'id'),
+        db.Index('ix_rides_driver_id_created_at_id', 'driver_id', 'created_at', 'id'),
+        db.Index('ix_rides_status_created_at_id', 'status', 'created_at', 'id'),
+        # Archived ids must never be handed out again, or the next archive run collides.
+        {'sqlite_autoincrement': True},
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     rider_name = db.Column(db.String(120), nullable=True)
@@ -24,7 +32,7 @@ class Ride(db.Model):
     dest_lon = db.Column(db.Float, nullable=True)
     dest_address = db.Column(db.String(200), nullable=False)
 
-    status = db.Column(db.String(20), default='pending')  # pending, accepted, in_progress, completed, cancelled
+    status = db.Column(db.String(20), default='pending')  # scheduled, pending, accepted, in_progress, completed, cancelled
     fare = db.Column(db.Float, nullable=False)
     distance_km = db.Column(db.Float, nullable=False)
     estimated_duration_minutes = db.Column(db.Integer, nullable=False, default=10)
@@ -38,6 +46,19 @@ class Ride(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Response keys selectable with ``?fields=``, mapped to the column backing each.
+    SPARSE_FIELDS = {
+        **{name: name for name in (
+            'id', 'rider_name', 'user_email', 'user_phone', 'driver_id',
+            'pickup_lat', 'pickup_lon', 'pickup_address', 'dest_lat', 'dest_lon', 'dest_address',
+            'status', 'fare', 'distance_km', 'estimated_duration_minutes', 'passenger_count',
+            'scheduled_time', 'notes', 'created_at', 'updated_at',
+        )},
+        'dropoff_address': 'dest_address',
+        'destination_address': 'dest_address',
+        'customer_phone': 'user_phone',
+    }
+
     payment = db.relationship(
         'Payment',
         back_populates='ride',
@@ -82,6 +103,38 @@ class Ride(db.Model):
         return payload
 
 
+class RideEvent(db.Model):
+    """Append-only record of a ride lifecycle transition.
+
+    The autoincrementing ``id`` doubles as the change-feed cursor, so it must
+    never be reused (hence ``sqlite_autoincrement``).
+    """
+
+    __tablename__ = 'ride_events'
+    __table_args__ = {'sqlite_autoincrement': True}
+
+    id = db.Column(db.Integer, primary_key=True)
+    ride_id = db.Column(db.Integer, db.ForeignKey('rides.id'), nullable=False, index=True)
+    event_type = db.Column(db.String(20), nullable=False)  # created, released, accepted, in_progress, completed, cancelled
+    from_status = db.Column(db.String(20), nullable=True)
+    to_status = db.Column(db.String(20), nullable=False)
+    driver_id = db.Column(db.Integer, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    ride = db.relationship('Ride')
+
+    def to_dict(self) -> dict:
+        return {
+            'id': self.id,
+            'ride_id': self.ride_id,
+            'event_type': self.event_type,
+            'from_status': self.from_status,
+            'to_status': self.to_status,
+            'driver_id': self.driver_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+        }
+
+
 class PricingConfig(db.Model):
     __tablename__ = 'pricing_config'
 
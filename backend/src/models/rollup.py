@@ -0,0 +1,37 @@
+"""Pre-aggregated ride metrics per hour and per day."""
+from __future__ import annotations
+
+from . import db
+
+
+class RideRollup(db.Model):
+    """Counters for one time bucket, incremented as rides change state.
+
+    Only additive quantities are stored; averages and utilisation are derived
+    on read so concurrent increments never need a read-modify-write.
+    """
+
+    __tablename__ = "ride_rollups"
+
+    bucket = db.Column(db.String(8), primary_key=True)  # hour, day
+    bucket_start = db.Column(db.DateTime, primary_key=True)
+    rides_created = db.Column(db.Integer, nullable=False, default=0)
+    rides_completed = db.Column(db.Integer, nullable=False, default=0)
+    rides_cancelled = db.Column(db.Integer, nullable=False, default=0)
+    revenue_eur = db.Column(db.Float, nullable=False, default=0.0)
+    distance_km = db.Column(db.Float, nullable=False, default=0.0)
+    busy_minutes = db.Column(db.Float, nullable=False, default=0.0)
+    active_drivers = db.Column(db.Integer, nullable=False, default=0)
+
+
+class RideRollupDriver(db.Model):
+    """Drivers already counted in ``RideRollup.active_drivers`` for a bucket."""
+
+    __tablename__ = "ride_rollup_drivers"
+
+    bucket = db.Column(db.String(8), primary_key=True)
+    bucket_start = db.Column(db.DateTime, primary_key=True)
+    driver_id = db.Column(db.Integer, primary_key=True)
+
+
+__all__ = ["RideRollup", "RideRollupDriver"]
@@ -0,0 +1,184 @@
+"""Schema version bookkeeping so start-up can skip ``create_all``."""
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import func, inspect, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.schema import CreateTable
+
+from . import db
+
+
+class SchemaDriftError(RuntimeError):
+    """Existing tables differ from the models in ways ``create_all`` cannot fix."""
+
+    def __init__(self, differences: List[str]) -> None:
+        super().__init__("; ".join(differences))
+        self.differences = differences
+
+
+class SchemaVersion(db.Model):
+    """Single-row table recording the model fingerprint the database was built from."""
+
+    __tablename__ = "schema_version"
+
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.String(64), nullable=False)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+def schema_fingerprint() -> str:
+    """Hash table options, column and index definitions of every registered model."""
+
+    digest = hashlib.sha1()
+    for table in db.metadata.sorted_tables:
+        digest.update(table.name.encode("utf-8"))
+        digest.update(f"|{sorted(table.kwargs.items())}".encode("utf-8"))
+        for column in table.columns:
+            digest.update(
+                f"|{column.name}:{column.type}:{column.nullable}:{column.primary_key}:{column.unique}".encode("utf-8")
+            )
+        for index in sorted(table.indexes, key=lambda index: index.name or ""):
+            columns = ",".join(column.name for column in index.columns)
+            digest.update(f"|{index.name}({columns}):{index.unique}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def schema_drift() -> List[str]:
+    """Describe how existing tables differ from the models (missing columns, nullability)."""
+
+    inspector = inspect(db.engine)
+    existing = set(inspector.get_table_names())
+    differences = []
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing:
+            continue
+        reflected = {column["name"]: column for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            found = reflected.get(column.name)
+            if found is None:
+                differences.append(f"{table.name}.{column.name} is missing")
+            elif not column.primary_key and bool(found["nullable"]) != bool(column.nullable):
+                differences.append(f"{table.name}.{column.name} should be {'NULL' if column.nullable else 'NOT NULL'}")
+    differences.extend(
+        f"{name} was created without AUTOINCREMENT; run 'flask --app src.main init-db --rebuild-autoincrement'"
+        for name in missing_autoincrement()
+    )
+    return differences
+
+
+def missing_autoincrement() -> List[str]:
+    """Names of existing SQLite tables declared ``sqlite_autoincrement`` but created without it."""
+
+    if db.engine.dialect.name != "sqlite":
+        return []
+    with db.engine.connect() as conn:
+        created = dict(conn.exec_driver_sql("SELECT name, sql FROM sqlite_master WHERE type = 'table'").all())
+    return [
+        table.name
+        for table in db.metadata.sorted_tables
+        if table.kwargs.get("sqlite_autoincrement")
+        and table.name in created
+        and "AUTOINCREMENT" not in (created[table.name] or "").upper()
+    ]
+
+
+def rebuild_autoincrement_tables() -> List[str]:
+    """Rebuild the tables :func:`missing_autoincrement` reports, keeping their rows.
+
+    SQLite cannot add AUTOINCREMENT to an existing table, so each one is copied
+    into a new table that is then renamed over it (SQLite's documented
+    ``ALTER TABLE`` procedure). The id sequence starts past every id in the
+    matching ``*_archive`` table, so archived ids are never handed out again.
+    """
+
+    names = missing_autoincrement()
+    if not names:
+        return []
+    with db.engine.connect() as conn:
+        # The pragma is ignored inside a transaction, so it is set (and restored) around one.
+        foreign_keys = conn.exec_driver_sql("PRAGMA foreign_keys").scalar()
+        conn.exec_driver_sql("PRAGMA foreign_keys = OFF")
+        conn.commit()
+        try:
+            with conn.begin():
+                for name in names:
+                    _rebuild_table(conn, db.metadata.tables[name])
+        finally:
+            conn.exec_driver_sql(f"PRAGMA foreign_keys = {'ON' if foreign_keys else 'OFF'}")
+            conn.commit()
+    return names
+
+
+def _rebuild_table(conn, table) -> None:
+    inspector = inspect(conn)
+    existing = {column["name"] for column in inspector.get_columns(table.name)}
+    columns = ", ".join(column.name for column in table.columns if column.name in existing)
+    staging = f"{table.name}_rebuild"
+    create = str(CreateTable(table).compile(dialect=conn.dialect))
+
+    conn.exec_driver_sql(f"DROP TABLE IF EXISTS {staging}")
+    conn.exec_driver_sql(create.replace(f"CREATE TABLE {table.name} ", f"CREATE TABLE {staging} ", 1))
+    conn.exec_driver_sql(f"INSERT INTO {staging} ({columns}) SELECT {columns} FROM {table.name}")
+    conn.exec_driver_sql(f"DROP TABLE {table.name}")
+    conn.exec_driver_sql(f"ALTER TABLE {staging} RENAME TO {table.name}")
+    for index in table.indexes:
+        index.create(conn)
+
+    sequence = conn.execute(select(func.max(table.c.id))).scalar() or 0
+    archive = db.metadata.tables.get(f"{table.name}_archive")
+    if archive is not None and inspector.has_table(archive.name):
+        sequence = max(sequence, conn.execute(select(func.max(archive.c.id))).scalar() or 0)
+    conn.exec_driver_sql("DELETE FROM sqlite_sequence WHERE name = ?", (table.name,))
+    conn.exec_driver_sql("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (table.name, sequence))
+
+
+def schema_is_current() -> bool:
+    """Return whether the database was created from the current models (one cheap query)."""
+
+    try:
+        stored = db.session.execute(select(SchemaVersion.version).limit(1)).scalar()
+    except SQLAlchemyError:
+        db.session.rollback()
+        return False
+    return stored == schema_fingerprint()
+
+
+def ensure_schema() -> str:
+    """Create missing tables and indexes and record the current fingerprint; return it.
+
+    Raises :class:`SchemaDriftError`, without recording anything, when existing
+    tables need a migration first.
+    """
+
+    differences = schema_drift()
+    if differences:
+        raise SchemaDriftError(differences)
+    db.create_all()
+    # create_all skips existing tables entirely, so indexes added later are created here.
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+    version = schema_fingerprint()
+    record = db.session.execute(select(SchemaVersion).limit(1)).scalar()
+    if record is None:
+        db.session.add(SchemaVersion(version=version))
+    else:
+        record.version = version
+    db.session.commit()
+    return version
+
+
+__all__ = [
+    "SchemaDriftError",
+    "SchemaVersion",
+    "ensure_schema",
+    "missing_autoincrement",
+    "rebuild_autoincrement_tables",
+    "schema_drift",
+    "schema_fingerprint",
+    "schema_is_current",
+]
@@ -0,0 +1,33 @@
+"""Session class that can send a request's reads to the read replica."""
+from __future__ import annotations
+
+from typing import Any
+
+from flask import current_app, g, has_request_context
+from flask_sqlalchemy.session import Session
+
+REPLICA_EXTENSION = "read_replica"
+
+
+class RoutingSession(Session):
+    """Uses the replica engine for reads while the current request has opted in.
+
+    Flushes and DML statements always go to the primary, so a view that
+    happens to write never writes to the replica.
+    """
+
+    def get_bind(self, mapper: Any = None, clause: Any = None, bind: Any = None, **kwargs: Any):
+        if (
+            bind is None
+            and not self._flushing
+            and has_request_context()
+            and g.get("_db_use_replica", False)
+            and not getattr(clause, "is_dml", False)
+        ):
+            engine = current_app.extensions.get(REPLICA_EXTENSION)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+__all__ = ["REPLICA_EXTENSION", "RoutingSession"]
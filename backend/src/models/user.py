@@ -5,6 +5,8 @@ class User(db.Model):
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
 
+    SPARSE_FIELDS = {'id': 'id', 'username': 'username', 'email': 'email'}
+
     def __repr__(self):
         return f'<User {self.username}>'
 
@@ -1,32 +1,75 @@
 """Administrative data endpoints for internal dashboards."""
 from __future__ import annotations
 
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 
-from flask import Blueprint, jsonify, request
-from sqlalchemy import func
+from flask import Blueprint, Response, jsonify, request
+from sqlalchemy import func, or_
 
 from src.models import Payment, db
 from src.models.driver import Driver
+from src.models.archive import ArchivedPayment, ArchivedRide
 from src.models.ride import Ride
+from src.services.archive import include_archived_requested, newest_first
+from src.services.profiling import get_stack_sampler
+from src.services.read_models import driver_rows, payment_rows, ride_rows
+from src.services.read_replica import reads_from_replica
+from src.services.rollups import BUCKET_SIZES, MAX_SERIES_BUCKETS, METRICS, bucket_count, timeseries
 
 admin_bp = Blueprint('admin', __name__)
 
 
-def _apply_filters(query, ride_status: Optional[str], payment_status: Optional[str], driver_id: Optional[int]):
+def _apply_filters(
+    query,
+    ride_status: Optional[str],
+    payment_status: Optional[str],
+    driver_id: Optional[int],
+    ride_model=Ride,
+    payment_model=Payment,
+):
     if ride_status and ride_status.lower() != 'all':
-        query = query.filter(Ride.status == ride_status)
+        query = query.filter(ride_model.status == ride_status)
     if payment_status and payment_status.lower() != 'all':
         if payment_status == 'unpaid':
-            query = query.filter((Ride.payment == None) | (Payment.status != 'succeeded'))  # noqa: E711
+            query = query.filter(or_(payment_model.id.is_(None), payment_model.status != 'succeeded'))
         else:
-            query = query.join(Payment, isouter=True).filter(Payment.status == payment_status)
+            query = query.filter(payment_model.status == payment_status)
     if driver_id and driver_id > 0:
-        query = query.filter(Ride.driver_id == driver_id)
+        query = query.filter(ride_model.driver_id == driver_id)
     return query
 
 
+def _archived_overview(ride_status, payment_status, driver_id, rides, payments, totals):
+    """Fold archived rides and payments into an overview response."""
+
+    archived_rides = _apply_filters(
+        ride_rows(ArchivedRide, ArchivedPayment), ride_status, payment_status, driver_id, ArchivedRide, ArchivedPayment
+    )
+    rides = newest_first(rides, archived_rides.order_by(ArchivedRide.created_at.desc()).limit(200), limit=200)
+
+    archived_payments = payment_rows(ArchivedPayment)
+    if payment_status and payment_status.lower() != 'all':
+        archived_payments = archived_payments.filter(ArchivedPayment.status == payment_status)
+    payments = newest_first(
+        payments, archived_payments.order_by(ArchivedPayment.created_at.desc()).limit(200), limit=200
+    )
+
+    totals['rides_total'] += ArchivedRide.query.count()
+    totals['rides_completed'] += ArchivedRide.query.filter_by(status='completed').count()
+    totals['payments_succeeded'] += ArchivedPayment.query.filter_by(status='succeeded').count()
+    totals['payments_failed'] += ArchivedPayment.query.filter(ArchivedPayment.status != 'succeeded').count()
+    revenue = (
+        db.session.query(func.coalesce(func.sum(ArchivedPayment.amount), 0))
+        .filter(ArchivedPayment.status == 'succeeded')
+        .scalar()
+        or 0
+    )
+    return rides, payments, revenue
+
+
 @admin_bp.route('/admin/overview', methods=['GET'])
+@reads_from_replica
 def admin_overview():
     """Return ride, driver and payment summaries for admin dashboards."""
 
@@ -34,13 +77,12 @@ def admin_overview():
     payment_status = request.args.get('payment_status')
     driver_id = request.args.get('driver_id', type=int)
 
-    ride_query = Ride.query
-    ride_query = _apply_filters(ride_query, ride_status, payment_status, driver_id)
+    ride_query = _apply_filters(ride_rows(), ride_status, payment_status, driver_id)
     rides = ride_query.order_by(Ride.created_at.desc()).limit(200).all()
 
-    drivers = Driver.query.order_by(Driver.created_at.desc()).all()
+    drivers = driver_rows().order_by(Driver.created_at.desc()).all()
 
-    payment_query = Payment.query.join(Ride)
+    payment_query = payment_rows().filter(Payment.ride_id == Ride.id)
     if payment_status and payment_status.lower() != 'all':
         payment_query = payment_query.filter(Payment.status == payment_status)
     payments = payment_query.order_by(Payment.created_at.desc()).limit(200).all()
@@ -57,6 +99,12 @@ def admin_overview():
     revenue = (
         db.session.query(func.coalesce(func.sum(Payment.amount), 0)).filter(Payment.status == 'succeeded').scalar() or 0
     )
+    include_archived = include_archived_requested()
+    if include_archived:
+        rides, payments, archived_revenue = _archived_overview(
+            ride_status, payment_status, driver_id, rides, payments, totals
+        )
+        revenue += archived_revenue
     totals['revenue_eur'] = round(revenue / 100, 2)
 
     response = {
@@ -64,13 +112,68 @@ def admin_overview():
             'ride_status': ride_status or 'all',
             'payment_status': payment_status or 'all',
             'driver_id': driver_id or 0,
+            'include_archived': include_archived,
         },
         'rides': [ride.to_dict() for ride in rides],
         'drivers': [driver.to_dict() for driver in drivers],
-        'payments': [payment.to_dict(include_client_secret=False) for payment in payments],
+        'payments': [payment.to_dict() for payment in payments],
         'totals': totals,
     }
     return jsonify(response), 200
 
 
+def _parse_timestamp(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value[:-1] + '+00:00' if value.endswith('Z') else value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+@admin_bp.route('/admin/timeseries', methods=['GET'])
+@reads_from_replica
+def admin_timeseries():
+    """Return one rollup metric per hour or day between ``from`` and ``to`` (UTC)."""
+
+    metric = request.args.get('metric', 'rides_created')
+    bucket = request.args.get('bucket', 'hour')
+    if metric not in METRICS:
+        return jsonify({'error': 'Unknown metric', 'allowed_metrics': sorted(METRICS)}), 400
+    if bucket not in BUCKET_SIZES:
+        return jsonify({'error': 'Unknown bucket', 'allowed_buckets': sorted(BUCKET_SIZES)}), 400
+
+    try:
+        end = _parse_timestamp(request.args['to']) if request.args.get('to') else datetime.utcnow()
+        default_span = timedelta(days=1) if bucket == 'hour' else timedelta(days=30)
+        start = _parse_timestamp(request.args['from']) if request.args.get('from') else end - default_span
+    except ValueError:
+        return jsonify({'error': 'from and to must be ISO formatted timestamps'}), 400
+    if start > end:
+        return jsonify({'error': 'from must not be after to'}), 400
+    if bucket_count(bucket, start, end) > MAX_SERIES_BUCKETS:
+        return jsonify({'error': f'Range spans more than {MAX_SERIES_BUCKETS} buckets; use a larger bucket'}), 400
+
+    return jsonify({
+        'metric': metric,
+        'bucket': bucket,
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'points': timeseries(metric, bucket, start, end),
+    }), 200
+
+
+@admin_bp.route('/admin/profiling/flame', methods=['GET'])
+def profiling_flame():
+    """Return sampled stacks for an endpoint in collapsed (flamegraph/speedscope) format."""
+
+    sampler = get_stack_sampler()
+    if sampler is None:
+        return jsonify({'error': 'Stack sampling is not enabled'}), 404
+
+    endpoint = request.args.get('endpoint')
+    if not endpoint:
+        return jsonify({'endpoints': sampler.endpoints()}), 200
+
+    return Response(sampler.collapsed(endpoint), mimetype='text/plain'), 200
+
+
 __all__ = ['admin_bp']
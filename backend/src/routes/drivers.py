@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import List
+from typing import List, Sequence
 
 from flask import Blueprint, jsonify, request, g
 from sqlalchemy.exc import IntegrityError
@@ -10,7 +10,14 @@ from sqlalchemy.exc import IntegrityError
 from src.auth.decorators import jwt_required
 from src.models import db
 from src.models.driver import Driver
+from src.models.archive import ArchivedPayment, ArchivedRide
 from src.models.ride import Ride
+from src.services.archive import include_archived_requested
+from src.services.pagination import PaginationError, paginate_request
+from src.services.read_models import driver_rows, ride_rows
+from src.services.read_replica import reads_from_replica
+from src.services.ride_events import transition_ride
+from src.services.surge import record_driver_available
 
 
 driver_bp = Blueprint("driver", __name__)
@@ -71,11 +78,15 @@ def register_driver() -> tuple:
 
 
 @driver_bp.route("/drivers", methods=["GET"])
+@reads_from_replica
 def get_drivers() -> tuple:
-    """Return all registered drivers."""
+    """Return registered drivers, newest first, one keyset page at a time."""
 
-    drivers = Driver.query.order_by(Driver.created_at.desc()).all()
-    return jsonify({"drivers": [driver.to_dict() for driver in drivers]}), 200
+    try:
+        page = paginate_request([driver_rows()])
+    except PaginationError as exc:
+        return jsonify({"error": str(exc)}), 400
+    return jsonify(page.payload("drivers")), 200
 
 
 @driver_bp.route("/drivers/<int:driver_id>", methods=["GET"])
@@ -135,6 +146,8 @@ def update_driver_location(driver_id: int) -> tuple:
         driver.current_lat = float(data["lat"])
         driver.current_lon = float(data["lon"])
         db.session.commit()
+        if driver.is_available:
+            record_driver_available(driver.current_lat, driver.current_lon)
     except (KeyError, TypeError, ValueError):
         db.session.rollback()
         return jsonify({"error": "Invalid location data"}), 400
@@ -167,6 +180,8 @@ def toggle_driver_availability(driver_id: int) -> tuple:
     except Exception as exc:  # pragma: no cover
         db.session.rollback()
         return jsonify({"error": str(exc)}), 500
+    if driver.is_available:
+        record_driver_available(driver.current_lat, driver.current_lon)
 
     return (
         jsonify(
@@ -180,7 +195,19 @@ def toggle_driver_availability(driver_id: int) -> tuple:
     )
 
 
+def _ride_history(driver: Driver, statuses: Sequence[str] = ()) -> list:
+    """Queries for a driver's rides, plus archived ones with ``?include_archived=true``."""
+
+    queries = [ride_rows().filter(Ride.driver_id == driver.id)]
+    if include_archived_requested():
+        queries.append(ride_rows(ArchivedRide, ArchivedPayment).filter(ArchivedRide.driver_id == driver.id))
+    if statuses:
+        queries = [query.filter(model.status.in_(statuses)) for query, model in zip(queries, (Ride, ArchivedRide))]
+    return queries
+
+
 @driver_bp.route("/drivers/<int:driver_id>/rides", methods=["GET"])
+@reads_from_replica
 def get_driver_rides(driver_id: int) -> tuple:
     """Return rides for a given driver."""
 
@@ -188,8 +215,11 @@ def get_driver_rides(driver_id: int) -> tuple:
     if not driver:
         return jsonify({"error": "Driver not found"}), 404
 
-    rides = [ride.to_dict() for ride in driver.rides]
-    return jsonify({"driver_id": driver_id, "rides": rides}), 200
+    try:
+        page = paginate_request(_ride_history(driver))
+    except PaginationError as exc:
+        return jsonify({"error": str(exc)}), 400
+    return jsonify({"driver_id": driver_id, **page.payload("rides")}), 200
 
 
 @driver_bp.route("/drivers/me", methods=["GET"])
@@ -202,18 +232,19 @@ def get_current_driver() -> tuple:
 
 
 @driver_bp.route("/drivers/me/assigned-rides", methods=["GET"])
+@reads_from_replica
 @jwt_required
 def get_assigned_rides() -> tuple:
     """Return rides assigned to the authenticated driver."""
 
     driver: Driver = g.current_driver
     status_filter: List[str] = request.args.get("status", "").split(",")
-    query = Ride.query.filter(Ride.driver_id == driver.id)
     normalised_status = [status.strip() for status in status_filter if status.strip()]
-    if normalised_status:
-        query = query.filter(Ride.status.in_(normalised_status))
-    rides = query.order_by(Ride.created_at.desc()).all()
-    return jsonify({"rides": [ride.to_dict() for ride in rides]}), 200
+    try:
+        page = paginate_request(_ride_history(driver, normalised_status))
+    except PaginationError as exc:
+        return jsonify({"error": str(exc)}), 400
+    return jsonify(page.payload("rides")), 200
 
 
 @driver_bp.route("/drivers/me/rides/<int:ride_id>/accept", methods=["POST"])
@@ -229,8 +260,7 @@ def accept_assigned_ride(ride_id: int) -> tuple:
     if ride.status != "pending":
         return jsonify({"error": "Ride is not available"}), 400
 
-    ride.driver_id = driver.id
-    ride.status = "accepted"
+    transition_ride(ride, "accepted", driver_id=driver.id)
     driver.last_login_at = driver.last_login_at or datetime.utcnow()
 
     try:
@@ -267,7 +297,7 @@ def update_ride_status(ride_id: int) -> tuple:
     if status == "accepted" and ride.status != "pending":
         return jsonify({"error": "Ride cannot be re-accepted"}), 400
 
-    ride.status = status
+    transition_ride(ride, status)
     ride.updated_at = datetime.utcnow()
 
     try:
@@ -3,24 +3,16 @@ from __future__ import annotations
 
 from typing import Any, Dict
 
-import stripe
 from flask import Blueprint, current_app, jsonify, request
 
 from src.models import Payment, db
+from src.models.booking_batch import BookingBatch
 from src.models.ride import Ride
+from src.services.stripe_gateway import InvalidWebhookSignature, StripeGatewayError, get_stripe_gateway
 
 payments_bp = Blueprint('payments', __name__)
 
 
-def _configure_stripe() -> None:
-    secret_key = current_app.config.get('STRIPE_SECRET_KEY')
-    if secret_key:
-        stripe.api_key = secret_key
-    else:
-        stripe.api_key = None
-        current_app.logger.warning('STRIPE_SECRET_KEY missing; Stripe operations disabled.')
-
-
 @payments_bp.route('/payments/config', methods=['GET'])
 def get_payment_config():
     """Expose Stripe publishable key for the frontend."""
@@ -33,6 +25,17 @@ def get_payment_config():
     }), 200
 
 
+def _handle_batch_intent_event(payment_intent_id: str, intent_payload: Dict[str, Any]) -> bool:
+    """Update a bulk booking paid by ``payment_intent_id`` and all of its rides."""
+
+    batch = BookingBatch.query.filter_by(stripe_payment_intent_id=payment_intent_id).first()
+    if not batch:
+        return False
+    batch.update_from_intent(intent_payload)
+    db.session.commit()
+    return True
+
+
 def _handle_payment_intent_event(intent_payload: Dict[str, Any]) -> None:
     payment_intent_id = intent_payload.get('id')
     if not payment_intent_id:
@@ -40,6 +43,8 @@ def _handle_payment_intent_event(intent_payload: Dict[str, Any]) -> None:
         return
 
     payment = Payment.query.filter_by(stripe_payment_intent_id=payment_intent_id).first()
+    if not payment and _handle_batch_intent_event(payment_intent_id, intent_payload):
+        return
     if not payment:
         current_app.logger.warning('No payment record found for intent %s', payment_intent_id)
         return
@@ -67,11 +72,11 @@ def stripe_webhook():
     sig_header = request.headers.get('Stripe-Signature', '')
 
     try:
-        event = stripe.Webhook.construct_event(payload, sig_header, webhook_secret)
+        event = get_stripe_gateway().construct_event(payload, sig_header, webhook_secret)
     except ValueError:
         current_app.logger.error('Invalid payload received from Stripe webhook')
         return 'Invalid payload', 400
-    except stripe.error.SignatureVerificationError:
+    except InvalidWebhookSignature:
         current_app.logger.error('Invalid Stripe webhook signature')
         return 'Invalid signature', 400
 
@@ -97,20 +102,20 @@ def get_payment_for_ride(ride_id: int):
     if not ride.payment:
         return jsonify({'payment': None, 'payment_status': ride.payment_status or 'pending'}), 200
 
-    _configure_stripe()
     payment = ride.payment
 
-    if stripe.api_key and (not payment.metadata_json or payment.metadata_json.get('provider') != 'placeholder'):
+    gateway = get_stripe_gateway()
+    if gateway.configured and (not payment.metadata_json or payment.metadata_json.get('provider') != 'placeholder'):
         try:
-            intent = stripe.PaymentIntent.retrieve(payment.stripe_payment_intent_id)
+            intent = gateway.retrieve_payment_intent(payment.stripe_payment_intent_id)
             payment.update_from_intent(intent)
             payment.client_secret = intent.get('client_secret') or payment.client_secret
             ride.payment_status = payment.status
             ride.payment_intent_id = payment.stripe_payment_intent_id
             db.session.commit()
-        except stripe.error.StripeError as exc:
+        except StripeGatewayError as exc:
             current_app.logger.exception('Unable to refresh payment intent %s', payment.stripe_payment_intent_id)
-            return jsonify({'error': getattr(exc, 'user_message', str(exc))}), 502
+            return jsonify({'error': exc.user_message}), 502
 
     return jsonify({
         'payment': payment.to_dict(include_client_secret=True),
@@ -1,46 +1,58 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 from uuid import uuid4
 
-import stripe
 from flask import Blueprint, current_app, jsonify, request
+from sqlalchemy import insert, update
 
 from src.models import Payment, db
+from src.models.booking_batch import BookingBatch
 from src.models.ride import PricingConfig, Ride
 from src.services import (
     estimate_distance_km,
     estimate_duration_minutes,
     get_notification_service,
 )
+from src.services.archive import find_ride, include_archived_requested
+from src.services.fare_quotes import FareQuote, issue_quote, pricing_version, redeem_quote
+from src.services.idempotency import idempotent
+from src.services.read_models import ride_rows
+from src.services.read_replica import reads_from_replica
+from src.services.ride_events import (
+    DEFAULT_FEED_LIMIT,
+    changes_since,
+    record_ride_created,
+    record_rides_created,
+    transition_ride,
+)
+from src.services.ride_scheduler import SCHEDULED_STATUS, get_ride_scheduler
+from src.services.stripe_gateway import StripeGatewayError, get_stripe_gateway
+from src.services.surge import get_surge_engine, record_ride_request, surge_multiplier, zone_for_address
 
 ride_bp = Blueprint('ride', __name__)
 
 
-# Stripe configuration is sourced from the Flask app config at runtime.
-
-def _configure_stripe() -> None:
-    """Ensure the Stripe SDK is using the secret key from the app configuration."""
-
-    secret_key = current_app.config.get('STRIPE_SECRET_KEY')
-    if secret_key:
-        stripe.api_key = secret_key
-    else:
-        stripe.api_key = None
-        current_app.logger.warning('STRIPE_SECRET_KEY is not configured; payment routes may fail.')
-
-
-def calculate_fare(distance_km):
-    """Calculate fare based on distance and pricing configuration"""
+def _get_pricing() -> PricingConfig:
     pricing = PricingConfig.query.first()
     if not pricing:
         # Create default pricing if not exists
         pricing = PricingConfig(base_fare=3.0, price_per_km=1.5)
         db.session.add(pricing)
         db.session.commit()
+    return pricing
+
+
+def _current_pricing_version() -> str:
+    row = db.session.query(PricingConfig.base_fare, PricingConfig.price_per_km).first()
+    return pricing_version(*row) if row else pricing_version(3.0, 1.5)
+
 
-    fare = pricing.base_fare + (distance_km * pricing.price_per_km)
+def calculate_fare(distance_km, surge=1.0, pricing=None):
+    """Calculate fare based on distance, pricing configuration and the surge multiplier"""
+    pricing = pricing or _get_pricing()
+    fare = (pricing.base_fare + (distance_km * pricing.price_per_km)) * surge
     return round(fare, 2)
 
 
@@ -117,14 +129,31 @@ def _prepare_ride_payload(data: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[st
     return payload, errors
 
 
-def _create_ride(payload: Dict[str, Any]) -> Tuple[Ride, Dict[str, Any]]:
-    distance_km = estimate_distance_km(payload['pickup_address'], payload['dropoff_address'])
-    duration_minutes = estimate_duration_minutes(
-        distance_km,
-        scheduled_time=payload['scheduled_time'],
-        passenger_count=payload['passenger_count'],
-    )
-    fare = calculate_fare(distance_km)
+def _initial_status(scheduled_time: Optional[datetime]) -> str:
+    scheduler = get_ride_scheduler()
+    return scheduler.initial_status(scheduled_time) if scheduler else 'pending'
+
+
+def _create_ride(payload: Dict[str, Any], quote: Optional[FareQuote] = None) -> Tuple[Ride, Dict[str, Any]]:
+    status = _initial_status(payload['scheduled_time'])
+    zone = zone_for_address(payload['pickup_address']) if status == 'pending' else None
+    if zone is not None:
+        # Pre-booked rides are priced without surge and feed demand only once released.
+        record_ride_request(zone)
+
+    if quote is not None:
+        # The rider is charged what they were quoted; nothing is re-estimated.
+        distance_km, duration_minutes = quote.distance_km, quote.duration_minutes
+        fare, surge = quote.fare, quote.surge
+    else:
+        distance_km = estimate_distance_km(payload['pickup_address'], payload['dropoff_address'])
+        duration_minutes = estimate_duration_minutes(
+            distance_km,
+            scheduled_time=payload['scheduled_time'],
+            passenger_count=payload['passenger_count'],
+        )
+        surge = surge_multiplier(zone) if zone is not None else 1.0
+        fare = calculate_fare(distance_km, surge)
 
     ride = Ride(
         rider_name=payload['rider_name'],
@@ -138,16 +167,22 @@ def _create_ride(payload: Dict[str, Any]) -> Tuple[Ride, Dict[str, Any]]:
         distance_km=round(distance_km, 2),
         estimated_duration_minutes=duration_minutes,
         fare=fare,
-        status='pending',
+        status=status,
     )
 
     db.session.add(ride)
+    record_ride_created(ride)
     db.session.commit()
 
+    if status == SCHEDULED_STATUS:
+        get_ride_scheduler().schedule(ride.id, ride.scheduled_time)
+
     estimate = {
         'distanceKm': round(distance_km, 2),
         'durationMinutes': duration_minutes,
         'fare': fare,
+        'surgeMultiplier': surge,
+        'quoted': quote is not None,
     }
 
     return ride, estimate
@@ -168,11 +203,11 @@ def _create_payment_intent_for_ride(ride: Ride) -> Tuple[Optional[Payment], Opti
     if ride.payment:
         return ride.payment, None, None
 
-    _configure_stripe()
+    gateway = get_stripe_gateway()
     amount_cents = int(round(ride.fare * 100))
     metadata = _build_payment_metadata(ride)
 
-    if not stripe.api_key:
+    if not gateway.configured:
         placeholder_id = f"pi_{uuid4().hex[:20]}"
         client_secret = f"{placeholder_id}_secret_placeholder"
         metadata_with_provider = {**metadata, 'provider': 'placeholder'}
@@ -198,14 +233,14 @@ def _create_payment_intent_for_ride(ride: Ride) -> Tuple[Optional[Payment], Opti
         }, None
 
     try:
-        intent = stripe.PaymentIntent.create(
-            amount=amount_cents,
-            currency='eur',
-            metadata=metadata,
-            automatic_payment_methods={'enabled': True},
-            description=f'Ride from {ride.pickup_address} to {ride.dest_address}',
-            receipt_email=ride.user_email,
-        )
+        intent = gateway.create_payment_intent({
+            'amount': amount_cents,
+            'currency': 'eur',
+            'metadata': metadata,
+            'automatic_payment_methods': {'enabled': True},
+            'description': f'Ride from {ride.pickup_address} to {ride.dest_address}',
+            'receipt_email': ride.user_email,
+        })
         payment = Payment.from_intent(
             ride_id=ride.id,
             intent=intent,
@@ -219,10 +254,10 @@ def _create_payment_intent_for_ride(ride: Ride) -> Tuple[Optional[Payment], Opti
         db.session.add(payment)
         db.session.commit()
         return payment, None, None
-    except stripe.error.StripeError as exc:
+    except StripeGatewayError as exc:
         db.session.rollback()
         current_app.logger.exception('Failed to create Stripe payment intent: %s', exc)
-        return None, None, getattr(exc, 'user_message', str(exc))
+        return None, None, exc.user_message
     except Exception as exc:  # pragma: no cover - defensive
         db.session.rollback()
         current_app.logger.exception('Unexpected error creating payment intent')
@@ -248,16 +283,29 @@ def estimate_ride():
         scheduled_time=payload['scheduled_time'],
         passenger_count=payload['passenger_count'],
     )
-    estimated_fare = calculate_fare(distance_km)
+    surge = 1.0
+    if _initial_status(payload['scheduled_time']) == 'pending':
+        surge = surge_multiplier(zone_for_address(payload['pickup_address']))
+    pricing = _get_pricing()
+    estimated_fare = calculate_fare(distance_km, surge, pricing)
+    quote_token, quote_expires_at = issue_quote(
+        payload,
+        FareQuote(round(distance_km, 2), duration_minutes, estimated_fare, surge),
+        pricing_version(pricing.base_fare, pricing.price_per_km),
+    )
 
     return jsonify({
         'distanceKm': round(distance_km, 2),
         'durationMinutes': duration_minutes,
         'fare': estimated_fare,
+        'surgeMultiplier': surge,
+        'quoteToken': quote_token,
+        'quoteExpiresAt': quote_expires_at.isoformat(),
     }), 200
 
 
 @ride_bp.route('/rides', methods=['POST'])
+@idempotent
 def create_ride_request():
     """Create and persist a new ride booking."""
     data = request.get_json(silent=True) or {}
@@ -266,8 +314,11 @@ def create_ride_request():
     if errors:
         return jsonify({'error': 'Invalid ride request', 'details': errors}), 400
 
+    quote = redeem_quote(
+        data.get('quote_token') or data.get('quoteToken'), payload, _current_pricing_version
+    )
     try:
-        ride, estimate = _create_ride(payload)
+        ride, estimate = _create_ride(payload, quote)
     except Exception as exc:  # pragma: no cover - handled generically
         db.session.rollback()
         current_app.logger.exception('Failed to create ride request')
@@ -310,11 +361,211 @@ def request_ride():
     return create_ride_request()
 
 
+def _estimate_batch(payloads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Estimate many rides with one pricing read, one distance per address pair and one surge lookup per zone."""
+
+    pricing = _get_pricing()
+    statuses = [_initial_status(payload['scheduled_time']) for payload in payloads]
+    zones = [
+        zone_for_address(payload['pickup_address']) if status == 'pending' else None
+        for payload, status in zip(payloads, statuses)
+    ]
+    for zone in zones:
+        if zone is not None:
+            record_ride_request(zone)
+
+    distances: Dict[Tuple[str, str], float] = {}
+    surges: Dict[Optional[str], float] = {None: 1.0}
+    estimates = []
+    for payload, status, zone in zip(payloads, statuses, zones):
+        route = (payload['pickup_address'], payload['dropoff_address'])
+        if route not in distances:
+            distances[route] = estimate_distance_km(*route)
+        if zone not in surges:
+            surges[zone] = surge_multiplier(zone)
+        distance_km = distances[route]
+        estimates.append({
+            'status': status,
+            'distanceKm': round(distance_km, 2),
+            'durationMinutes': estimate_duration_minutes(
+                distance_km,
+                scheduled_time=payload['scheduled_time'],
+                passenger_count=payload['passenger_count'],
+            ),
+            'fare': calculate_fare(distance_km, surges[zone], pricing),
+            'surgeMultiplier': surges[zone],
+        })
+    return estimates
+
+
+def _insert_rides(payloads: List[Dict[str, Any]], estimates: List[Dict[str, Any]], now: datetime) -> List[int]:
+    """Insert the rides with a single executemany and return their ids in input order."""
+
+    rows = [
+        {
+            'rider_name': payload['rider_name'],
+            'user_email': payload['rider_email'],
+            'user_phone': payload['rider_phone'],
+            'pickup_address': payload['pickup_address'],
+            'dest_address': payload['dropoff_address'],
+            'scheduled_time': payload['scheduled_time'],
+            'passenger_count': payload['passenger_count'],
+            'notes': payload['notes'],
+            'distance_km': estimate['distanceKm'],
+            'estimated_duration_minutes': estimate['durationMinutes'],
+            'fare': estimate['fare'],
+            'status': estimate['status'],
+            'payment_status': 'pending',
+            'created_at': now,
+            'updated_at': now,
+        }
+        for payload, estimate in zip(payloads, estimates)
+    ]
+    return list(db.session.scalars(insert(Ride).returning(Ride.id, sort_by_parameter_order=True), rows))
+
+
+def _create_batch_payment_intent(
+    batch: BookingBatch, ride_ids: List[int]
+) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Create one payment intent for the whole batch and point its rides at it."""
+
+    additional_info: Optional[Dict[str, Any]] = None
+    gateway = get_stripe_gateway()
+    if not gateway.configured:
+        intent_id = f"pi_{uuid4().hex[:20]}"
+        client_secret = f"{intent_id}_secret_placeholder"
+        status = 'requires_payment_method'
+        additional_info = {
+            'placeholder': True,
+            'message': 'Stripe not configured. Returning placeholder payment intent.',
+        }
+    else:
+        try:
+            intent = gateway.create_payment_intent({
+                'amount': batch.amount,
+                'currency': batch.currency,
+                'metadata': {'batch_id': batch.id, 'ride_count': batch.ride_count, 'partner_name': batch.partner_name or ''},
+                'automatic_payment_methods': {'enabled': True},
+                'description': f'{batch.ride_count} rides for {batch.partner_name or "partner"}',
+                'receipt_email': batch.partner_email,
+            })
+        except StripeGatewayError as exc:
+            current_app.logger.exception('Failed to create Stripe payment intent for batch %s: %s', batch.id, exc)
+            return None, exc.user_message
+        intent_id, client_secret = intent['id'], intent.get('client_secret')
+        status = intent.get('status', 'requires_payment_method')
+
+    batch.stripe_payment_intent_id = intent_id
+    batch.client_secret = client_secret
+    batch.payment_status = status
+    db.session.execute(
+        update(Ride).where(Ride.id.in_(ride_ids)).values(payment_intent_id=intent_id, payment_status=status)
+    )
+    db.session.commit()
+    payload = batch.to_dict(include_client_secret=True)
+    if additional_info:
+        payload.update(additional_info)
+    return payload, None
+
+
+@ride_bp.route('/rides/bulk', methods=['POST'])
+@idempotent
+def create_ride_batch():
+    """Book many rides for a partner in one transaction, paid with one payment intent."""
+    data = request.get_json(silent=True) or {}
+    items = data.get('rides')
+    max_items = int(current_app.config.get('RIDE_BULK_MAX_ITEMS', 100))
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'rides must be a non-empty list'}), 400
+    if len(items) > max_items:
+        return jsonify({'error': f'At most {max_items} rides can be booked at once'}), 400
+
+    partner = data.get('partner') if isinstance(data.get('partner'), dict) else {}
+    partner_name = _extract_string(partner, 'name') or None
+    partner_email = _extract_string(partner, 'email') or None
+    partner_phone = _extract_string(partner, 'phone') or None
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+    valid: List[Tuple[int, Dict[str, Any]]] = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results[index] = {'index': index, 'ok': False, 'errors': {'ride': 'Each ride must be an object.'}}
+            continue
+        payload, errors = _prepare_ride_payload(item)
+        if 'contact' in errors and (partner_email or partner_phone):
+            # Transfers booked without a rider contact are confirmed to the partner instead.
+            errors.pop('contact')
+            payload['rider_email'], payload['rider_phone'] = partner_email, partner_phone
+        if errors:
+            results[index] = {'index': index, 'ok': False, 'errors': errors}
+        else:
+            valid.append((index, payload))
+
+    if not valid:
+        return jsonify({'error': 'No valid rides in batch', 'results': results}), 400
+
+    payloads = [payload for _, payload in valid]
+    try:
+        estimates = _estimate_batch(payloads)
+        now = datetime.utcnow()
+        batch = BookingBatch(
+            partner_name=partner_name,
+            partner_email=partner_email,
+            partner_phone=partner_phone,
+            ride_count=len(payloads),
+            amount=sum(int(round(estimate['fare'] * 100)) for estimate in estimates),
+            currency='eur',
+            created_at=now,
+            updated_at=now,
+        )
+        db.session.add(batch)
+        ride_ids = _insert_rides(payloads, estimates, now)
+        record_rides_created(
+            [{'id': ride_id, 'status': estimate['status']} for ride_id, estimate in zip(ride_ids, estimates)], now
+        )
+        db.session.commit()
+    except Exception as exc:  # pragma: no cover - handled generically
+        db.session.rollback()
+        current_app.logger.exception('Failed to create ride batch')
+        return jsonify({'error': 'Unable to create rides', 'message': str(exc)}), 500
+
+    scheduler = get_ride_scheduler()
+    for ride_id, payload, estimate in zip(ride_ids, payloads, estimates):
+        if estimate['status'] == SCHEDULED_STATUS:
+            scheduler.schedule(ride_id, payload['scheduled_time'])
+
+    payment_payload, payment_error = _create_batch_payment_intent(batch, ride_ids)
+    if payment_error:
+        current_app.logger.warning('Ride batch %s created without payment intent: %s', batch.id, payment_error)
+
+    by_id = {row.id: row for row in ride_rows().filter(Ride.id.in_(ride_ids))}
+    rides = [by_id[ride_id] for ride_id in ride_ids]
+    for (index, _), ride, estimate in zip(valid, rides, estimates):
+        estimate.pop('status')
+        results[index] = {'index': index, 'ok': True, 'ride': ride.to_dict(), 'estimate': estimate}
+
+    try:
+        get_notification_service().notify_rides_booked(rides, {'payment': payment_payload})
+    except Exception as exc:  # pragma: no cover - notifications shouldn't fail the request
+        current_app.logger.exception('Failed to dispatch ride batch notifications: %s', exc)
+
+    return jsonify({
+        'message': 'Rides requested successfully',
+        'batch': payment_payload or batch.to_dict(),
+        'payment_error': payment_error,
+        'publishable_key': current_app.config.get('STRIPE_PUBLISHABLE_KEY'),
+        'created': len(ride_ids),
+        'failed': len(items) - len(ride_ids),
+        'results': results,
+    }), 201
+
+
 @ride_bp.route('/rides/pending', methods=['GET'])
+@reads_from_replica
 def get_pending_rides():
     """Get all pending ride requests"""
     try:
-        rides = Ride.query.filter_by(status='pending').order_by(Ride.created_at.desc()).all()
+        rides = ride_rows().filter(Ride.status == 'pending').order_by(Ride.created_at.desc()).all()
         return jsonify({
             'rides': [ride.to_dict() for ride in rides]
         }), 200
@@ -322,10 +573,34 @@ def get_pending_rides():
         return jsonify({'error': str(e)}), 500
 
 
+@ride_bp.route('/rides/changes', methods=['GET'])
+def get_ride_changes():
+    """Tail ride lifecycle events in commit order using the ``after`` cursor.
+
+    Event writers are serialised until commit (see ``services.ride_events``),
+    so ids become visible in order and ``id > after`` never skips an event.
+    """
+    try:
+        after = int(request.args.get('after', 0))
+        limit = int(request.args.get('limit', DEFAULT_FEED_LIMIT))
+    except ValueError:
+        return jsonify({'error': 'after and limit must be integers'}), 400
+    if after < 0 or limit < 1:
+        return jsonify({'error': 'after must be >= 0 and limit >= 1'}), 400
+
+    events, next_cursor, has_more, gap = changes_since(after, limit)
+    return jsonify({
+        'events': [event.to_dict() for event in events],
+        'next_cursor': next_cursor,
+        'has_more': has_more,
+        'gap': gap,
+    }), 200
+
+
 @ride_bp.route('/rides/<int:ride_id>', methods=['GET'])
 def get_ride(ride_id):
-    """Get details of a specific ride"""
-    ride = Ride.query.get(ride_id)
+    """Get details of a specific ride (archived rides with ``?include_archived=true``)"""
+    ride = find_ride(ride_id, include_archived_requested())
     if not ride:
         return jsonify({'error': 'Ride not found'}), 404
 
@@ -349,8 +624,7 @@ def accept_ride(ride_id):
         return jsonify({'error': 'Ride is not available'}), 400
 
     try:
-        ride.driver_id = driver_id
-        ride.status = 'accepted'
+        transition_ride(ride, 'accepted', driver_id=driver_id)
         db.session.commit()
         get_notification_service().notify_ride_status(ride, 'accepted')
         return jsonify({
@@ -373,7 +647,7 @@ def complete_ride(ride_id):
         return jsonify({'error': 'Ride cannot be completed'}), 400
 
     try:
-        ride.status = 'completed'
+        transition_ride(ride, 'completed')
         db.session.commit()
         get_notification_service().notify_ride_status(ride, 'completed')
 
@@ -397,7 +671,7 @@ def cancel_ride(ride_id):
         return jsonify({'error': 'Ride cannot be cancelled'}), 400
 
     try:
-        ride.status = 'cancelled'
+        transition_ride(ride, 'cancelled')
         db.session.commit()
         get_notification_service().notify_ride_status(ride, 'cancelled')
 
@@ -411,12 +685,18 @@ def cancel_ride(ride_id):
 
 
 @ride_bp.route('/rides/<int:ride_id>/payment-intent', methods=['POST'])
+@idempotent
 def create_payment_intent(ride_id):
     """(Re)create a Stripe payment intent for a ride"""
     ride = Ride.query.get(ride_id)
     if not ride:
         return jsonify({'error': 'Ride not found'}), 404
 
+    batch = BookingBatch.for_ride(ride)
+    if batch is not None:
+        # Bulk-booked rides are charged through their batch's single intent.
+        return jsonify({**batch.to_dict(include_client_secret=True), 'batch_id': batch.id, 'ride_id': ride.id}), 200
+
     if ride.payment and ride.payment.client_secret:
         payload = ride.payment.to_dict(include_client_secret=True)
         return jsonify(payload), 200
@@ -438,22 +718,34 @@ def get_payment_status(ride_id):
     if not ride:
         return jsonify({'error': 'Ride not found'}), 404
 
+    batch = BookingBatch.for_ride(ride)
+    if batch is not None:
+        gateway = get_stripe_gateway()
+        if gateway.configured and not batch.is_placeholder:
+            try:
+                batch.update_from_intent(gateway.retrieve_payment_intent(batch.stripe_payment_intent_id))
+                db.session.commit()
+            except StripeGatewayError as exc:
+                current_app.logger.exception('Failed to refresh batch payment intent %s: %s', batch.stripe_payment_intent_id, exc)
+                return jsonify({'error': exc.user_message}), 502
+        return jsonify({'payment_status': batch.payment_status, 'batch': batch.to_dict()}), 200
+
     payment = ride.payment
     if not payment:
         return jsonify({'payment_status': ride.payment_status or 'pending'}), 200
 
-    _configure_stripe()
-    if stripe.api_key and (not payment.metadata_json or payment.metadata_json.get('provider') != 'placeholder'):
+    gateway = get_stripe_gateway()
+    if gateway.configured and (not payment.metadata_json or payment.metadata_json.get('provider') != 'placeholder'):
         try:
-            intent = stripe.PaymentIntent.retrieve(payment.stripe_payment_intent_id)
+            intent = gateway.retrieve_payment_intent(payment.stripe_payment_intent_id)
             payment.update_from_intent(intent)
             payment.client_secret = intent.get('client_secret') or payment.client_secret
             ride.payment_status = payment.status
             ride.payment_intent_id = payment.stripe_payment_intent_id
             db.session.commit()
-        except stripe.error.StripeError as exc:
+        except StripeGatewayError as exc:
             current_app.logger.exception('Failed to refresh payment intent %s: %s', payment.stripe_payment_intent_id, exc)
-            return jsonify({'error': getattr(exc, 'user_message', str(exc))}), 502
+            return jsonify({'error': exc.user_message}), 502
 
     return jsonify({
         'payment_status': payment.status,
@@ -473,6 +765,13 @@ def get_pricing():
     return jsonify(pricing.to_dict()), 200
 
 
+@ride_bp.route('/pricing/surge', methods=['GET'])
+def get_surge():
+    """Current surge multiplier and window counters per pricing zone"""
+    engine = get_surge_engine()
+    return jsonify({'enabled': engine is not None, 'zones': engine.snapshot() if engine else {}}), 200
+
+
 @ride_bp.route('/pricing', methods=['PUT'])
 def update_pricing():
     """Update pricing configuration"""
@@ -1,13 +1,22 @@
 from flask import Blueprint, jsonify, request
 from src.models import db
 from src.models.user import User
+from src.services.pagination import PaginationError, paginate_request, pagination_requested
+from src.services.read_replica import reads_from_replica
 
 user_bp = Blueprint('user', __name__)
 
 @user_bp.route('/users', methods=['GET'])
+@reads_from_replica
 def get_users():
-    users = User.query.all()
-    return jsonify([user.to_dict() for user in users])
+    if not pagination_requested():
+        # Original contract: a bare list of every user. Paging is opt-in via cursor/limit/fields.
+        return jsonify([user.to_dict() for user in User.query.order_by(User.id)])
+    try:
+        page = paginate_request([User.query])
+    except PaginationError as exc:
+        return jsonify({'error': str(exc)}), 400
+    return jsonify(page.payload('users'))
 
 @user_bp.route('/users', methods=['POST'])
 def create_user():
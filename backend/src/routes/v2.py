@@ -0,0 +1,66 @@
+"""Compact ``/api/v2`` read endpoints for the driver app (JSON or MessagePack)."""
+from __future__ import annotations
+
+from flask import Blueprint, g, request
+from sqlalchemy.orm import selectinload
+
+from src.auth.decorators import jwt_required
+from src.models import db
+from src.models.driver import Driver
+from src.models.ride import Ride
+from src.services.compact import PAYMENT_STATUS_CODES, RIDE_STATUS_CODES, compact_ride, render
+from src.services.pagination import PaginationError, paginate_request
+from src.services.read_models import ride_rows
+from src.services.read_replica import reads_from_replica
+
+v2_bp = Blueprint("v2", __name__)
+
+
+def _ride_page(queries):
+    if request.args.get("fields"):
+        return render({"error": "fields is not supported on /api/v2; the profile is already minimal"}, 400)
+    try:
+        page = paginate_request(queries)
+    except PaginationError as exc:
+        return render({"error": str(exc)}, 400)
+    return render({
+        "rides": [compact_ride(ride) for ride in page.items],
+        "next_cursor": page.next_cursor,
+        "has_more": page.has_more,
+    })
+
+
+@v2_bp.route("/enums", methods=["GET"])
+def get_enums():
+    """Status code tables used by v2 payloads."""
+
+    return render({"ride_status": RIDE_STATUS_CODES, "payment_status": PAYMENT_STATUS_CODES})
+
+
+@v2_bp.route("/rides/pending", methods=["GET"])
+@reads_from_replica
+def get_pending_rides():
+    return _ride_page([ride_rows().filter(Ride.status == "pending")])
+
+
+@v2_bp.route("/rides/<int:ride_id>", methods=["GET"])
+def get_ride(ride_id: int):
+    ride = db.session.get(Ride, ride_id, options=[selectinload(Ride.payment)])
+    if ride is None:
+        return render({"error": "Ride not found"}, 404)
+    return render(compact_ride(ride))
+
+
+@v2_bp.route("/drivers/me/assigned-rides", methods=["GET"])
+@reads_from_replica
+@jwt_required
+def get_assigned_rides():
+    driver: Driver = g.current_driver
+    query = ride_rows().filter(Ride.driver_id == driver.id)
+    statuses = [status.strip() for status in request.args.get("status", "").split(",") if status.strip()]
+    if statuses:
+        query = query.filter(Ride.status.in_(statuses))
+    return _ride_page([query])
+
+
+__all__ = ["v2_bp"]
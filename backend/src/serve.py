@@ -0,0 +1,158 @@
+"""Production entry point: ``python -m src.serve`` runs the app under gunicorn.
+
+The application is created once in the master process (``preload_app``) and
+forked into the workers, so imported code and start-up data such as the static
+asset manifest are shared copy-on-write instead of being rebuilt per worker.
+Each worker then drops the database connections it inherited and restarts its
+per-process helpers.
+
+Signals go to the master: ``HUP`` gracefully replaces the workers (the
+preloaded code is kept), ``USR2`` followed by ``QUIT`` to the old master
+deploys new code without dropping connections, and ``TERM`` drains and exits
+within ``WEB_GRACEFUL_TIMEOUT``.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import os
+import sys
+import tempfile
+from typing import Any, Dict, Optional, Sequence, Type
+
+from flask import Flask
+
+from .config import Config, get_config
+
+
+def default_workers() -> int:
+    """Gunicorn's rule of thumb: two workers per CPU plus one."""
+
+    return (os.cpu_count() or 1) * 2 + 1
+
+
+def build_options(
+    config: Type[Config],
+    *,
+    bind: Optional[str] = None,
+    workers: Optional[int] = None,
+    threads: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Translate the ``WEB_*`` settings (or CLI overrides) into gunicorn options."""
+
+    workers = workers or config.WEB_CONCURRENCY or default_workers()
+    threads = max(1, threads or config.WEB_THREADS)
+    return {
+        "bind": bind or config.WEB_BIND,
+        "workers": workers,
+        "threads": threads,
+        # Only the threaded worker honours keep-alive; sync workers close after each response.
+        "worker_class": "gthread" if threads > 1 else "sync",
+        "keepalive": config.WEB_KEEPALIVE,
+        "timeout": config.WEB_TIMEOUT,
+        "graceful_timeout": config.WEB_GRACEFUL_TIMEOUT,
+        "max_requests": config.WEB_MAX_REQUESTS,
+        "max_requests_jitter": config.WEB_MAX_REQUESTS_JITTER,
+        "preload_app": True,
+    }
+
+
+def preload_app(config: Type[Config]) -> Flask:
+    """Create the app in the master and leave it in a fork-friendly state."""
+
+    from .app import create_app
+    from .models import db
+
+    app = create_app(config)
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+    # Move everything allocated so far out of the collector's reach so GC passes
+    # in the workers do not touch (and therefore copy) the shared pages.
+    gc.collect()
+    gc.freeze()
+    return app
+
+
+def reinit_after_fork(app: Flask) -> None:
+    """Reset state a forked worker must not share with the master."""
+
+    from .models import db
+    from .models.session import REPLICA_EXTENSION
+
+    with app.app_context():
+        engines = [*db.engines.values()]
+    replica = app.extensions.get(REPLICA_EXTENSION)
+    if replica is not None:
+        engines.append(replica)
+    for engine in engines:
+        # close=False: the sockets/file handles still belong to the parent.
+        engine.dispose(close=False)
+
+    hasher = app.extensions.get("password_hasher")
+    if hasher is not None:
+        hasher.after_fork()
+    sampler = app.extensions.get("stack_sampler")
+    if sampler is not None:
+        sampler.after_fork()
+    gateway = app.extensions.get("stripe_gateway")
+    if gateway is not None:
+        gateway.after_fork()
+
+
+def _ensure_metrics_dir(workers: int) -> None:
+    # Must happen before prometheus_client is imported; see services.metrics_registry.
+    if workers > 1 and not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="kos-taxi-metrics-")
+
+
+def run(app: Flask, options: Dict[str, Any]) -> None:
+    """Serve ``app`` with gunicorn until the master is told to stop."""
+
+    from gunicorn.app.base import BaseApplication
+
+    from .services.metrics_registry import mark_worker_dead
+
+    class PreloadedApplication(BaseApplication):
+        def load_config(self) -> None:
+            for key, value in options.items():
+                self.cfg.set(key, value)
+            self.cfg.set("post_fork", lambda server, worker: reinit_after_fork(app))
+            self.cfg.set("child_exit", lambda server, worker: mark_worker_dead(worker.pid))
+
+        def load(self) -> Flask:
+            return app
+
+    PreloadedApplication().run()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the Kos Taxi API with preforked gunicorn workers.")
+    parser.add_argument("--bind", help="host:port to listen on (default: WEB_BIND).")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: WEB_CONCURRENCY or 2 x CPUs + 1).")
+    parser.add_argument("--threads", type=int, help="Threads per worker; >1 selects the gthread worker (default: WEB_THREADS).")
+    args = parser.parse_args(argv)
+
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        print("gunicorn is not installed (it does not support Windows); use 'python src/main.py' for local runs.", file=sys.stderr)
+        return 2
+
+    config = get_config()
+    options = build_options(config, bind=args.bind, workers=args.workers, threads=args.threads)
+    _ensure_metrics_dir(options["workers"])
+
+    from .services.metrics_registry import prepare_multiprocess_dir
+
+    prepare_multiprocess_dir()
+    run(preload_app(config), options)
+    return 0
+
+
+__all__ = ["build_options", "default_workers", "main", "preload_app", "reinit_after_fork", "run"]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
+
@@ -2,10 +2,14 @@
 
 from .route_estimator import estimate_distance_km, estimate_duration_minutes
 from .notifications import NotificationService, get_notification_service
+from .password_hashing import PasswordHashingBusy, get_password_hasher, init_password_hashing
 
 __all__ = [
     "estimate_distance_km",
     "estimate_duration_minutes",
     "NotificationService",
     "get_notification_service",
+    "PasswordHashingBusy",
+    "get_password_hasher",
+    "init_password_hashing",
 ]
@@ -0,0 +1,309 @@
+"""Admission control: per-client token buckets and concurrency-based load shedding.
+
+Rate limits apply to the endpoints named in ``RATE_LIMITS``. A client is
+identified by its ``X-API-Key`` when that key is listed in
+``PARTNER_API_KEYS``, otherwise by the driver in its bearer token or its IP
+address. Unknown keys are ignored, so rotating them never yields a fresh bucket. Buckets live in process memory by default. Set
+``RATE_LIMIT_STORAGE_URL=sqlite:///path`` to share them between workers;
+each check is then a single atomic upsert.
+
+Load shedding turns requests away with ``503`` before they reach a view when
+this process already has ``LOAD_SHED_MAX_IN_FLIGHT`` requests running, or when
+the request waited longer than ``LOAD_SHED_MAX_QUEUE_MS`` in front of the app
+(from the proxy's ``X-Request-Start`` header).
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import AbstractSet, Dict, FrozenSet, Optional, Tuple
+
+from flask import Flask, Response, current_app, g, jsonify, request
+from prometheus_client import Counter
+
+from src.auth.jwt import TokenError, decode_token
+
+logger = logging.getLogger(__name__)
+
+_PERIODS = {"second": 1.0, "minute": 60.0, "hour": 3600.0}
+_EXEMPT_ENDPOINTS = {"metrics", "static", "serve_frontend"}
+
+_REJECTIONS: Optional[Counter] = None
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """``capacity`` requests per burst, refilled at ``rate`` tokens per second."""
+
+    capacity: float
+    rate: float
+
+
+def parse_rate_limits(spec: str) -> Dict[str, RateLimit]:
+    """Parse ``"endpoint=10/minute;other=2/second"`` into per-endpoint limits."""
+
+    limits: Dict[str, RateLimit] = {}
+    for entry in filter(None, (part.strip() for part in spec.split(";"))):
+        endpoint, _, budget = entry.partition("=")
+        count, _, period = budget.strip().partition("/")
+        if period.strip() not in _PERIODS:
+            raise ValueError(f"Invalid rate limit {entry!r}; expected endpoint=N/second|minute|hour")
+        capacity = float(count)
+        limits[endpoint.strip()] = RateLimit(capacity=capacity, rate=capacity / _PERIODS[period.strip()])
+    return limits
+
+
+class MemoryBucketStore:
+    """Token buckets held in this process, evicting the least recently used clients."""
+
+    def __init__(self, max_entries: int = 10_000) -> None:
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, limit: RateLimit, now: float) -> Tuple[bool, float]:
+        """Take one token; return ``(allowed, tokens_left)``."""
+
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (limit.capacity, now))
+            tokens = min(limit.capacity, tokens + (now - updated) * limit.rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self._max_entries:
+                self._buckets.popitem(last=False)
+            return allowed, tokens
+
+
+class SQLiteBucketStore:
+    """Token buckets in a SQLite file shared by every worker on the host."""
+
+    _SCHEMA = "CREATE TABLE IF NOT EXISTS rate_buckets (key TEXT PRIMARY KEY, tokens REAL, updated REAL, allowed INTEGER)"
+    # Column references in SET see the pre-update row, so both assignments use the old tokens.
+    _CONSUME = """
+        INSERT INTO rate_buckets (key, tokens, updated, allowed) VALUES (:key, :capacity - 1, :now, 1)
+        ON CONFLICT(key) DO UPDATE SET
+            tokens = MIN(:capacity, tokens + (:now - updated) * :rate)
+                - (MIN(:capacity, tokens + (:now - updated) * :rate) >= 1),
+            allowed = MIN(:capacity, tokens + (:now - updated) * :rate) >= 1,
+            updated = :now
+        RETURNING allowed, tokens
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=0.5, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=OFF")
+            connection.execute(self._SCHEMA)
+            self._local.connection, self._local.pid = connection, os.getpid()
+        return connection
+
+    def consume(self, key: str, limit: RateLimit, now: float) -> Tuple[bool, float]:
+        row = self._connection().execute(
+            self._CONSUME, {"key": key, "capacity": limit.capacity, "rate": limit.rate, "now": now}
+        ).fetchone()
+        return bool(row[0]), float(row[1])
+
+
+def build_store(url: Optional[str]):
+    if not url:
+        return MemoryBucketStore()
+    if url.startswith("sqlite:///"):
+        return SQLiteBucketStore(url[len("sqlite:///"):])
+    raise ValueError(f"Unsupported RATE_LIMIT_STORAGE_URL {url!r}; use sqlite:///path or leave it empty")
+
+
+def _key_digest(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode()).hexdigest()
+
+
+def parse_partner_keys(spec: str) -> FrozenSet[str]:
+    """Digests of the comma-separated ``PARTNER_API_KEYS``."""
+
+    return frozenset(_key_digest(key) for key in filter(None, (part.strip() for part in spec.split(","))))
+
+
+def client_key(partner_keys: Optional[AbstractSet[str]] = None) -> str:
+    """Identify the caller by partner API key, authenticated driver, or IP address.
+
+    ``partner_keys`` defaults to the allowlist of the current app's admission
+    controller; keys outside it are treated as absent.
+    """
+
+    if partner_keys is None:
+        controller = get_admission_controller()
+        partner_keys = controller.settings.partner_keys if controller is not None else frozenset()
+    api_key = request.headers.get("X-API-Key")
+    if api_key:
+        digest = _key_digest(api_key)
+        if digest in partner_keys:
+            return "key:" + digest[:16]
+    auth_header = request.headers.get("Authorization", "")
+    if auth_header.startswith("Bearer "):
+        try:
+            return "driver:" + str(decode_token(auth_header[7:].strip(), expected_type="access")["sub"])
+        except TokenError:
+            pass
+    return "ip:" + (request.remote_addr or "unknown")
+
+
+def queue_seconds(header: Optional[str], now: float) -> Optional[float]:
+    """Time since the proxy received the request, from ``X-Request-Start``.
+
+    Accepts ``t=<epoch>`` or a bare epoch in seconds, milliseconds or
+    microseconds, as written by nginx, HAProxy and Heroku-style routers.
+    """
+
+    if not header:
+        return None
+    try:
+        started = float(header.strip().removeprefix("t="))
+    except ValueError:
+        return None
+    while started > now * 10:  # milli/microseconds
+        started /= 1000
+    return max(0.0, now - started)
+
+
+@dataclass
+class AdmissionSettings:
+    limits: Dict[str, RateLimit]
+    store: object
+    max_in_flight: int
+    max_queue_seconds: float
+    retry_after: int
+    partner_keys: FrozenSet[str] = frozenset()
+
+
+class AdmissionController:
+    """Tracks in-flight requests and applies the shedding and rate-limit checks."""
+
+    def __init__(self, settings: AdmissionSettings) -> None:
+        self.settings = settings
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def enter(self) -> Optional[str]:
+        """Admit the request, or return the reason it should be shed."""
+
+        settings = self.settings
+        if settings.max_queue_seconds > 0:
+            waited = queue_seconds(request.headers.get("X-Request-Start"), time.time())
+            if waited is not None and waited > settings.max_queue_seconds:
+                return "queue_latency"
+        with self._lock:
+            if settings.max_in_flight > 0 and self._in_flight >= settings.max_in_flight:
+                return "in_flight"
+            self._in_flight += 1
+        g._admission_entered = True
+        return None
+
+    def leave(self) -> None:
+        if g.pop("_admission_entered", False):
+            with self._lock:
+                self._in_flight -= 1
+
+    def check_rate_limit(self, endpoint: str) -> Optional[int]:
+        """Return the seconds to wait when the caller's bucket is empty, else ``None``."""
+
+        limit = self.settings.limits.get(endpoint)
+        if limit is None:
+            return None
+        try:
+            allowed, tokens = self.settings.store.consume(f"{endpoint}:{client_key(self.settings.partner_keys)}", limit, time.time())
+        except sqlite3.Error:  # pragma: no cover - fail open if the shared store is unavailable
+            logger.exception("Rate limit store unavailable; admitting request")
+            return None
+        if allowed:
+            return None
+        return max(1, math.ceil((1 - tokens) / limit.rate))
+
+
+def _reject(reason: str, endpoint: str, status: int, message: str, retry_after: int) -> Tuple[Response, int]:
+    if _REJECTIONS is not None:
+        _REJECTIONS.labels(reason, endpoint).inc()
+    response = jsonify({"error": message})
+    response.headers["Retry-After"] = str(retry_after)
+    return response, status
+
+
+def init_admission(app: Flask) -> None:
+    """Install load shedding and the configured rate limits on ``app``."""
+
+    global _REJECTIONS
+    if _REJECTIONS is None:
+        namespace = (app.config.get("METRICS_NAMESPACE") or "kos_taxi").replace("-", "_")
+        _REJECTIONS = Counter(
+            "admission_rejections_total",
+            "Requests rejected by rate limiting or load shedding.",
+            ("reason", "endpoint"),
+            namespace=namespace,
+        )
+
+    limits = parse_rate_limits(app.config.get("RATE_LIMITS", "")) if app.config.get("RATE_LIMIT_ENABLED", True) else {}
+    controller = AdmissionController(
+        AdmissionSettings(
+            limits=limits,
+            store=build_store(app.config.get("RATE_LIMIT_STORAGE_URL")),
+            max_in_flight=int(app.config.get("LOAD_SHED_MAX_IN_FLIGHT", 0)),
+            max_queue_seconds=float(app.config.get("LOAD_SHED_MAX_QUEUE_MS", 0)) / 1000,
+            retry_after=int(app.config.get("LOAD_SHED_RETRY_AFTER", 1)),
+            partner_keys=parse_partner_keys(app.config.get("PARTNER_API_KEYS") or ""),
+        )
+    )
+    app.extensions["admission"] = controller
+
+    @app.before_request
+    def _admission_before_request():  # pragma: no cover - flask hook
+        endpoint = request.endpoint or "unknown"
+        if endpoint in _EXEMPT_ENDPOINTS:
+            return None
+        reason = controller.enter()
+        if reason is not None:
+            return _reject(
+                reason, endpoint, 503, "Server is busy, please retry shortly", controller.settings.retry_after
+            )
+        wait = controller.check_rate_limit(endpoint)
+        if wait is not None:
+            return _reject("rate_limited", endpoint, 429, "Too many requests", wait)
+        return None
+
+    @app.teardown_request
+    def _admission_teardown(exc: Optional[BaseException]) -> None:  # pragma: no cover - flask hook
+        controller.leave()
+
+
+def get_admission_controller() -> Optional[AdmissionController]:
+    return current_app.extensions.get("admission")
+
+
+__all__ = [
+    "AdmissionController",
+    "MemoryBucketStore",
+    "RateLimit",
+    "SQLiteBucketStore",
+    "client_key",
+    "get_admission_controller",
+    "init_admission",
+    "parse_partner_keys",
+    "parse_rate_limits",
+    "queue_seconds",
+]
@@ -0,0 +1,149 @@
+"""Move finished rides out of the hot tables and read them back on request.
+
+Archiving runs in bounded batches, each in its own short transaction, with a
+pause between batches, so SQLite's single writer lock is never held for the
+whole job and live bookings keep flowing. A ride's payment and lifecycle
+events move with it.
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Sequence, Union
+
+from flask import request
+from sqlalchemy import DateTime, delete, insert, literal, select
+from sqlalchemy.exc import IntegrityError
+
+from src.models import Payment, db
+from src.models.archive import ArchivedPayment, ArchivedRide, ArchivedRideEvent
+from src.models.ride import Ride, RideEvent
+
+FINISHED_STATUSES = ("completed", "cancelled")
+
+# (live model, archive model, column holding the ride id); children before parents.
+_MOVES = (
+    (RideEvent, ArchivedRideEvent, "ride_id"),
+    (Payment, ArchivedPayment, "ride_id"),
+    (Ride, ArchivedRide, "id"),
+)
+
+
+class ArchiveCollisionError(RuntimeError):
+    """Live rows reuse ids that are already archived, so they cannot be moved."""
+
+    def __init__(self, table: str, ids: Sequence[int]) -> None:
+        super().__init__(
+            f"{table} already holds ids {', '.join(map(str, ids))}. The live table reused archived ids, "
+            "which happens when it was created without AUTOINCREMENT; run "
+            "'flask --app src.main init-db --rebuild-autoincrement' before archiving again."
+        )
+        self.table = table
+        self.ids = list(ids)
+
+
+@dataclass
+class ArchiveResult:
+    rides: int = 0
+    payments: int = 0
+    events: int = 0
+    batches: int = 0
+
+
+def _move_rows(ride_ids: Sequence[int], archived_at: datetime, result: ArchiveResult) -> None:
+    for live, archived, key in _MOVES:
+        source = live.__table__
+        columns = [column.key for column in source.columns]
+        try:
+            copied = db.session.execute(
+                insert(archived.__table__).from_select(
+                    [*columns, "archived_at"],
+                    select(*source.columns, literal(archived_at, DateTime)).where(source.c[key].in_(ride_ids)),
+                )
+            ).rowcount
+        except IntegrityError as exc:
+            db.session.rollback()
+            moving = select(source.c.id).where(source.c[key].in_(ride_ids))
+            target = archived.__table__.c.id
+            taken = db.session.execute(select(target).where(target.in_(moving)).order_by(target)).scalars()
+            raise ArchiveCollisionError(archived.__table__.name, list(taken)) from exc
+        db.session.execute(delete(source).where(source.c[key].in_(ride_ids)))
+        if live is Ride:
+            result.rides += copied
+        elif live is Payment:
+            result.payments += copied
+        else:
+            result.events += copied
+
+
+def archive_finished_rides(
+    older_than: timedelta,
+    *,
+    batch_size: int = 500,
+    pause_seconds: float = 0.05,
+    max_batches: Optional[int] = None,
+    now: Optional[datetime] = None,
+) -> ArchiveResult:
+    """Archive completed/cancelled rides last updated before ``now - older_than``."""
+
+    cutoff = (now or datetime.utcnow()) - older_than
+    result = ArchiveResult()
+    while max_batches is None or result.batches < max_batches:
+        ride_ids = list(
+            db.session.execute(
+                select(Ride.id)
+                .where(Ride.status.in_(FINISHED_STATUSES), Ride.updated_at < cutoff)
+                .order_by(Ride.id)
+                .limit(batch_size)
+            ).scalars()
+        )
+        if not ride_ids:
+            break
+        try:
+            _move_rows(ride_ids, datetime.utcnow(), result)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        result.batches += 1
+        if len(ride_ids) < batch_size:
+            break
+        # Give request handlers a chance at the writer lock between batches.
+        time.sleep(pause_seconds)
+    return result
+
+
+def include_archived_requested() -> bool:
+    """Whether the current request opted into archived rows with ``?include_archived=true``."""
+
+    return request.args.get("include_archived", "").lower() in {"1", "true", "yes"}
+
+
+def find_ride(ride_id: int, include_archived: bool) -> Optional[Union[Ride, ArchivedRide]]:
+    ride = db.session.get(Ride, ride_id)
+    if ride is None and include_archived:
+        ride = db.session.get(ArchivedRide, ride_id)
+    return ride
+
+
+def newest_first(*groups: Iterable, limit: Optional[int] = None) -> List:
+    """Merge live and archived rows by ``created_at`` descending."""
+
+    merged = sorted(
+        (row for group in groups for row in group),
+        key=lambda row: row.created_at or datetime.min,
+        reverse=True,
+    )
+    return merged[:limit] if limit is not None else merged
+
+
+__all__ = [
+    "ArchiveCollisionError",
+    "ArchiveResult",
+    "FINISHED_STATUSES",
+    "archive_finished_rides",
+    "find_ride",
+    "include_archived_requested",
+    "newest_first",
+]
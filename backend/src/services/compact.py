@@ -0,0 +1,112 @@
+"""Lean ``/api/v2`` serialisation profile and JSON/MessagePack negotiation.
+
+v1 payloads repeat the destination under three keys, duplicate the phone and
+nest a full payment object. v2 rides carry one copy of each value, integer
+status codes (see :data:`RIDE_STATUS_CODES`), epoch-second timestamps
+and no ``null`` entries, which is what the driver app renders.
+"""
+from __future__ import annotations
+
+import calendar
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from flask import Response, jsonify, request
+
+from src.lazy_imports import lazy_import
+
+msgpack = lazy_import("msgpack")
+
+MSGPACK_MIMETYPE = "application/msgpack"
+_MSGPACK_ALIASES = (MSGPACK_MIMETYPE, "application/x-msgpack")
+
+# Codes are part of the v2 contract: append new statuses, never renumber.
+RIDE_STATUS_CODES: Dict[str, int] = {
+    "scheduled": 0,
+    "pending": 1,
+    "accepted": 2,
+    "in_progress": 3,
+    "completed": 4,
+    "cancelled": 5,
+}
+PAYMENT_STATUS_CODES: Dict[str, int] = {
+    "pending": 0,
+    "requires_payment_method": 1,
+    "requires_confirmation": 2,
+    "requires_action": 3,
+    "processing": 4,
+    "requires_capture": 5,
+    "succeeded": 6,
+    "canceled": 7,
+    "failed": 8,
+}
+UNKNOWN_STATUS = -1
+
+
+def epoch_seconds(moment: Optional[datetime]) -> Optional[int]:
+    """Naive UTC datetime to integer Unix time."""
+
+    return calendar.timegm(moment.utctimetuple()) if moment is not None else None
+
+
+def _without_nulls(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in payload.items() if value is not None}
+
+
+def compact_ride(ride) -> Dict[str, Any]:
+    """v2 view of a ride (live or archived)."""
+
+    payment = ride.payment
+    payment_status = payment.status if payment else ride.payment_status
+    return _without_nulls(
+        {
+            "id": ride.id,
+            "status": RIDE_STATUS_CODES.get(ride.status, UNKNOWN_STATUS),
+            "pickup": ride.pickup_address,
+            "pickup_pos": [ride.pickup_lat, ride.pickup_lon] if ride.pickup_lat is not None else None,
+            "dropoff": ride.dest_address,
+            "dropoff_pos": [ride.dest_lat, ride.dest_lon] if ride.dest_lat is not None else None,
+            "scheduled_at": epoch_seconds(ride.scheduled_time),
+            "fare": ride.fare,
+            "km": ride.distance_km,
+            "minutes": ride.estimated_duration_minutes,
+            "passengers": ride.passenger_count,
+            "rider": ride.rider_name,
+            "phone": ride.user_phone,
+            "notes": ride.notes,
+            "driver_id": ride.driver_id,
+            "payment": PAYMENT_STATUS_CODES.get(payment_status, UNKNOWN_STATUS) if payment_status else None,
+            "updated_at": epoch_seconds(ride.updated_at),
+        }
+    )
+
+
+def wants_msgpack() -> bool:
+    """True when the ``Accept`` header prefers MessagePack over JSON."""
+
+    best = request.accept_mimetypes.best_match(("application/json", *_MSGPACK_ALIASES))
+    return best in _MSGPACK_ALIASES
+
+
+def render(payload: Any, status: int = 200) -> Response:
+    """Serialise ``payload`` as MessagePack or JSON according to ``Accept``."""
+
+    if wants_msgpack():
+        response = Response(msgpack.packb(payload, use_bin_type=True), status=status, mimetype=MSGPACK_MIMETYPE)
+    else:
+        response = jsonify(payload)
+        response.status_code = status
+    response.vary.add("Accept")
+    return response
+
+
+__all__ = [
+    "MSGPACK_MIMETYPE",
+    "PAYMENT_STATUS_CODES",
+    "RIDE_STATUS_CODES",
+    "UNKNOWN_STATUS",
+    "compact_ride",
+    "epoch_seconds",
+    "render",
+    "wants_msgpack",
+]
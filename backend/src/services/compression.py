@@ -0,0 +1,198 @@
+"""Content-encoding for dynamic responses (JSON lists, the admin overview, ...).
+
+Responses are compressed in an ``after_request`` hook when the client accepts
+an encoding, the mimetype is textual and the body is at least
+``COMPRESSION_MIN_SIZE`` bytes. gzip is always available; brotli and zstd are
+used when the optional ``brotli`` / ``zstandard`` packages are installed.
+Streamed responses are compressed chunk by chunk and flushed after each chunk,
+so clients still receive data incrementally.
+"""
+from __future__ import annotations
+
+import importlib.util
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from flask import Flask, Response, current_app, request
+from prometheus_client import Counter, Histogram
+
+_COMPRESSIBLE_PREFIXES = (
+    "text/",
+    "application/json",
+    "application/msgpack",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+_INPUT_BYTES: Optional[Counter] = None
+_OUTPUT_BYTES: Optional[Counter] = None
+_SAVED_BYTES: Optional[Counter] = None
+_CPU_SECONDS: Optional[Histogram] = None
+
+
+class _Compressor:
+    """Incremental encoder: ``compress`` returns flushed output for one chunk, ``finish`` the tail."""
+
+    def __init__(self, encoding: str, level: int) -> None:
+        if encoding == "gzip":
+            self._gzip = zlib.compressobj(level, zlib.DEFLATED, 31)
+            self.compress = lambda data: self._gzip.compress(data) + self._gzip.flush(zlib.Z_SYNC_FLUSH)
+            self.finish = lambda: self._gzip.flush(zlib.Z_FINISH)
+        elif encoding == "br":
+            import brotli
+
+            self._brotli = brotli.Compressor(quality=min(level, 11))
+            self.compress = lambda data: self._brotli.process(data) + self._brotli.flush()
+            self.finish = self._brotli.finish
+        else:
+            import zstandard
+
+            self._zstd = zstandard.ZstdCompressor(level=level).compressobj()
+            block = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+            self.compress = lambda data: self._zstd.compress(data) + self._zstd.flush(block)
+            self.finish = self._zstd.flush
+
+    def compress_all(self, data: bytes) -> bytes:
+        return self.compress(data) + self.finish()
+
+
+_MODULES: Dict[str, str] = {"br": "brotli", "zstd": "zstandard"}
+
+
+def available_encodings(preferred: Iterable[str]) -> Tuple[str, ...]:
+    """Filter ``preferred`` down to encodings whose implementation is installed."""
+
+    return tuple(
+        encoding
+        for encoding in preferred
+        if encoding == "gzip" or (encoding in _MODULES and importlib.util.find_spec(_MODULES[encoding]))
+    )
+
+
+@dataclass(frozen=True)
+class CompressionSettings:
+    min_size: int
+    level: int
+    encodings: Tuple[str, ...]
+
+
+def _observe(encoding: str, raw: int, compressed: int, cpu_seconds: float) -> None:
+    if _INPUT_BYTES is None:
+        return
+    _INPUT_BYTES.labels(encoding).inc(raw)
+    _OUTPUT_BYTES.labels(encoding).inc(compressed)
+    _SAVED_BYTES.labels(encoding).inc(max(raw - compressed, 0))
+    _CPU_SECONDS.labels(encoding).observe(cpu_seconds)
+
+
+def _should_compress(response: Response) -> bool:
+    return (
+        request.method != "HEAD"
+        and 200 <= response.status_code < 300
+        and response.status_code != 204
+        and not response.direct_passthrough
+        and "Content-Encoding" not in response.headers
+        and (response.mimetype or "").startswith(_COMPRESSIBLE_PREFIXES)
+        and "no-transform" not in response.headers.get("Cache-Control", "")
+    )
+
+
+def _stream(chunks: Iterable[bytes], compressor: _Compressor, encoding: str) -> Iterator[bytes]:
+    raw = compressed = 0
+    cpu_seconds = 0.0
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        started = time.thread_time()
+        output = compressor.compress(chunk)
+        cpu_seconds += time.thread_time() - started
+        raw += len(chunk)
+        compressed += len(output)
+        if output:
+            yield output
+    tail = compressor.finish()
+    compressed += len(tail)
+    _observe(encoding, raw, compressed, cpu_seconds)
+    yield tail
+
+
+def compress_response(response: Response, settings: CompressionSettings) -> Response:
+    """Encode ``response`` in place when worthwhile; always safe to call."""
+
+    if not _should_compress(response):
+        return response
+    response.vary.add("Accept-Encoding")
+    encoding = request.accept_encodings.best_match(settings.encodings)
+    if encoding is None:
+        return response
+
+    compressor = _Compressor(encoding, settings.level)
+    if response.is_streamed:
+        response.response = _stream(response.response, compressor, encoding)
+        response.headers.pop("Content-Length", None)
+    else:
+        body = response.get_data()
+        if len(body) < settings.min_size:
+            return response
+        started = time.thread_time()
+        compressed = compressor.compress_all(body)
+        cpu_seconds = time.thread_time() - started
+        if len(compressed) >= len(body):
+            return response
+        response.set_data(compressed)
+        _observe(encoding, len(body), len(compressed), cpu_seconds)
+
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f"{etag}-{encoding}", weak)
+    return response
+
+
+def _create_metrics(app: Flask) -> None:
+    global _INPUT_BYTES, _OUTPUT_BYTES, _SAVED_BYTES, _CPU_SECONDS
+    if _INPUT_BYTES is not None:
+        return
+    namespace = (app.config.get("METRICS_NAMESPACE") or "kos_taxi").replace("-", "_")
+    _INPUT_BYTES = Counter(
+        "http_compression_input_bytes_total", "Response bytes before compression.", ("encoding",), namespace=namespace
+    )
+    _OUTPUT_BYTES = Counter(
+        "http_compression_output_bytes_total", "Response bytes after compression.", ("encoding",), namespace=namespace
+    )
+    _SAVED_BYTES = Counter(
+        "http_compression_saved_bytes_total", "Response bytes saved by compression.", ("encoding",), namespace=namespace
+    )
+    _CPU_SECONDS = Histogram(
+        "http_compression_cpu_seconds",
+        "CPU time spent compressing one response.",
+        ("encoding",),
+        namespace=namespace,
+        buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1),
+    )
+
+
+def init_compression(app: Flask) -> None:
+    """Register the compression hook when ``COMPRESSION_ENABLED`` is set."""
+
+    if not app.config.get("COMPRESSION_ENABLED", True):
+        return
+    preferred = [item.strip() for item in str(app.config.get("COMPRESSION_ENCODINGS", "gzip")).split(",")]
+    app.extensions["compression"] = CompressionSettings(
+        min_size=int(app.config.get("COMPRESSION_MIN_SIZE", 1024)),
+        level=int(app.config.get("COMPRESSION_LEVEL", 6)),
+        encodings=available_encodings(item for item in preferred if item),
+    )
+    _create_metrics(app)
+
+    # Registered after the metrics hooks, so it runs before them and the
+    # request latency histogram includes compression time.
+    @app.after_request
+    def _compress_after_request(response: Response) -> Response:  # pragma: no cover - flask hook
+        return compress_response(response, current_app.extensions["compression"])
+
+
+__all__ = ["CompressionSettings", "available_encodings", "compress_response", "init_compression"]
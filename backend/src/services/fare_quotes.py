@@ -0,0 +1,95 @@
+"""Signed fare quotes issued by ``/rides/estimate`` and honoured by ``POST /rides``.
+
+A quote carries the booking inputs, the estimate and the version of the
+pricing it was computed with, signed with ``SECRET_KEY``. When a booking
+presents a quote that verifies, is younger than ``FARE_QUOTE_TTL_SECONDS``,
+matches the booking's inputs and was priced with the current pricing, the
+quoted distance, duration and fare are used as-is. Anything else falls back
+to a fresh estimate.
+"""
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from flask import current_app
+from itsdangerous import BadData, URLSafeTimedSerializer
+
+_QUOTE_SALT = "kos-taxi-fare-quote"
+
+
+@dataclass(frozen=True)
+class FareQuote:
+    distance_km: float
+    duration_minutes: int
+    fare: float
+    surge: float
+
+
+def pricing_version(base_fare: float, price_per_km: float) -> str:
+    """Short fingerprint of the pricing a fare was computed with."""
+
+    return hashlib.sha256(f"{base_fare!r}:{price_per_km!r}".encode()).hexdigest()[:12]
+
+
+def _inputs(payload: Dict[str, Any]) -> List[Any]:
+    scheduled_time = payload.get("scheduled_time")
+    return [
+        payload["pickup_address"],
+        payload["dropoff_address"],
+        scheduled_time.isoformat() if scheduled_time else None,
+        payload["passenger_count"],
+    ]
+
+
+def _serializer() -> URLSafeTimedSerializer:
+    return URLSafeTimedSerializer(current_app.config["SECRET_KEY"], salt=_QUOTE_SALT)
+
+
+def _ttl() -> int:
+    return int(current_app.config.get("FARE_QUOTE_TTL_SECONDS", 300))
+
+
+def issue_quote(payload: Dict[str, Any], quote: FareQuote, version: str) -> Tuple[str, datetime]:
+    """Sign ``quote`` for the inputs in ``payload``; return the token and its expiry."""
+
+    token = _serializer().dumps({
+        "in": _inputs(payload),
+        "km": quote.distance_km,
+        "min": quote.duration_minutes,
+        "fare": quote.fare,
+        "surge": quote.surge,
+        "v": version,
+    })
+    return token, datetime.utcnow() + timedelta(seconds=_ttl())
+
+
+def redeem_quote(
+    token: Optional[str], payload: Dict[str, Any], current_version: Callable[[], str]
+) -> Optional[FareQuote]:
+    """Return the quote in ``token`` if it is valid for this booking, else ``None``."""
+
+    if not token or not isinstance(token, str):
+        return None
+    try:
+        data = _serializer().loads(token, max_age=_ttl())
+    except BadData:
+        return None
+    if not isinstance(data, dict) or data.get("in") != _inputs(payload):
+        return None
+    if data.get("v") != current_version():
+        return None
+    try:
+        return FareQuote(
+            distance_km=float(data["km"]),
+            duration_minutes=int(data["min"]),
+            fare=float(data["fare"]),
+            surge=float(data["surge"]),
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+__all__ = ["FareQuote", "issue_quote", "pricing_version", "redeem_quote"]
@@ -0,0 +1,280 @@
+"""``Idempotency-Key`` handling for endpoints with side effects (bookings, payment intents).
+
+The first request with a key claims it by inserting an ``in_progress`` row,
+runs the view and stores the response. Retries with the same key and request
+body get that response back with ``Idempotent-Replayed: true``; the view,
+Stripe and notifications are not touched. A recent replay is served from a
+small per-process cache without any query. Concurrent duplicates poll until
+the first request finishes, and a key reused for a different request body is
+rejected with ``422``. Keys expire after ``IDEMPOTENCY_TTL_SECONDS``.
+
+Keys from partners and drivers are scoped to the endpoint and the caller (as
+for rate limiting), so one of them can never be replayed another's stored
+response, payment client secrets included. Anonymous riders are scoped by the
+endpoint alone: a phone moving between Wi-Fi and cellular changes IP between
+retries, and the random key plus the body fingerprint already keep two riders
+apart.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import wraps
+from typing import Any, Callable, Optional, Tuple, TypeVar, cast
+
+from flask import Flask, Response, current_app, jsonify, request
+from sqlalchemy import and_, delete, insert, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import IntegrityError
+
+from src.models import db
+from src.models.idempotency import IdempotencyKey
+from src.services.admission import client_key
+
+HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+_PURGE_INTERVAL_SECONDS = 300
+
+_INSERT_IGNORE_DIALECTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+@dataclass(frozen=True)
+class IdempotencySettings:
+    ttl: timedelta
+    lock: timedelta
+    wait_seconds: float
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    fingerprint: str
+    status: int
+    mimetype: Optional[str]
+    body: bytes
+    expires_at: datetime
+
+    def to_response(self) -> Response:
+        response = Response(self.body, status=self.status, mimetype=self.mimetype)
+        response.headers[REPLAYED_HEADER] = "true"
+        return response
+
+
+class _ReplayCache:
+    """Bounded LRU of completed responses, so same-process retries skip the database."""
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self._entries: "OrderedDict[Tuple[str, str], StoredResponse]" = OrderedDict()
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def get(self, scope: str, key: str, now: datetime) -> Optional[StoredResponse]:
+        with self._lock:
+            stored = self._entries.get((scope, key))
+            if stored is None or stored.expires_at <= now:
+                self._entries.pop((scope, key), None)
+                return None
+            self._entries.move_to_end((scope, key))
+            return stored
+
+    def put(self, scope: str, key: str, stored: StoredResponse) -> None:
+        with self._lock:
+            self._entries[(scope, key)] = stored
+            if len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+
+class IdempotencyStore:
+    def __init__(self, settings: IdempotencySettings) -> None:
+        self.settings = settings
+        self.cache = _ReplayCache()
+        self._last_purge = 0.0
+
+    def _insert_claim(self, values: dict) -> bool:
+        # Core statements only: no IdempotencyKey instance ever enters the session,
+        # so a lost race cannot leave a conflicting object in the identity map.
+        table = IdempotencyKey.__table__
+        insert_ignore = _INSERT_IGNORE_DIALECTS.get(db.session.get_bind().dialect.name)
+        if insert_ignore is not None:
+            statement = insert_ignore(table).values(**values).on_conflict_do_nothing(index_elements=["scope", "key"])
+            claimed = db.session.execute(statement).rowcount == 1
+            db.session.commit()
+            return claimed
+        try:
+            db.session.execute(insert(table).values(**values))
+            db.session.commit()
+            return True
+        except IntegrityError:
+            db.session.rollback()
+            return False
+
+    def claim(self, scope: str, key: str, fingerprint: str, now: datetime) -> Tuple[bool, Optional[Row]]:
+        """Claim ``key`` for this request, or return the row of whoever holds it.
+
+        The row is ``None`` when the holder released the key in the meantime.
+        """
+
+        self._maybe_purge(now)
+        values = {
+            "fingerprint": fingerprint,
+            "status": "in_progress",
+            "response_status": None,
+            "response_mimetype": None,
+            "response_body": None,
+            "locked_until": now + self.settings.lock,
+            "expires_at": now + self.settings.ttl,
+            "created_at": now,
+        }
+        if self._insert_claim({"scope": scope, "key": key, **values}):
+            return True, None
+
+        # Take over keys that expired, or whose claim outlived the lock (a crashed worker).
+        reclaimed = db.session.execute(
+            update(IdempotencyKey)
+            .where(
+                IdempotencyKey.scope == scope,
+                IdempotencyKey.key == key,
+                or_(
+                    IdempotencyKey.expires_at <= now,
+                    and_(IdempotencyKey.status == "in_progress", IdempotencyKey.locked_until <= now),
+                ),
+            )
+            .values(**values)
+        ).rowcount
+        db.session.commit()
+        if reclaimed:
+            return True, None
+        return False, db.session.execute(
+            select(*IdempotencyKey.__table__.c).where(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+        ).first()
+
+    def complete(self, scope: str, key: str, response: Response) -> None:
+        db.session.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+            .values(
+                status="completed",
+                response_status=response.status_code,
+                response_mimetype=response.mimetype,
+                response_body=response.get_data(),
+            )
+        )
+        db.session.commit()
+
+    def release(self, scope: str, key: str) -> None:
+        """Forget a claim whose request failed, so the client's retry runs again."""
+
+        db.session.rollback()
+        db.session.execute(delete(IdempotencyKey).where(IdempotencyKey.scope == scope, IdempotencyKey.key == key))
+        db.session.commit()
+
+    def _maybe_purge(self, now: datetime) -> None:
+        if time.monotonic() - self._last_purge < _PURGE_INTERVAL_SECONDS:
+            return
+        self._last_purge = time.monotonic()
+        db.session.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= now))
+        db.session.commit()
+
+
+def _fingerprint() -> str:
+    digest = hashlib.sha256()
+    digest.update(f"{request.method} {request.path}\n".encode())
+    digest.update(request.get_data(cache=True))
+    return digest.hexdigest()
+
+
+def _stored(row: Row) -> StoredResponse:
+    return StoredResponse(
+        fingerprint=row.fingerprint,
+        status=row.response_status,
+        mimetype=row.response_mimetype,
+        body=row.response_body or b"",
+        expires_at=row.expires_at,
+    )
+
+
+def _error(message: str, status: int, retry_after: Optional[int] = None) -> Tuple[Response, int]:
+    response = jsonify({"error": message})
+    if retry_after is not None:
+        response.headers["Retry-After"] = str(retry_after)
+    return response, status
+
+
+def idempotent(view: F) -> F:
+    """Honour an ``Idempotency-Key`` header on ``view``; requests without one are unaffected."""
+
+    @wraps(view)
+    def wrapper(*args: Any, **kwargs: Any):
+        key = request.headers.get(HEADER)
+        store: Optional[IdempotencyStore] = current_app.extensions.get("idempotency")
+        if not key or store is None:
+            return view(*args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return _error(f"{HEADER} must be at most {MAX_KEY_LENGTH} characters", 400)
+
+        endpoint = request.endpoint or view.__name__
+        caller = client_key()
+        scope = endpoint if caller.startswith("ip:") else f"{endpoint}:{caller}"
+        fingerprint = _fingerprint()
+        deadline = time.monotonic() + store.settings.wait_seconds
+        delay = 0.02
+        while True:
+            now = datetime.utcnow()
+            cached = store.cache.get(scope, key, now)
+            if cached is not None:
+                if cached.fingerprint != fingerprint:
+                    return _error(f"{HEADER} was already used for a different request", 422)
+                return cached.to_response()
+
+            claimed, existing = store.claim(scope, key, fingerprint, now)
+            if claimed:
+                break
+            if existing is None:
+                continue  # released by the first request in the meantime; claim again
+            if existing.fingerprint != fingerprint:
+                return _error(f"{HEADER} was already used for a different request", 422)
+            if existing.status == "completed":
+                stored = _stored(existing)
+                store.cache.put(scope, key, stored)
+                return stored.to_response()
+            if time.monotonic() >= deadline:
+                return _error("A request with this Idempotency-Key is still in progress", 409, retry_after=1)
+            time.sleep(delay)
+            delay = min(delay * 2, 0.25)
+
+        try:
+            response = current_app.make_response(view(*args, **kwargs))
+        except Exception:
+            store.release(scope, key)
+            raise
+        if response.status_code >= 500 or response.is_streamed:
+            store.release(scope, key)
+            return response
+        store.complete(scope, key, response)
+        stored = StoredResponse(
+            fingerprint, response.status_code, response.mimetype, response.get_data(), now + store.settings.ttl
+        )
+        store.cache.put(scope, key, stored)
+        return response
+
+    return cast(F, wrapper)
+
+
+def init_idempotency(app: Flask) -> None:
+    app.extensions["idempotency"] = IdempotencyStore(
+        IdempotencySettings(
+            ttl=timedelta(seconds=float(app.config.get("IDEMPOTENCY_TTL_SECONDS", 24 * 3600))),
+            lock=timedelta(seconds=float(app.config.get("IDEMPOTENCY_LOCK_SECONDS", 60))),
+            wait_seconds=float(app.config.get("IDEMPOTENCY_WAIT_SECONDS", 10)),
+        )
+    )
+
+
+__all__ = ["HEADER", "REPLAYED_HEADER", "IdempotencyStore", "idempotent", "init_idempotency"]
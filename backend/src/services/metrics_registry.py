@@ -0,0 +1,65 @@
+"""Prometheus exposition that aggregates across worker processes when configured.
+
+Multiprocess mode is switched on by ``PROMETHEUS_MULTIPROC_DIR``. It must be
+set in the environment before ``prometheus_client`` is first imported (the
+value class is chosen at import time), which is why it is an environment
+variable rather than a Flask config key. Without it every helper here falls
+back to the default in-process registry, so single-process runs need no setup.
+"""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Optional
+
+from prometheus_client import REGISTRY, CollectorRegistry, generate_latest, multiprocess
+
+
+def multiprocess_dir() -> Optional[str]:
+    """Return the shared metrics directory, or ``None`` in single-process mode."""
+
+    return os.environ.get("PROMETHEUS_MULTIPROC_DIR") or None
+
+
+def prepare_multiprocess_dir() -> None:
+    """Create the metrics directory and drop files left over from a previous run.
+
+    Call this once from the supervising process before any worker starts;
+    stale ``*.db`` files would otherwise be folded into the new totals.
+    """
+
+    path = multiprocess_dir()
+    if not path:
+        return
+    directory = Path(path)
+    directory.mkdir(parents=True, exist_ok=True)
+    for stale in directory.glob("*.db"):
+        stale.unlink(missing_ok=True)
+
+
+def mark_worker_dead(pid: int) -> None:
+    """Remove live-gauge files for a worker that has exited."""
+
+    path = multiprocess_dir()
+    if path:
+        multiprocess.mark_process_dead(pid, path)
+
+
+def render_latest() -> bytes:
+    """Render the exposition payload, aggregated across workers when enabled."""
+
+    path = multiprocess_dir()
+    if not path:
+        return generate_latest(REGISTRY)
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=path)
+    return generate_latest(registry)
+
+
+__all__ = [
+    "mark_worker_dead",
+    "multiprocess_dir",
+    "prepare_multiprocess_dir",
+    "render_latest",
+]
@@ -4,15 +4,18 @@ from __future__ import annotations
 import json
 import smtplib
 from abc import ABC, abstractmethod
+from collections import defaultdict
 from dataclasses import dataclass
 from email.message import EmailMessage
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
-import requests
 from flask import current_app
 
+from src.lazy_imports import lazy_import
 from src.models.ride import Ride
 
+requests = lazy_import("requests")
+
 
 class BaseEmailProvider(ABC):
     """Contract for sending email notifications."""
@@ -135,6 +138,42 @@ class NotificationService:
                 current_app.logger.exception("Failed to send SMS notification: %s", exc)
 
 
+    def notify_rides_booked(self, rides: Sequence[Any], context: Optional[Dict[str, Any]] = None) -> None:
+        """Send each contact one message covering all of its rides from a bulk booking."""
+
+        by_email: Dict[str, List[Any]] = defaultdict(list)
+        by_phone: Dict[str, List[Any]] = defaultdict(list)
+        for ride in rides:
+            if ride.user_email:
+                by_email[ride.user_email].append(ride)
+            if ride.user_phone:
+                by_phone[ride.user_phone].append(ride)
+
+        def _body(group: List[Any]) -> str:
+            lines = [f"{len(group)} rides booked"]
+            for ride in group:
+                when = ride.scheduled_time.isoformat() if ride.scheduled_time else "as soon as possible"
+                lines.append(f"#{ride.id} {ride.pickup_address} -> {ride.dest_address} at {when} (€{ride.fare})")
+            payment = (context or {}).get("payment")
+            if payment:
+                lines.append(f"Payment status: {payment.get('status')} | Total: €{payment.get('amount_eur')}")
+            return "\n".join(lines)
+
+        subject = "Kos Taxi rides booked"
+        if self.providers.email:
+            for email, group in by_email.items():
+                try:
+                    self.providers.email.send(email, subject, _body(group))
+                except Exception as exc:  # pragma: no cover - log and continue
+                    current_app.logger.exception("Failed to send email notification: %s", exc)
+        if self.providers.sms:
+            for phone, group in by_phone.items():
+                try:
+                    self.providers.sms.send(phone, _body(group))
+                except Exception as exc:  # pragma: no cover - log and continue
+                    current_app.logger.exception("Failed to send SMS notification: %s", exc)
+
+
 def _build_email_provider() -> Optional[BaseEmailProvider]:
     app = current_app
     provider = (app.config.get("NOTIFICATIONS_EMAIL_PROVIDER") or "console").lower()
@@ -0,0 +1,237 @@
+"""Keyset pagination and sparse fieldsets shared by the list endpoints.
+
+Lists are ordered newest first by ``(created_at, id)`` (``id`` alone for
+models without ``created_at``), with rows whose ``created_at`` is NULL last.
+The cursor is an opaque token holding the sort key of the last row returned.
+Each page is a range scan of the matching ``(..., created_at, id)`` index (a
+second one on the NULL ``created_at`` rows when the first runs short), no
+matter how deep the client pages, and rows inserted meanwhile never shift a
+page.
+
+``?fields=a,b`` restricts the response to a model's ``SPARSE_FIELDS`` and maps
+onto ``load_only`` (or a narrower projection for read-model queries) so
+unrequested columns are never read.
+"""
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from flask import request
+from sqlalchemy import DateTime, tuple_
+from sqlalchemy.orm import load_only, selectinload
+
+from src.services.read_models import RowQuery
+
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 500
+
+
+class PaginationError(ValueError):
+    """Raised for malformed cursors, limits or field lists."""
+
+
+def _sort_columns(model) -> Tuple:
+    created_at = getattr(model, "created_at", None)
+    return (model.id,) if created_at is None else (created_at, model.id)
+
+
+def _model(query):
+    return query.model if isinstance(query, RowQuery) else query.column_descriptions[0]["entity"]
+
+
+def _sort_values(row, model) -> Tuple:
+    return tuple(getattr(row, column.key) for column in _sort_columns(model))
+
+
+def _merge_key(row, model) -> Tuple:
+    # Mirrors the SQL order when pages from several queries are merged: NULL dates last.
+    return tuple((False, datetime.min) if value is None else (True, value) for value in _sort_values(row, model))
+
+
+def encode_cursor(row, model=None) -> str:
+    key = _sort_values(row, model or type(row))
+    values = [value.isoformat() if isinstance(value, datetime) else value for value in key]
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, model) -> Tuple:
+    columns = _sort_columns(model)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError(token)
+        return tuple(_decode_value(column, value) for column, value in zip(columns, values))
+    except (ValueError, TypeError, binascii.Error) as exc:
+        raise PaginationError("Invalid cursor") from exc
+
+
+def _decode_value(column, value):
+    if value is None and column.nullable and not column.primary_key:
+        return None
+    return datetime.fromisoformat(value) if isinstance(column.type, DateTime) else int(value)
+
+
+def _segments(model, key: Optional[Tuple]) -> List[Tuple]:
+    """Filters for the rows after ``key``, one per index range, in page order.
+
+    Rows with a NULL ``created_at`` come after every dated row; SQL compares
+    NULL to nothing, so they are read by a separate ``created_at IS NULL``
+    range ordered by ``id``.
+    """
+
+    columns = _sort_columns(model)
+    if len(columns) == 1:
+        return [()] if key is None else [(columns[0] < key[0],)]
+    created_at, id_column = columns
+    undated = (created_at.is_(None),)
+    if key is None:
+        dated = (created_at.isnot(None),)
+    elif key[0] is None:
+        return [(created_at.is_(None), id_column < key[1])]
+    else:
+        dated = (tuple_(created_at, id_column) < tuple_(*key),)
+    return [dated, undated] if created_at.nullable else [dated]
+
+
+def parse_fields(model, raw: Optional[str]) -> Optional[List[str]]:
+    """Validate a ``fields`` parameter against ``model.SPARSE_FIELDS``; ``None`` means all."""
+
+    if not raw:
+        return None
+    fields = list(dict.fromkeys(field.strip() for field in raw.split(",") if field.strip()))
+    unknown = [field for field in fields if field not in model.SPARSE_FIELDS]
+    if unknown:
+        raise PaginationError(
+            f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(sorted(model.SPARSE_FIELDS))}"
+        )
+    return fields if "id" in fields else ["id", *fields]
+
+
+def parse_limit(raw: Optional[str], default: int = DEFAULT_PAGE_LIMIT) -> int:
+    if raw in (None, ""):
+        return default
+    try:
+        limit = int(raw)
+    except ValueError as exc:
+        raise PaginationError("limit must be an integer") from exc
+    if limit < 1:
+        raise PaginationError("limit must be positive")
+    return min(limit, MAX_PAGE_LIMIT)
+
+
+def serialize(row, fields: Optional[List[str]], sparse_fields: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    if fields is None:
+        return row.to_dict()
+    sparse_fields = sparse_fields or row.SPARSE_FIELDS
+    payload = {}
+    for field in fields:
+        value = getattr(row, sparse_fields[field])
+        payload[field] = value.isoformat() if isinstance(value, datetime) else value
+    return payload
+
+
+@dataclass
+class Page:
+    items: List[Any]
+    fields: Optional[List[str]]
+    next_cursor: Optional[str]
+    has_more: bool
+    sparse_fields: Optional[Dict[str, str]] = None
+    limit: Optional[int] = None
+
+    def payload(self, key: str) -> Dict[str, Any]:
+        # ``limit`` is echoed so callers that never passed one can see the default cap.
+        return {
+            key: [serialize(row, self.fields, self.sparse_fields) for row in self.items],
+            "next_cursor": self.next_cursor,
+            "has_more": self.has_more,
+            "limit": self.limit,
+        }
+
+
+def paginate(
+    queries: Sequence,
+    *,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_LIMIT,
+    fields: Optional[List[str]] = None,
+    eager: Sequence[str] = (),
+) -> Page:
+    """Return one page merged from ``queries`` (e.g. live and archived rides).
+
+    ``queries`` are ORM queries or :class:`RowQuery` read models, all over
+    models sharing the same sort key and field map. For ORM queries the
+    ``eager`` relationships are batch-loaded only when full rows are serialised.
+    """
+
+    model = _model(queries[0])
+    rows: List[Any] = []
+    for query in queries:
+        query_model = _model(query)
+        key = decode_cursor(cursor, query_model) if cursor else None
+        if fields is not None:
+            columns = dict.fromkeys(
+                [*(getattr(query_model, query_model.SPARSE_FIELDS[field]) for field in fields),
+                 *_sort_columns(query_model)]
+            )
+            if isinstance(query, RowQuery):
+                query = query.only(*columns)
+            else:
+                query = query.options(load_only(*columns))
+        elif not isinstance(query, RowQuery):
+            query = query.options(*(selectinload(getattr(query_model, name)) for name in eager))
+        ordered = query.order_by(None).order_by(*(column.desc() for column in _sort_columns(query_model)))
+        wanted = limit + 1
+        for segment in _segments(query_model, key):
+            found = list(ordered.filter(*segment).limit(wanted))
+            rows.extend(found)
+            wanted -= len(found)
+            if not wanted:
+                break
+
+    if len(queries) > 1:
+        rows.sort(key=lambda row: _merge_key(row, model), reverse=True)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(rows[-1], model) if has_more else None
+    return Page(rows, fields, next_cursor, has_more, getattr(model, "SPARSE_FIELDS", None), limit)
+
+
+def pagination_requested() -> bool:
+    """Whether the request passed any of ``cursor``, ``limit`` or ``fields``."""
+
+    return any(request.args.get(name) for name in ("cursor", "limit", "fields"))
+
+
+def paginate_request(queries: Sequence, *, eager: Sequence[str] = ()) -> Page:
+    """Paginate using the current request's ``cursor``, ``limit`` and ``fields`` arguments."""
+
+    model = _model(queries[0])
+    return paginate(
+        queries,
+        cursor=request.args.get("cursor") or None,
+        limit=parse_limit(request.args.get("limit")),
+        fields=parse_fields(model, request.args.get("fields")),
+        eager=eager,
+    )
+
+
+__all__ = [
+    "DEFAULT_PAGE_LIMIT",
+    "MAX_PAGE_LIMIT",
+    "Page",
+    "PaginationError",
+    "decode_cursor",
+    "encode_cursor",
+    "paginate",
+    "paginate_request",
+    "pagination_requested",
+    "parse_fields",
+    "parse_limit",
+    "serialize",
+]
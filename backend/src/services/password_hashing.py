@@ -0,0 +1,181 @@
+"""Bounded process pool for bcrypt password hashing and verification."""
+from __future__ import annotations
+
+import atexit
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+from flask import Flask, Response, current_app, jsonify
+from prometheus_client import Counter, Histogram
+
+_pwd_context = None
+
+_QUEUE_WAIT: Optional[Histogram] = None
+_REJECTIONS: Optional[Counter] = None
+
+
+class PasswordHashingBusy(Exception):
+    """Raised when the hashing pool has no admission capacity left."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__("Password hashing pool is saturated")
+        self.retry_after = retry_after
+
+
+def _get_context():
+    # passlib/bcrypt are imported on first use to keep application start-up fast.
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+
+        _pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return _pwd_context
+
+
+def _hash_in_worker(password: str) -> Tuple[str, float]:
+    # time.monotonic() is system-wide, so the parent can compare it with its own clock.
+    started_at = time.monotonic()
+    return _get_context().hash(password), started_at
+
+
+def _verify_in_worker(password: str, password_hash: str) -> Tuple[bool, float]:
+    started_at = time.monotonic()
+    return _get_context().verify(password, password_hash), started_at
+
+
+class PasswordHasher:
+    """Run bcrypt in a dedicated process pool guarded by an admission limit.
+
+    ``workers`` of ``0`` runs hashing inline in the calling thread, which keeps
+    tests and single-shot scripts free of child processes while still applying
+    the admission limit.
+    """
+
+    def __init__(self, workers: int, max_pending: int, retry_after: int) -> None:
+        self.workers = max(0, workers)
+        self.retry_after = max(1, retry_after)
+        self._slots = threading.BoundedSemaphore(max(1, max_pending))
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    # Created lazily so prefork servers start the pool per worker.
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def _run(self, operation: str, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            if _REJECTIONS is not None:
+                _REJECTIONS.labels(operation).inc()
+            raise PasswordHashingBusy(self.retry_after)
+
+        try:
+            submitted_at = time.monotonic()
+            if self.workers == 0:
+                result, started_at = fn(*args)
+            else:
+                result, started_at = self._get_executor().submit(fn, *args).result()
+            if _QUEUE_WAIT is not None:
+                _QUEUE_WAIT.labels(operation).observe(max(0.0, started_at - submitted_at))
+            return result
+        finally:
+            self._slots.release()
+
+    def hash(self, password: str) -> str:
+        """Return a bcrypt hash for ``password``."""
+
+        return self._run("hash", _hash_in_worker, password)
+
+    def verify(self, password: str, password_hash: str) -> bool:
+        """Return whether ``password`` matches ``password_hash``."""
+
+        return self._run("verify", _verify_in_worker, password, password_hash)
+
+    def shutdown(self) -> None:
+        """Stop the worker processes, if any were started."""
+
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def after_fork(self) -> None:
+        """Forget a pool inherited from the parent process; the child starts its own lazily."""
+
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+
+def _init_hashing_metrics(namespace: str) -> None:
+    global _QUEUE_WAIT, _REJECTIONS
+    if _QUEUE_WAIT is not None and _REJECTIONS is not None:
+        return
+
+    _QUEUE_WAIT = Histogram(
+        "password_hash_queue_wait_seconds",
+        "Time password hashing jobs wait for a pool worker.",
+        ("operation",),
+        namespace=namespace,
+        buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+    )
+    _REJECTIONS = Counter(
+        "password_hash_rejections_total",
+        "Password hashing jobs rejected because the pool was saturated.",
+        ("operation",),
+        namespace=namespace,
+    )
+
+
+def init_password_hashing(app: Flask) -> None:
+    """Attach the hashing pool to ``app`` and translate saturation into 503s."""
+
+    namespace = (app.config.get("METRICS_NAMESPACE") or "kos_taxi").replace("-", "_")
+    _init_hashing_metrics(namespace)
+
+    workers = int(app.config.get("PASSWORD_HASH_WORKERS", 2))
+    hasher = PasswordHasher(
+        workers=workers,
+        max_pending=int(app.config.get("PASSWORD_HASH_MAX_PENDING", max(1, workers) * 4)),
+        retry_after=int(app.config.get("PASSWORD_HASH_RETRY_AFTER", 1)),
+    )
+    app.extensions["password_hasher"] = hasher
+    atexit.register(hasher.shutdown)
+
+    @app.errorhandler(PasswordHashingBusy)
+    def _password_hashing_busy(exc: PasswordHashingBusy) -> Tuple[Response, int]:
+        response = jsonify({"error": "Authentication service is busy, please retry shortly"})
+        response.headers["Retry-After"] = str(exc.retry_after)
+        return response, 503
+
+
+def get_password_hasher() -> PasswordHasher:
+    """Return the hashing pool bound to the current app."""
+
+    return current_app.extensions["password_hasher"]
+
+
+def hash_password(password: str) -> str:
+    """Hash ``password`` on the current app's hashing pool."""
+
+    return get_password_hasher().hash(password)
+
+
+def verify_password(password: str, password_hash: str) -> bool:
+    """Verify ``password`` against ``password_hash`` on the current app's hashing pool."""
+
+    return get_password_hasher().verify(password, password_hash)
+
+
+__all__ = [
+    "PasswordHasher",
+    "PasswordHashingBusy",
+    "get_password_hasher",
+    "hash_password",
+    "init_password_hashing",
+    "verify_password",
+]
@@ -0,0 +1,202 @@
+"""Opt-in CPU profiling for individual requests plus a low-rate stack sampler.
+
+Two modes, both disabled unless ``PROFILING_ENABLED`` is set:
+
+* **On demand** – a request carrying a signed token in the ``X-Profile-Token``
+  header (or ``?_profile=`` query parameter) runs under ``cProfile`` and the
+  result is written as a ``.pstats`` file to ``PROFILE_DIR``. Tokens are minted
+  with ``flask profile-token`` and expire after ``PROFILE_TOKEN_MAX_AGE``.
+* **Sampling** – with ``PROFILE_SAMPLING_HZ`` above zero a daemon thread
+  samples the stacks of in-flight request threads and aggregates them per
+  endpoint in collapsed-stack format, which speedscope and flamegraph.pl import
+  directly.
+"""
+from __future__ import annotations
+
+import cProfile
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import click
+from flask import Flask, Response, current_app, g, request
+from itsdangerous import BadSignature, TimestampSigner
+
+_TOKEN_SALT = "kos-taxi-request-profile"
+_TOKEN_PAYLOAD = "profile"
+_MAX_STACK_DEPTH = 64
+
+
+def _get_signer(app: Flask) -> TimestampSigner:
+    secret = app.config.get("PROFILING_SECRET") or app.config["SECRET_KEY"]
+    return TimestampSigner(secret, salt=_TOKEN_SALT)
+
+
+def create_profile_token(app: Flask) -> str:
+    """Return a signed token that enables profiling for requests carrying it."""
+
+    return _get_signer(app).sign(_TOKEN_PAYLOAD).decode("utf-8")
+
+
+def _token_is_valid(app: Flask, token: str) -> bool:
+    max_age = int(app.config.get("PROFILE_TOKEN_MAX_AGE", 3600))
+    try:
+        return _get_signer(app).unsign(token, max_age=max_age) == _TOKEN_PAYLOAD.encode("utf-8")
+    except BadSignature:
+        return False
+
+
+class StackSampler:
+    """Periodically sample request threads and aggregate collapsed stacks per endpoint."""
+
+    def __init__(self, interval: float, max_stacks_per_endpoint: int = 5000) -> None:
+        self.interval = interval
+        self.max_stacks_per_endpoint = max_stacks_per_endpoint
+        self._active: Dict[int, str] = {}
+        self._stacks: Dict[str, Counter] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="request-stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def after_fork(self) -> None:
+        """Restart sampling in a forked child; threads do not survive ``fork()``."""
+
+        if self._thread is None:
+            return
+        self._lock = threading.Lock()
+        self._active = {}
+        self._thread = None
+        self.start()
+
+    def track(self, thread_id: int, endpoint: str) -> None:
+        self._active[thread_id] = endpoint
+
+    def untrack(self, thread_id: int) -> None:
+        self._active.pop(thread_id, None)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.sample_once()
+
+    def sample_once(self) -> None:
+        active = dict(self._active)
+        if not active:
+            return
+        frames = sys._current_frames()
+        with self._lock:
+            for thread_id, endpoint in active.items():
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                stack = _collapse(frame)
+                counts = self._stacks.setdefault(endpoint, Counter())
+                if stack in counts or len(counts) < self.max_stacks_per_endpoint:
+                    counts[stack] += 1
+
+    def endpoints(self) -> List[str]:
+        with self._lock:
+            return sorted(self._stacks)
+
+    def collapsed(self, endpoint: str) -> str:
+        """Return ``frame;frame;frame count`` lines for ``endpoint``."""
+
+        with self._lock:
+            counts = self._stacks.get(endpoint, Counter())
+            return "".join(f"{stack} {count}\n" for stack, count in counts.most_common())
+
+
+def _collapse(frame) -> str:
+    names: List[str] = []
+    while frame is not None and len(names) < _MAX_STACK_DEPTH:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def get_stack_sampler() -> Optional[StackSampler]:
+    """Return the sampler for the current app, if sampling is enabled."""
+
+    return current_app.extensions.get("stack_sampler")
+
+
+def _write_profile(profiler: cProfile.Profile, profile_dir: Path, endpoint: str) -> str:
+    profile_dir.mkdir(parents=True, exist_ok=True)
+    profile_id = f"{endpoint.replace('.', '-')}-{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    profiler.dump_stats(str(profile_dir / f"{profile_id}.pstats"))
+    return profile_id
+
+
+def init_profiling(app: Flask) -> None:
+    """Register profiling hooks when ``PROFILING_ENABLED`` is set."""
+
+    if not app.config.get("PROFILING_ENABLED"):
+        return
+
+    profile_dir = Path(app.config.get("PROFILE_DIR") or "profiles")
+    sampling_hz = float(app.config.get("PROFILE_SAMPLING_HZ", 0) or 0)
+    sampler: Optional[StackSampler] = None
+    if sampling_hz > 0:
+        sampler = StackSampler(interval=1.0 / sampling_hz)
+        sampler.start()
+        app.extensions["stack_sampler"] = sampler
+
+    @app.cli.command("profile-token")
+    def profile_token_command() -> None:
+        """Print a signed token that enables per-request profiling."""
+
+        click.echo(create_profile_token(app))
+
+    @app.before_request
+    def _profiling_before_request() -> None:  # pragma: no cover - flask hook
+        if sampler is not None:
+            sampler.track(threading.get_ident(), request.endpoint or "unknown")
+
+        token = request.headers.get("X-Profile-Token") or request.args.get("_profile")
+        if not token or not _token_is_valid(app, token):
+            return
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already active in this thread.
+            return
+        g._request_profiler = profiler
+
+    @app.after_request
+    def _profiling_after_request(response: Response) -> Response:  # pragma: no cover - flask hook
+        profiler: Optional[cProfile.Profile] = g.pop("_request_profiler", None)
+        if profiler is not None:
+            profiler.disable()
+            profile_id = _write_profile(profiler, profile_dir, request.endpoint or "unknown")
+            response.headers["X-Profile-Id"] = profile_id
+        return response
+
+    @app.teardown_request
+    def _profiling_teardown_request(exc: Optional[BaseException]) -> None:  # pragma: no cover - flask hook
+        profiler: Optional[cProfile.Profile] = g.pop("_request_profiler", None)
+        if profiler is not None:
+            profiler.disable()
+        if sampler is not None:
+            sampler.untrack(threading.get_ident())
+
+
+__all__ = [
+    "StackSampler",
+    "create_profile_token",
+    "get_stack_sampler",
+    "init_profiling",
+]
@@ -0,0 +1,186 @@
+"""SQLAlchemy cursor instrumentation: query timing, per-request counts and a slow-query log."""
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, List, Optional
+
+from flask import Flask, Response, current_app, g, has_app_context, has_request_context, request
+from prometheus_client import Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+slow_query_logger = logging.getLogger("src.sql.slow")
+
+_QUERY_LATENCY: Optional[Histogram] = None
+_QUERIES_PER_REQUEST: Optional[Histogram] = None
+_LISTENERS_INSTALLED = False
+
+_LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LIST_PATTERN = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+_TABLE_PATTERN = re.compile(r"\b(?:from|into|update|join)\s+[\"`\[]?(\w+)", re.IGNORECASE)
+_EXPLAINABLE_VERBS = frozenset({"select", "insert", "update", "delete"})
+
+
+@dataclass(frozen=True)
+class QueryMetricsSettings:
+    slow_query_threshold: float
+    explain_slow_queries: bool
+
+
+@lru_cache(maxsize=1024)
+def fingerprint_statement(statement: str) -> str:
+    """Return a low-cardinality label such as ``select:rides:1a2b3c4d`` for a SQL statement."""
+
+    normalised = _WHITESPACE_PATTERN.sub(" ", statement).strip()
+    normalised = _LITERAL_PATTERN.sub("?", normalised)
+    normalised = _IN_LIST_PATTERN.sub("(?+)", normalised).lower()
+    verb = normalised.split(" ", 1)[0] if normalised else "unknown"
+    table_match = _TABLE_PATTERN.search(normalised)
+    table = table_match.group(1) if table_match else "-"
+    digest = hashlib.sha1(normalised.encode("utf-8")).hexdigest()[:8]
+    return f"{verb}:{table}:{digest}"
+
+
+def _describe_parameters(parameters: Any, executemany: bool) -> str:
+    """Describe the shape of bound parameters without leaking their values."""
+
+    if executemany and isinstance(parameters, (list, tuple)):
+        first = _describe_parameters(parameters[0], False) if parameters else "empty"
+        return f"{len(parameters)} x {first}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+    return type(parameters).__name__
+
+
+def _explain(conn, statement: str, parameters: Any, executemany: bool) -> List[str]:
+    """Run ``EXPLAIN QUERY PLAN`` on a fresh DBAPI cursor; SQLite DML only.
+
+    The plan is read on the caller's connection, inside its transaction. On
+    PostgreSQL a failed ``EXPLAIN`` would abort that transaction, and on every
+    dialect ``EXPLAIN`` of DDL or ``PRAGMA`` is meaningless, so anything else
+    is left uncaptured.
+    """
+
+    verb = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else ""
+    if conn.dialect.name != "sqlite" or verb not in _EXPLAINABLE_VERBS:
+        return []
+    if executemany:
+        parameters = parameters[0] if parameters else ()
+    # A separate raw cursor avoids clobbering the caller's pending result set
+    # and bypasses these event hooks, so the EXPLAIN itself is never timed.
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters)
+        return [" | ".join(str(column) for column in row) for row in cursor.fetchall()]
+    except Exception as exc:  # pragma: no cover - plan capture is best effort
+        return [f"<explain failed: {exc}>"]
+    finally:
+        cursor.close()
+
+
+def _current_settings() -> Optional[QueryMetricsSettings]:
+    if not has_app_context():
+        return None
+    return current_app.extensions.get("query_metrics")
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = conn.info.get("query_started_at")
+    if not started:
+        return
+    duration = time.perf_counter() - started.pop()
+
+    settings = _current_settings()
+    if settings is None:
+        return
+
+    endpoint = "none"
+    if has_request_context():
+        endpoint = request.endpoint or "unknown"
+        g._db_query_count = getattr(g, "_db_query_count", 0) + 1
+
+    fingerprint = fingerprint_statement(statement)
+    if _QUERY_LATENCY is not None:
+        _QUERY_LATENCY.labels(endpoint, fingerprint).observe(duration)
+
+    if duration >= settings.slow_query_threshold:
+        plan = _explain(conn, statement, parameters, executemany) if settings.explain_slow_queries else []
+        slow_query_logger.warning(
+            "Slow query %.1fms endpoint=%s fingerprint=%s params=%s\n%s\nplan:\n  %s",
+            duration * 1000,
+            endpoint,
+            fingerprint,
+            _describe_parameters(parameters, executemany),
+            statement,
+            "\n  ".join(plan) or "<not captured>",
+        )
+
+
+def _handle_error(context) -> None:
+    # A failed statement never reaches after_cursor_execute; drop its start time so
+    # the pooled connection's stack does not grow or skew later timings.
+    conn = context.connection
+    if conn is not None and context.execution_context is not None:
+        started = conn.info.get("query_started_at")
+        if started:
+            started.pop()
+
+
+def _install_listeners() -> None:
+    global _LISTENERS_INSTALLED
+    if _LISTENERS_INSTALLED:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+    _LISTENERS_INSTALLED = True
+
+
+def init_query_metrics(app: Flask) -> None:
+    """Instrument SQL executed on behalf of ``app`` with Prometheus metrics."""
+
+    global _QUERY_LATENCY, _QUERIES_PER_REQUEST
+    if _QUERY_LATENCY is None or _QUERIES_PER_REQUEST is None:
+        namespace = (app.config.get("METRICS_NAMESPACE") or "kos_taxi").replace("-", "_")
+        _QUERY_LATENCY = Histogram(
+            "db_query_duration_seconds",
+            "Time spent executing SQL statements.",
+            ("endpoint", "fingerprint"),
+            namespace=namespace,
+            buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+        )
+        _QUERIES_PER_REQUEST = Histogram(
+            "db_queries_per_request",
+            "Number of SQL statements executed while serving a request.",
+            ("endpoint",),
+            namespace=namespace,
+            buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+        )
+
+    app.extensions["query_metrics"] = QueryMetricsSettings(
+        slow_query_threshold=float(app.config.get("SLOW_QUERY_THRESHOLD_MS", 200)) / 1000,
+        explain_slow_queries=bool(app.config.get("SLOW_QUERY_EXPLAIN", True)),
+    )
+    _install_listeners()
+
+    @app.after_request
+    def _query_metrics_after_request(response: Response) -> Response:  # pragma: no cover - flask hook
+        if _QUERIES_PER_REQUEST is not None:
+            endpoint = request.endpoint or "unknown"
+            _QUERIES_PER_REQUEST.labels(endpoint).observe(getattr(g, "_db_query_count", 0))
+        return response
+
+
+__all__ = ["fingerprint_statement", "init_query_metrics", "slow_query_logger"]
@@ -0,0 +1,243 @@
+"""Read models: list endpoints select columns straight into slotted row tuples.
+
+Listing rides, drivers or payments through the ORM builds a mapped instance
+per row, registers it in the session's identity map and instruments every
+attribute, only for ``to_dict`` to copy the values out again. The queries here
+are Core ``select()`` statements over the model tables. Each result row becomes
+a ``NamedTuple`` (no per-instance ``__dict__``) whose ``to_dict`` returns
+exactly what the model's ``to_dict`` returns. A ride's payment comes from the
+same statement through an outer join, so there is no per-ride lazy load.
+
+Only use these for read-only listings. Anything that modifies rows keeps
+loading the models.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional
+
+from sqlalchemy import select
+from sqlalchemy.sql import Select
+
+from src.models import Payment, db
+from src.models.driver import Driver
+from src.models.ride import Ride
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+class PaymentRow(NamedTuple):
+    id: int
+    ride_id: int
+    stripe_payment_intent_id: str
+    status: str
+    amount: int
+    currency: str
+    metadata_json: Optional[dict]
+    customer_email: Optional[str]
+    customer_phone: Optional[str]
+    last_error: Optional[str]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Same keys as ``Payment.to_dict()``; the client secret is never selected."""
+
+        return {
+            "id": self.id,
+            "ride_id": self.ride_id,
+            "payment_intent_id": self.stripe_payment_intent_id,
+            "status": self.status,
+            "amount": self.amount,
+            "amount_eur": round(self.amount / 100, 2),
+            "currency": self.currency,
+            "metadata": self.metadata_json or {},
+            "customer_email": self.customer_email,
+            "customer_phone": self.customer_phone,
+            "last_error": self.last_error,
+            "created_at": _iso(self.created_at),
+            "updated_at": _iso(self.updated_at),
+        }
+
+
+class DriverRow(NamedTuple):
+    id: int
+    name: str
+    email: str
+    phone: str
+    vehicle_model: str
+    vehicle_plate: str
+    is_available: Optional[bool]
+    current_lat: Optional[float]
+    current_lon: Optional[float]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+    last_login_at: Optional[datetime]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "email": self.email,
+            "phone": self.phone,
+            "vehicle_model": self.vehicle_model,
+            "vehicle_plate": self.vehicle_plate,
+            "is_available": self.is_available,
+            "current_lat": self.current_lat,
+            "current_lon": self.current_lon,
+            "created_at": _iso(self.created_at),
+            "updated_at": _iso(self.updated_at),
+            "last_login_at": _iso(self.last_login_at),
+        }
+
+
+class RideRow(NamedTuple):
+    id: int
+    rider_name: Optional[str]
+    user_email: Optional[str]
+    user_phone: Optional[str]
+    driver_id: Optional[int]
+    pickup_lat: Optional[float]
+    pickup_lon: Optional[float]
+    pickup_address: str
+    dest_lat: Optional[float]
+    dest_lon: Optional[float]
+    dest_address: str
+    status: str
+    fare: float
+    distance_km: float
+    estimated_duration_minutes: int
+    passenger_count: int
+    scheduled_time: Optional[datetime]
+    notes: Optional[str]
+    payment_intent_id: Optional[str]
+    payment_status: Optional[str]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+    payment: Optional[PaymentRow] = None
+
+    def to_dict(self, *, include_payment: bool = True) -> Dict[str, Any]:
+        payment = self.payment
+        payload = {
+            "id": self.id,
+            "rider_name": self.rider_name,
+            "user_email": self.user_email,
+            "user_phone": self.user_phone,
+            "driver_id": self.driver_id,
+            "pickup_lat": self.pickup_lat,
+            "pickup_lon": self.pickup_lon,
+            "pickup_address": self.pickup_address,
+            "dest_lat": self.dest_lat,
+            "dest_lon": self.dest_lon,
+            "dest_address": self.dest_address,
+            "dropoff_address": self.dest_address,
+            "destination_address": self.dest_address,
+            "status": self.status,
+            "fare": self.fare,
+            "distance_km": self.distance_km,
+            "estimated_duration_minutes": self.estimated_duration_minutes,
+            "passenger_count": self.passenger_count,
+            "scheduled_time": _iso(self.scheduled_time),
+            "notes": self.notes,
+            "payment_intent_id": payment.stripe_payment_intent_id if payment else self.payment_intent_id,
+            "payment_status": payment.status if payment else self.payment_status,
+            "customer_phone": self.user_phone,
+            "created_at": _iso(self.created_at),
+            "updated_at": _iso(self.updated_at),
+        }
+        if include_payment:
+            payload["payment"] = payment.to_dict() if payment else None
+        return payload
+
+
+_RIDE_FIELDS = RideRow._fields[:-1]
+
+
+class RowQuery:
+    """A Core ``select`` over ``model``'s table whose result rows are passed through ``build``.
+
+    Supports the subset of ``Query`` used by the list endpoints and by
+    :func:`src.services.pagination.paginate`: ``filter``, ``order_by``,
+    ``limit``, ``all`` and iteration.
+    """
+
+    __slots__ = ("model", "statement", "build")
+
+    def __init__(self, model: Any, statement: Select, build: Callable[[Any], Any]) -> None:
+        self.model = model
+        self.statement = statement
+        self.build = build
+
+    def _replace(self, statement: Select, build: Optional[Callable[[Any], Any]] = None) -> "RowQuery":
+        return RowQuery(self.model, statement, build or self.build)
+
+    def filter(self, *criteria: Any) -> "RowQuery":
+        return self._replace(self.statement.where(*criteria))
+
+    def order_by(self, *clauses: Any) -> "RowQuery":
+        return self._replace(self.statement.order_by(*clauses))
+
+    def limit(self, limit: int) -> "RowQuery":
+        return self._replace(self.statement.limit(limit))
+
+    def only(self, *columns: Any) -> "RowQuery":
+        """Select just ``columns``; rows come back as plain ``Row`` objects keyed by column name."""
+
+        mapped = self.model.__mapper__.columns
+        return self._replace(self.statement.with_only_columns(*(mapped[column.key] for column in columns)), _identity)
+
+    def __iter__(self) -> Iterator[Any]:
+        # Executed on the session's connection, so ORM attributes in criteria
+        # do not route the rows through ORM result processing.
+        build = self.build
+        return (build(row) for row in db.session.connection().execute(self.statement))
+
+    def all(self) -> List[Any]:
+        return list(self)
+
+
+def _identity(row: Any) -> Any:
+    return row
+
+
+def _columns(model: Any, names) -> list:
+    columns = model.__mapper__.columns
+    return [columns[name] for name in names]
+
+
+def driver_rows() -> RowQuery:
+    return RowQuery(Driver, select(*_columns(Driver, DriverRow._fields)), DriverRow._make)
+
+
+def payment_rows(payment_model: Any = Payment) -> RowQuery:
+    return RowQuery(payment_model, select(*_columns(payment_model, PaymentRow._fields)), PaymentRow._make)
+
+
+def ride_rows(ride_model: Any = Ride, payment_model: Any = Payment) -> RowQuery:
+    """Rides (live, or archived with the archive models) with their payment outer-joined."""
+
+    split = len(_RIDE_FIELDS)
+
+    def build(row: Any) -> RideRow:
+        payment = PaymentRow._make(row[split:]) if row[split] is not None else None
+        return RideRow._make((*row[:split], payment))
+
+    statement = select(
+        *_columns(ride_model, _RIDE_FIELDS), *_columns(payment_model, PaymentRow._fields)
+    ).select_from(
+        ride_model.__table__.outerjoin(payment_model.__table__, payment_model.ride_id == ride_model.id)
+    )
+    return RowQuery(ride_model, statement, build)
+
+
+__all__ = [
+    "DriverRow",
+    "PaymentRow",
+    "RideRow",
+    "RowQuery",
+    "driver_rows",
+    "payment_rows",
+    "ride_rows",
+]
@@ -0,0 +1,122 @@
+"""Read-replica routing for dashboards and list endpoints.
+
+With ``DATABASE_REPLICA_URL`` set, a second engine is created for it.
+``GET`` requests to views marked with :func:`reads_from_replica` then run their
+queries there (see :class:`src.models.session.RoutingSession`). Everything else
+uses the primary.
+
+For read-your-writes, a successful write request sets a short-lived cookie.
+While the cookie is present, that client's reads stay on the primary for
+``REPLICA_STICKY_SECONDS``, so its own booking or status change never
+disappears behind replication lag.
+
+For local testing, the replica can be a second SQLite file refreshed from the
+primary with the SQLite backup API (``flask replica-sync``).
+"""
+from __future__ import annotations
+
+import sqlite3
+import time
+from functools import wraps
+from typing import Any, Callable, Optional, TypeVar, cast
+
+from flask import Flask, Response, current_app, g, request
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+
+from src.models.session import REPLICA_EXTENSION
+
+STICKY_COOKIE = "kos_db_primary_until"
+_READ_METHODS = {"GET", "HEAD"}
+_SAFE_METHODS = _READ_METHODS | {"OPTIONS"}
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def reads_from_replica(view: F) -> F:
+    """Allow ``view`` to read from the replica; it must not depend on the caller's very latest writes."""
+
+    @wraps(view)
+    def wrapper(*args: Any, **kwargs: Any):
+        return view(*args, **kwargs)
+
+    wrapper._reads_from_replica = True  # type: ignore[attr-defined]
+    return cast(F, wrapper)
+
+
+def _sticky_until() -> float:
+    try:
+        return float(request.cookies.get(STICKY_COOKIE, 0))
+    except ValueError:
+        return 0.0
+
+
+def using_replica() -> bool:
+    return bool(g.get("_db_use_replica", False))
+
+
+def sqlite_path(url: str) -> Optional[str]:
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite" or not parsed.database or parsed.database == ":memory:":
+        return None
+    return parsed.database
+
+
+def sync_sqlite_replica(primary_url: str, replica_url: str) -> None:
+    """Copy the primary SQLite database onto the replica file with the online backup API."""
+
+    primary_path, replica_path = sqlite_path(primary_url), sqlite_path(replica_url)
+    if primary_path is None or replica_path is None:
+        raise ValueError("replica-sync only supports file-backed sqlite:/// URLs for both databases")
+    source = sqlite3.connect(primary_path)
+    target = sqlite3.connect(replica_path)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+
+def init_read_replica(app: Flask) -> None:
+    """Create the replica engine and install the routing hooks."""
+
+    replica_url = app.config.get("DATABASE_REPLICA_URL")
+    if not replica_url:
+        return
+    # A plain engine rather than an SQLALCHEMY_BINDS entry: binds register per-key
+    # metadata on the shared ``db``, and no model lives only on the replica.
+    app.extensions[REPLICA_EXTENSION] = create_engine(
+        replica_url, **(app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    )
+    sticky_seconds = float(app.config.get("REPLICA_STICKY_SECONDS", 5))
+
+    @app.before_request
+    def _route_reads_to_replica() -> None:  # pragma: no cover - flask hook
+        view = current_app.view_functions.get(request.endpoint or "")
+        g._db_use_replica = (
+            request.method in _READ_METHODS
+            and getattr(view, "_reads_from_replica", False)
+            and _sticky_until() <= time.time()
+        )
+
+    @app.after_request
+    def _stick_writers_to_primary(response: Response) -> Response:  # pragma: no cover - flask hook
+        if request.method not in _SAFE_METHODS and response.status_code < 400 and sticky_seconds > 0:
+            response.set_cookie(
+                STICKY_COOKIE,
+                f"{time.time() + sticky_seconds:.3f}",
+                max_age=max(1, int(sticky_seconds + 0.999)),
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+
+__all__ = [
+    "STICKY_COOKIE",
+    "init_read_replica",
+    "reads_from_replica",
+    "sqlite_path",
+    "sync_sqlite_replica",
+    "using_replica",
+]
@@ -0,0 +1,169 @@
+"""Ride lifecycle event log and the cursor-based change feed built on it.
+
+Each event is also folded into the hourly/daily rollups (``services.rollups``).
+Archiving (``services.archive``) moves a finished ride's events out of the
+feed; a cursor that had not yet read them is told so with ``gap``.
+
+The feed cursor is the event id, so ids must become visible in id order. A
+PostgreSQL serial is assigned at INSERT, not at commit, so two transitions in
+flight could commit out of order and a consumer already past the higher id
+would never see the lower one. Every transaction that writes events therefore
+first takes one transaction-scoped advisory lock, which serialises event
+writers from their first insert to their commit. SQLite's single writer lock
+already gives that order.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import insert, select, text, update
+
+from src.models import db
+from src.models.archive import ArchivedRideEvent
+from src.models.ride import Ride, RideEvent
+from src.services.rollups import apply_ride_event, apply_rides_created
+
+DEFAULT_FEED_LIMIT = 100
+MAX_FEED_LIMIT = 1000
+# Arbitrary application-wide key for ``pg_advisory_xact_lock`` ("kosf").
+FEED_LOCK_KEY = 0x6B6F7366
+
+
+def _lock_feed(connection) -> None:
+    """Hold the feed lock until the current transaction ends (PostgreSQL; no-op elsewhere)."""
+
+    if connection.dialect.name == 'postgresql':
+        connection.execute(text('SELECT pg_advisory_xact_lock(:key)'), {'key': FEED_LOCK_KEY})
+
+
+def record_ride_created(ride: Ride) -> RideEvent:
+    """Stage the ``created`` event for a new ride in the current transaction."""
+
+    _lock_feed(db.session.connection())
+    event = RideEvent(
+        ride=ride,
+        event_type='created',
+        from_status=None,
+        to_status=ride.status or 'pending',
+        driver_id=ride.driver_id,
+        created_at=datetime.utcnow(),
+    )
+    db.session.add(event)
+    apply_ride_event(ride, event.event_type, event.created_at)
+    return event
+
+
+def record_rides_created(rides: Sequence[Dict[str, Any]], occurred_at: datetime) -> None:
+    """Stage ``created`` events for bulk-inserted rides (dicts with ``id``, ``status``) with one executemany."""
+
+    if not rides:
+        return
+    _lock_feed(db.session.connection())
+    db.session.execute(
+        insert(RideEvent),
+        [
+            {
+                'ride_id': ride['id'],
+                'event_type': 'created',
+                'from_status': None,
+                'to_status': ride['status'],
+                'driver_id': None,
+                'created_at': occurred_at,
+            }
+            for ride in rides
+        ],
+    )
+    apply_rides_created(len(rides), occurred_at)
+
+
+def transition_ride(ride: Ride, status: str, *, driver_id: Optional[int] = None) -> Optional[RideEvent]:
+    """Move ``ride`` to ``status`` and stage the matching event.
+
+    Nothing is committed here: the caller's commit writes the status change
+    and its event atomically, or neither. Re-applying the current status
+    records nothing.
+    """
+
+    if driver_id is not None:
+        ride.driver_id = driver_id
+    if ride.status == status:
+        return None
+    _lock_feed(db.session.connection())
+    event = RideEvent(
+        ride=ride,
+        event_type=status,
+        from_status=ride.status,
+        to_status=status,
+        driver_id=ride.driver_id,
+        created_at=datetime.utcnow(),
+    )
+    ride.status = status
+    db.session.add(event)
+    apply_ride_event(ride, event.event_type, event.created_at)
+    return event
+
+
+def release_scheduled_ride(ride_id: int) -> bool:
+    """Move a ``scheduled`` ride into the pending pool and commit; ``False`` if it was not scheduled.
+
+    The conditional update makes the release idempotent across processes and
+    a no-op for rides cancelled before their release time.
+    """
+
+    now = datetime.utcnow()
+    result = db.session.execute(
+        update(Ride)
+        .where(Ride.id == ride_id, Ride.status == 'scheduled')
+        .values(status='pending', updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        db.session.rollback()
+        return False
+    _lock_feed(db.session.connection())
+    db.session.add(
+        RideEvent(
+            ride_id=ride_id,
+            event_type='released',
+            from_status='scheduled',
+            to_status='pending',
+            created_at=now,
+        )
+    )
+    db.session.commit()
+    return True
+
+
+def changes_since(after: int, limit: int = DEFAULT_FEED_LIMIT) -> Tuple[List[RideEvent], int, bool, bool]:
+    """Return events with ``id > after``, the next cursor, whether more are waiting and whether any were archived.
+
+    The last flag is true while events newer than ``after`` exist only in the
+    archive: the consumer can no longer read them from the feed.
+    """
+
+    limit = max(1, min(limit, MAX_FEED_LIMIT))
+    events = list(
+        db.session.execute(
+            select(RideEvent).where(RideEvent.id > after).order_by(RideEvent.id).limit(limit + 1)
+        ).scalars()
+    )
+    has_more = len(events) > limit
+    events = events[:limit]
+    next_cursor = events[-1].id if events else after
+    gap = db.session.execute(
+        select(ArchivedRideEvent.id).where(ArchivedRideEvent.id > after).limit(1)
+    ).first() is not None
+    return events, next_cursor, has_more, gap
+
+
+__all__ = [
+    'DEFAULT_FEED_LIMIT',
+    'FEED_LOCK_KEY',
+    'MAX_FEED_LIMIT',
+    'changes_since',
+    'record_ride_created',
+    'record_rides_created',
+    'release_scheduled_ride',
+    'transition_ride',
+]
@@ -0,0 +1,153 @@
+"""Release pre-booked rides into the pending pool shortly before pickup.
+
+Rides booked further ahead than ``RIDE_RELEASE_LEAD_MINUTES`` are stored as
+``scheduled`` and pushed onto an in-memory min-heap keyed by release time
+(O(log n) per insert). A single thread sleeps until the earliest release is
+due, so nothing polls or rescans the ``rides`` table: it is read once per
+process, on the first request, to reload rides that were scheduled before the
+process started.
+
+Every worker process keeps its own heap. Releasing is a conditional
+``UPDATE ... WHERE status = 'scheduled'``, so a ride that is known to several
+workers, or that was cancelled in the meantime, is released at most once.
+"""
+from __future__ import annotations
+
+import atexit
+import heapq
+import logging
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from flask import Flask, current_app
+from sqlalchemy import select
+
+from src.models import db
+from src.models.ride import Ride
+
+SCHEDULED_STATUS = "scheduled"
+
+logger = logging.getLogger(__name__)
+
+
+def _as_naive_utc(moment: datetime) -> datetime:
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+class RideScheduler:
+    """Min-heap of ``(release_at, ride_id)`` drained by a background thread."""
+
+    def __init__(self, app: Flask, lead_time: timedelta) -> None:
+        self.app = app
+        self.lead_time = lead_time
+        self._heap: List[Tuple[datetime, int]] = []
+        self._condition = threading.Condition()
+        self._pid: Optional[int] = None
+        self._stopped = False
+
+    def release_time(self, scheduled_time: datetime) -> datetime:
+        return _as_naive_utc(scheduled_time) - self.lead_time
+
+    def initial_status(self, scheduled_time: Optional[datetime], now: Optional[datetime] = None) -> str:
+        """Return ``scheduled`` for bookings whose release time is still in the future."""
+
+        if scheduled_time is None:
+            return "pending"
+        now = now or datetime.utcnow()
+        return SCHEDULED_STATUS if self.release_time(scheduled_time) > now else "pending"
+
+    def schedule(self, ride_id: int, scheduled_time: datetime) -> None:
+        with self._condition:
+            heapq.heappush(self._heap, (self.release_time(scheduled_time), ride_id))
+            if self._heap[0][1] == ride_id:
+                self._condition.notify()
+
+    def pending_count(self) -> int:
+        with self._condition:
+            return len(self._heap)
+
+    def ensure_started(self) -> None:
+        """Load scheduled rides and start the release thread once per process."""
+
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._condition:
+            if self._pid == pid:
+                return
+            # After a fork the parent's thread is gone; rebuild from the database.
+            self._pid = pid
+            self._heap = []
+        rows = db.session.execute(
+            select(Ride.id, Ride.scheduled_time).where(Ride.status == SCHEDULED_STATUS)
+        ).all()
+        for ride_id, scheduled_time in rows:
+            if scheduled_time is not None:
+                self.schedule(ride_id, scheduled_time)
+        threading.Thread(target=self._run, name="ride-scheduler", daemon=True).start()
+
+    def release_due(self, now: Optional[datetime] = None) -> List[int]:
+        """Release every ride whose time has come; return the released ids."""
+
+        from .ride_events import release_scheduled_ride
+        from .surge import record_ride_request, zone_for_address
+
+        now = now or datetime.utcnow()
+        due: List[int] = []
+        with self._condition:
+            while self._heap and self._heap[0][0] <= now:
+                due.append(heapq.heappop(self._heap)[1])
+        released = [ride_id for ride_id in due if release_scheduled_ride(ride_id)]
+        if released:
+            # Pre-booked rides only count towards surge demand once they are released.
+            for address in db.session.execute(select(Ride.pickup_address).where(Ride.id.in_(released))).scalars():
+                record_ride_request(zone_for_address(address))
+        return released
+
+    def stop(self) -> None:
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                if self._stopped:
+                    return
+                if not self._heap:
+                    self._condition.wait()
+                    continue
+                delay = (self._heap[0][0] - datetime.utcnow()).total_seconds()
+                if delay > 0:
+                    self._condition.wait(timeout=delay)
+                    continue
+            try:
+                with self.app.app_context():
+                    self.release_due()
+            except Exception:  # pragma: no cover - keep the thread alive
+                logger.exception("Failed to release scheduled rides")
+
+
+def init_ride_scheduler(app: Flask) -> None:
+    """Attach the scheduler; it starts lazily so each forked worker gets its own thread."""
+
+    if not app.config.get("RIDE_SCHEDULER_ENABLED", True):
+        return
+    scheduler = RideScheduler(app, timedelta(minutes=float(app.config.get("RIDE_RELEASE_LEAD_MINUTES", 30))))
+    app.extensions["ride_scheduler"] = scheduler
+    atexit.register(scheduler.stop)
+
+    @app.before_request
+    def _start_ride_scheduler() -> None:  # pragma: no cover - flask hook
+        scheduler.ensure_started()
+
+
+def get_ride_scheduler() -> Optional[RideScheduler]:
+    return current_app.extensions.get("ride_scheduler")
+
+
+__all__ = ["RideScheduler", "SCHEDULED_STATUS", "get_ride_scheduler", "init_ride_scheduler"]
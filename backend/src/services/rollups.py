@@ -0,0 +1,199 @@
+"""Incrementally maintained hourly/daily ride rollups for the admin dashboard.
+
+Every ride event updates one row per bucket size with an atomic
+``INSERT ... ON CONFLICT DO UPDATE`` in the event's own transaction, so
+reading a time series costs one primary-key range scan regardless of how many
+rides exist.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from src.models import db
+from src.models.archive import ArchivedRide
+from src.models.ride import Ride
+from src.models.rollup import RideRollup, RideRollupDriver
+
+BUCKET_SIZES: Dict[str, timedelta] = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+MAX_SERIES_BUCKETS = 2000
+
+_UPSERT_DIALECTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def _ratio(numerator: float, denominator: float) -> float:
+    return round(numerator / denominator, 4) if denominator else 0.0
+
+
+METRICS: Dict[str, Callable[[RideRollup, timedelta], float]] = {
+    "rides_created": lambda row, size: row.rides_created,
+    "rides_completed": lambda row, size: row.rides_completed,
+    "rides_cancelled": lambda row, size: row.rides_cancelled,
+    "revenue_eur": lambda row, size: round(row.revenue_eur, 2),
+    "avg_fare": lambda row, size: round(_ratio(row.revenue_eur, row.rides_completed), 2),
+    "avg_distance_km": lambda row, size: round(_ratio(row.distance_km, row.rides_completed), 2),
+    # Share of the bucket that drivers who completed a ride in it spent driving. Trip
+    # minutes are booked to the completion bucket, so long trips can overflow it.
+    "driver_utilisation": lambda row, size: min(
+        1.0, _ratio(row.busy_minutes, row.active_drivers * size.total_seconds() / 60)
+    ),
+}
+
+
+def bucket_floor(moment: datetime, bucket: str) -> datetime:
+    moment = moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0) if bucket == "day" else moment
+
+
+def _event_deltas(event_type: str, ride: Ride) -> Dict[str, float]:
+    if event_type == "created":
+        return {"rides_created": 1}
+    if event_type == "cancelled":
+        return {"rides_cancelled": 1}
+    if event_type == "completed":
+        return {
+            "rides_completed": 1,
+            "revenue_eur": ride.fare or 0.0,
+            "distance_km": ride.distance_km or 0.0,
+            "busy_minutes": ride.estimated_duration_minutes or 0,
+        }
+    return {}
+
+
+def _upsert(model, keys: Dict[str, object], deltas: Dict[str, float]) -> bool:
+    """Add ``deltas`` to the row at ``keys`` (creating it); return whether it was inserted."""
+
+    table = model.__table__
+    insert = _UPSERT_DIALECTS.get(db.session.get_bind().dialect.name)
+    if insert is None:
+        row = db.session.get(model, tuple(keys.values()))
+        if row is None:
+            db.session.add(model(**keys, **deltas))
+            return True
+        for column, delta in deltas.items():
+            setattr(row, column, getattr(row, column) + delta)
+        return False
+
+    statement = insert(table).values(**keys, **deltas)
+    if deltas:
+        statement = statement.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={column: table.c[column] + statement.excluded[column] for column in deltas},
+        )
+    else:
+        statement = statement.on_conflict_do_nothing(index_elements=list(keys))
+    return db.session.execute(statement).rowcount == 1
+
+
+def apply_ride_event(ride: Ride, event_type: str, occurred_at: datetime) -> None:
+    """Fold one lifecycle event into the hourly and daily rollups (no commit)."""
+
+    deltas = _event_deltas(event_type, ride)
+    if not deltas:
+        return
+    for bucket in BUCKET_SIZES:
+        keys = {"bucket": bucket, "bucket_start": bucket_floor(occurred_at, bucket)}
+        _upsert(RideRollup, keys, deltas)
+        if event_type == "completed" and ride.driver_id is not None:
+            if _upsert(RideRollupDriver, {**keys, "driver_id": ride.driver_id}, {}):
+                _upsert(RideRollup, keys, {"active_drivers": 1})
+
+
+def apply_rides_created(count: int, occurred_at: datetime) -> None:
+    """Fold ``count`` rides created together into the rollups with one upsert per bucket (no commit)."""
+
+    for bucket in BUCKET_SIZES:
+        _upsert(RideRollup, {"bucket": bucket, "bucket_start": bucket_floor(occurred_at, bucket)}, {"rides_created": count})
+
+
+def timeseries(metric: str, bucket: str, start: datetime, end: datetime) -> List[Dict[str, object]]:
+    """Return ``metric`` for every bucket between ``start`` and ``end``, zero-filled."""
+
+    size = BUCKET_SIZES[bucket]
+    compute = METRICS[metric]
+    first, last = bucket_floor(start, bucket), bucket_floor(end, bucket)
+    rows = {
+        row.bucket_start: row
+        for row in db.session.execute(
+            select(RideRollup).where(
+                RideRollup.bucket == bucket,
+                RideRollup.bucket_start >= first,
+                RideRollup.bucket_start <= last,
+            )
+        ).scalars()
+    }
+
+    series: List[Dict[str, object]] = []
+    current = first
+    while current <= last:
+        row = rows.get(current)
+        series.append({"bucket_start": current.isoformat(), "value": compute(row, size) if row else 0})
+        current += size
+    return series
+
+
+def bucket_count(bucket: str, start: datetime, end: datetime) -> int:
+    span = bucket_floor(end, bucket) - bucket_floor(start, bucket)
+    return int(span / BUCKET_SIZES[bucket]) + 1
+
+
+def rebuild_rollups(batch_size: int = 1000) -> int:
+    """Recompute every rollup from live and archived rides; return the number of rides read.
+
+    For data recorded before rollups existed. Completion and cancellation
+    times are approximated by ``updated_at``.
+    """
+
+    totals: Dict[Tuple[str, datetime], Dict[str, float]] = defaultdict(lambda: defaultdict(int))
+    drivers: Dict[Tuple[str, datetime], set] = defaultdict(set)
+    count = 0
+    rides = (
+        ride
+        for model in (Ride, ArchivedRide)
+        for ride in db.session.execute(select(model).execution_options(yield_per=batch_size)).scalars()
+    )
+    for ride in rides:
+        count += 1
+        happenings: Iterable[Tuple[str, Optional[datetime]]] = [("created", ride.created_at)]
+        if ride.status in ("completed", "cancelled"):
+            happenings = [*happenings, (ride.status, ride.updated_at or ride.created_at)]
+        for event_type, occurred_at in happenings:
+            if occurred_at is None:
+                continue
+            for bucket in BUCKET_SIZES:
+                key = (bucket, bucket_floor(occurred_at, bucket))
+                for column, delta in _event_deltas(event_type, ride).items():
+                    totals[key][column] += delta
+                if event_type == "completed" and ride.driver_id is not None:
+                    drivers[key].add(ride.driver_id)
+
+    db.session.execute(delete(RideRollupDriver))
+    db.session.execute(delete(RideRollup))
+    db.session.add_all(
+        RideRollup(bucket=bucket, bucket_start=start, active_drivers=len(drivers[(bucket, start)]), **values)
+        for (bucket, start), values in totals.items()
+    )
+    db.session.add_all(
+        RideRollupDriver(bucket=bucket, bucket_start=start, driver_id=driver_id)
+        for (bucket, start), driver_ids in drivers.items()
+        for driver_id in driver_ids
+    )
+    db.session.commit()
+    return count
+
+
+__all__ = [
+    "BUCKET_SIZES",
+    "MAX_SERIES_BUCKETS",
+    "METRICS",
+    "apply_ride_event",
+    "apply_rides_created",
+    "bucket_count",
+    "bucket_floor",
+    "rebuild_rollups",
+    "timeseries",
+]
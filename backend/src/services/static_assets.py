@@ -0,0 +1,178 @@
+"""Startup manifest and content negotiation for the built frontend assets."""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+from flask import Response, request, send_file
+
+# Vite emits hashed files only under ``assets/``, as ``<name>-<8-char hash>.<ext>``
+# (e.g. ``assets/index-D8kQ2x_a.js``). Files copied from ``public/`` keep their
+# names across deploys and must not be cached as immutable.
+_FINGERPRINT_PATTERN = re.compile(r"^assets/[^/]+-[A-Za-z0-9_-]{8}\.[A-Za-z0-9]+$")
+_COMPRESSIBLE_PREFIXES = ("text/", "application/javascript", "application/json", "image/svg+xml", "application/xml")
+_ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+_IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+INDEX_FILE = "index.html"
+# Written by ``scripts/build_static.py``; lets startup skip re-hashing every file.
+BUILD_MANIFEST_FILE = "static-manifest.json"
+
+
+@dataclass
+class StaticAsset:
+    """A servable file with its validators and precompressed variants."""
+
+    path: Path
+    size: int
+    digest: str
+    mimetype: str
+    fingerprinted: bool
+    variants: Dict[str, Path] = field(default_factory=dict)
+    body: Optional[bytes] = None
+    encoded_bodies: Dict[str, bytes] = field(default_factory=dict)
+
+    def etag(self, encoding: Optional[str]) -> str:
+        return f"{self.digest}-{encoding}" if encoding else self.digest
+
+    def available_encodings(self) -> Iterator[str]:
+        for encoding in ("br", "gzip"):
+            if encoding in self.encoded_bodies or encoding in self.variants:
+                yield encoding
+
+
+def _is_compressible(mimetype: str) -> bool:
+    return mimetype.startswith(_COMPRESSIBLE_PREFIXES)
+
+
+class AssetManifest:
+    """Map of request paths to :class:`StaticAsset` entries, built once at startup.
+
+    Files up to ``memory_limit`` bytes are held in memory, together with a
+    gzip copy when compression helps, so hot files such as ``index.html`` are
+    served without touching the filesystem. Larger files are streamed from
+    disk, using ``.br``/``.gz`` siblings produced by the frontend build.
+    """
+
+    def __init__(self, root: Path, assets: Dict[str, StaticAsset]) -> None:
+        self.root = root
+        self.assets = assets
+
+    @classmethod
+    def build(cls, root: Path, *, memory_limit: int = 64 * 1024) -> "AssetManifest":
+        assets: Dict[str, StaticAsset] = {}
+        if not root.is_dir():
+            return cls(root, assets)
+
+        # Resolve the release symlink so entries keep pointing at this build's
+        # files even after a newer build is swapped in.
+        root = root.resolve()
+        build_manifest = _load_build_manifest(root)
+
+        for path in sorted(root.rglob("*")):
+            if not path.is_file() or path.suffix in _ENCODING_SUFFIXES.values() or path.name.startswith("."):
+                continue
+            relative = path.relative_to(root).as_posix()
+            if relative == BUILD_MANIFEST_FILE:
+                continue
+            built = build_manifest.get(relative)
+            size = int(built["size"]) if built else path.stat().st_size
+            data = path.read_bytes() if size <= memory_limit or not built else None
+            digest = str(built["sha256"]) if built else hashlib.sha256(data or b"").hexdigest()
+            mimetype = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+            asset = StaticAsset(
+                path=path,
+                size=size,
+                digest=digest[:20],
+                mimetype=mimetype,
+                fingerprinted=bool(_FINGERPRINT_PATTERN.match(relative)),
+            )
+            for encoding, suffix in _ENCODING_SUFFIXES.items():
+                sibling = path.with_name(path.name + suffix)
+                if sibling.is_file():
+                    asset.variants[encoding] = sibling
+            if data is not None and size <= memory_limit:
+                asset.body = data
+                if _is_compressible(mimetype) and "gzip" not in asset.variants:
+                    compressed = gzip.compress(data, compresslevel=9, mtime=0)
+                    if len(compressed) < len(data):
+                        asset.encoded_bodies["gzip"] = compressed
+                for encoding, sibling in asset.variants.items():
+                    asset.encoded_bodies[encoding] = sibling.read_bytes()
+            assets[relative] = asset
+        return cls(root, assets)
+
+    def get(self, path: str) -> Optional[StaticAsset]:
+        return self.assets.get(path)
+
+
+def _load_build_manifest(root: Path) -> Dict[str, Dict[str, object]]:
+    manifest_path = root / BUILD_MANIFEST_FILE
+    if not manifest_path.is_file():
+        return {}
+    try:
+        return json.loads(manifest_path.read_text(encoding="utf-8")).get("files", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def _negotiate(asset: StaticAsset) -> Optional[str]:
+    accepted = request.accept_encodings
+    for encoding in asset.available_encodings():
+        if accepted.quality(encoding) > 0:
+            return encoding
+    return None
+
+
+def _cache_control(asset: StaticAsset, relative_path: str, default_max_age: int) -> str:
+    if asset.fingerprinted:
+        return _IMMUTABLE_CACHE_CONTROL
+    if relative_path == INDEX_FILE:
+        return "no-cache"
+    return f"public, max-age={default_max_age}"
+
+
+def serve_asset(
+    manifest: AssetManifest,
+    relative_path: str,
+    *,
+    default_max_age: int = 3600,
+) -> Tuple[Response, int]:
+    """Build the response for ``relative_path``, honouring ``Accept-Encoding`` and ``If-None-Match``."""
+
+    asset = manifest.get(relative_path)
+    if asset is None:
+        raise KeyError(relative_path)
+
+    encoding = _negotiate(asset)
+    etag = asset.etag(encoding)
+    has_variants = any(True for _ in asset.available_encodings())
+
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        status = 304
+    elif asset.body is not None:
+        body = asset.encoded_bodies[encoding] if encoding else asset.body
+        response = Response(body, mimetype=asset.mimetype)
+        status = 200
+    else:
+        source = asset.variants[encoding] if encoding else asset.path
+        response = send_file(source, mimetype=asset.mimetype, conditional=False, etag=False, max_age=None)
+        status = 200
+
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = _cache_control(asset, relative_path, default_max_age)
+    if encoding and status == 200:
+        response.headers["Content-Encoding"] = encoding
+    if has_variants:
+        response.vary.add("Accept-Encoding")
+    return response, status
+
+
+__all__ = ["AssetManifest", "INDEX_FILE", "StaticAsset", "serve_asset"]
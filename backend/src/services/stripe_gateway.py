@@ -0,0 +1,284 @@
+"""Single entry point for Stripe API calls.
+
+The routes used to set the global ``stripe.api_key`` on every request and
+called Stripe with the SDK defaults: an 80 second timeout and no breaker. So
+during a Stripe incident every worker sat on a hung socket. The gateway fixes
+this:
+
+* It builds one ``StripeClient`` per process, on the first call, so the SDK
+  stays lazily imported.
+* The client uses a pooled ``requests`` session and connect/read timeouts.
+* Failures that are worth retrying (connection errors, 429s and 5xx responses)
+  get a bounded number of retries with full-jitter exponential backoff. Every
+  attempt reuses the same idempotency key, so a retried create never charges
+  twice.
+* After ``STRIPE_BREAKER_THRESHOLD`` consecutive failed calls, a circuit
+  breaker opens. While it is open, calls fail fast with
+  :class:`StripeUnavailable` for ``STRIPE_BREAKER_RESET_SECONDS``. After that
+  a single trial call decides whether to close the breaker again.
+
+Call latency, errors and breaker rejections are exported to Prometheus.
+"""
+from __future__ import annotations
+
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+from uuid import uuid4
+
+from flask import Flask, current_app
+from prometheus_client import Counter, Histogram
+
+from src.lazy_imports import lazy_import
+
+stripe = lazy_import("stripe")
+
+_LATENCY: Optional[Histogram] = None
+_ERRORS: Optional[Counter] = None
+_REJECTIONS: Optional[Counter] = None
+
+
+class StripeGatewayError(Exception):
+    """A Stripe call failed; ``user_message`` is safe to return to clients."""
+
+    def __init__(self, user_message: str) -> None:
+        super().__init__(user_message)
+        self.user_message = user_message
+
+
+class StripeUnavailable(StripeGatewayError):
+    """Raised without calling Stripe while the circuit breaker is open."""
+
+
+class InvalidWebhookSignature(StripeGatewayError):
+    """The ``Stripe-Signature`` header does not match the webhook payload."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker shared by the threads of one worker process."""
+
+    def __init__(self, threshold: int, reset_seconds: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.threshold = max(1, threshold)
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "half_open" if self._clock() - self._opened_at >= self.reset_seconds else "open"
+
+    def allow(self) -> bool:
+        """Return whether a call may go out; in half-open state only one trial call may."""
+
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._clock() - self._opened_at < self.reset_seconds or self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.threshold:
+                self._opened_at = self._clock()
+
+
+def _is_retryable(exc: Exception) -> bool:
+    if isinstance(exc, (stripe.APIConnectionError, stripe.RateLimitError)):
+        return True
+    return isinstance(exc, stripe.StripeError) and (exc.http_status or 0) >= 500
+
+
+class StripeGateway:
+    """Pooled, timed, retried and breaker-guarded access to the Stripe API."""
+
+    def __init__(
+        self,
+        secret_key: Optional[str],
+        *,
+        connect_timeout: float = 3.0,
+        read_timeout: float = 10.0,
+        max_retries: int = 2,
+        backoff_seconds: float = 0.25,
+        pool_size: int = 10,
+        breaker: Optional[CircuitBreaker] = None,
+    ) -> None:
+        self.secret_key = secret_key
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max(0, max_retries)
+        self.backoff_seconds = backoff_seconds
+        self.pool_size = max(1, pool_size)
+        self.breaker = breaker or CircuitBreaker(5, 30.0)
+        self._client: Any = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.secret_key)
+
+    def _get_client(self) -> Any:
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    # Built on first use so prefork workers each open their own pool.
+                    import requests
+                    from requests.adapters import HTTPAdapter
+
+                    session = requests.Session()
+                    session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size))
+                    self._client = stripe.StripeClient(
+                        self.secret_key,
+                        http_client=stripe.RequestsClient(
+                            timeout=(self.connect_timeout, self.read_timeout), session=session
+                        ),
+                        max_network_retries=0,  # retried here, where the breaker can see every attempt
+                    )
+        return self._client
+
+    def after_fork(self) -> None:
+        """Forget a client inherited from the parent process; its sockets are shared."""
+
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, self.backoff_seconds * (2 ** attempt))
+
+    def _call(self, operation: str, fn: Callable[[Any], Any]) -> Any:
+        if not self.configured:
+            raise StripeGatewayError("Stripe is not configured")
+        if not self.breaker.allow():
+            if _REJECTIONS is not None:
+                _REJECTIONS.labels(operation).inc()
+            raise StripeUnavailable("Payments are temporarily unavailable, please retry shortly")
+
+        client = self._get_client()
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                result = fn(client)
+            except Exception as exc:
+                if _LATENCY is not None:
+                    _LATENCY.labels(operation, "error").observe(time.perf_counter() - started)
+                if _ERRORS is not None:
+                    _ERRORS.labels(operation, type(exc).__name__).inc()
+                if not isinstance(exc, stripe.StripeError):
+                    self.breaker.record_failure()
+                    raise
+                if _is_retryable(exc) and attempt < self.max_retries:
+                    time.sleep(self._backoff(attempt))
+                    attempt += 1
+                    continue
+                if _is_retryable(exc):
+                    self.breaker.record_failure()
+                else:
+                    # Card declines and invalid requests mean Stripe is up.
+                    self.breaker.record_success()
+                raise StripeGatewayError(exc.user_message or str(exc)) from exc
+            if _LATENCY is not None:
+                _LATENCY.labels(operation, "ok").observe(time.perf_counter() - started)
+            self.breaker.record_success()
+            return result
+
+    def create_payment_intent(self, params: Dict[str, Any]) -> Any:
+        """Create a payment intent; retries reuse one idempotency key."""
+
+        options = {"idempotency_key": f"kos-{uuid4().hex}"}
+        return self._call(
+            "payment_intent_create", lambda client: client.v1.payment_intents.create(params=params, options=options)
+        )
+
+    def retrieve_payment_intent(self, intent_id: str) -> Any:
+        return self._call("payment_intent_retrieve", lambda client: client.v1.payment_intents.retrieve(intent_id))
+
+    def construct_event(self, payload: bytes, signature: str, webhook_secret: str) -> Any:
+        """Verify and parse a webhook; raises ``ValueError`` for malformed payloads."""
+
+        try:
+            return stripe.Webhook.construct_event(payload, signature, webhook_secret)
+        except stripe.SignatureVerificationError as exc:
+            raise InvalidWebhookSignature(exc.user_message or str(exc)) from exc
+
+
+def _init_gateway_metrics(namespace: str) -> None:
+    global _LATENCY, _ERRORS, _REJECTIONS
+    if _LATENCY is not None:
+        return
+
+    _LATENCY = Histogram(
+        "stripe_request_duration_seconds",
+        "Latency of individual Stripe API attempts.",
+        ("operation", "outcome"),
+        namespace=namespace,
+        buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10),
+    )
+    _ERRORS = Counter(
+        "stripe_request_errors_total",
+        "Failed Stripe API attempts by error type.",
+        ("operation", "error"),
+        namespace=namespace,
+    )
+    _REJECTIONS = Counter(
+        "stripe_circuit_rejections_total",
+        "Stripe calls rejected without a request because the circuit breaker was open.",
+        ("operation",),
+        namespace=namespace,
+    )
+
+
+def init_stripe_gateway(app: Flask) -> None:
+    """Attach the Stripe gateway to ``app``."""
+
+    namespace = (app.config.get("METRICS_NAMESPACE") or "kos_taxi").replace("-", "_")
+    _init_gateway_metrics(namespace)
+
+    secret_key = app.config.get("STRIPE_SECRET_KEY")
+    if not secret_key:
+        app.logger.warning("STRIPE_SECRET_KEY is not configured; payments use placeholder intents.")
+    app.extensions["stripe_gateway"] = StripeGateway(
+        secret_key,
+        connect_timeout=float(app.config.get("STRIPE_CONNECT_TIMEOUT_SECONDS", 3)),
+        read_timeout=float(app.config.get("STRIPE_READ_TIMEOUT_SECONDS", 10)),
+        max_retries=int(app.config.get("STRIPE_MAX_RETRIES", 2)),
+        backoff_seconds=float(app.config.get("STRIPE_RETRY_BACKOFF_SECONDS", 0.25)),
+        pool_size=int(app.config.get("STRIPE_HTTP_POOL_SIZE", 10)),
+        breaker=CircuitBreaker(
+            int(app.config.get("STRIPE_BREAKER_THRESHOLD", 5)),
+            float(app.config.get("STRIPE_BREAKER_RESET_SECONDS", 30)),
+        ),
+    )
+
+
+def get_stripe_gateway() -> StripeGateway:
+    """Return the Stripe gateway bound to the current app."""
+
+    return current_app.extensions["stripe_gateway"]
+
+
+__all__ = [
+    "CircuitBreaker",
+    "InvalidWebhookSignature",
+    "StripeGateway",
+    "StripeGatewayError",
+    "StripeUnavailable",
+    "get_stripe_gateway",
+    "init_stripe_gateway",
+]
@@ -0,0 +1,249 @@
+"""Zone-based surge pricing from sliding-window demand and driver supply.
+
+Ride requests and driver availability pings are counted per zone in ring
+buffers of fixed-width time slots: recording is O(1) and the window total is a
+running sum, so pricing never queries the database. The counters and the
+smoothed multipliers live in an anonymous shared memory map guarded by a
+process lock; when the app is preloaded before forking (``python -m
+src.serve``) every worker reads and feeds the same state.
+"""
+from __future__ import annotations
+
+import math
+import mmap
+import multiprocessing
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from flask import Flask, current_app
+
+DEFAULT_ZONE = "island"
+
+# name, centroid (lat, lon), address keywords
+ZONES: List[Tuple[str, Tuple[float, float], Tuple[str, ...]]] = [
+    ("kos_town", (36.893, 27.288), ("kos town", "kos port", "ferry", "harbour", "lambi", "psalidi", "asklepieion")),
+    ("airport", (36.793, 27.092), ("airport", "antimachia")),
+    ("kardamena", (36.784, 27.141), ("kardamena",)),
+    ("tigaki_marmari", (36.866, 27.170), ("tigaki", "marmari", "zia", "pyli")),
+    ("mastichari", (36.852, 27.075), ("mastichari",)),
+    ("kefalos", (36.745, 26.960), ("kefalos", "agios stefanos")),
+]
+
+
+def zone_for_address(address: Optional[str]) -> str:
+    """Map a free-text pickup address onto a pricing zone."""
+
+    lowered = (address or "").lower()
+    for name, _, keywords in ZONES:
+        if any(keyword in lowered for keyword in keywords):
+            return name
+    return DEFAULT_ZONE
+
+
+def zone_for_point(lat: Optional[float], lon: Optional[float]) -> str:
+    """Return the zone whose centroid is nearest to ``(lat, lon)``."""
+
+    if lat is None or lon is None:
+        return DEFAULT_ZONE
+    return min(ZONES, key=lambda zone: (zone[1][0] - lat) ** 2 + (zone[1][1] - lon) ** 2)[0]
+
+
+class RingBufferCounter:
+    """Sliding-window sum over ``slots`` time slots stored in ``buffer[offset:]``.
+
+    Layout: ``[last_epoch, running_total, slot_0 .. slot_n-1]``. Advancing the
+    window clears only the slots that expired since the last call, so updates
+    and reads are amortised O(1). Callers provide the locking.
+    """
+
+    HEADER = 2
+
+    def __init__(self, buffer: memoryview, offset: int, slots: int, slot_seconds: float) -> None:
+        self._buffer = buffer
+        self._offset = offset
+        self._slots = slots
+        self._slot_seconds = slot_seconds
+
+    @classmethod
+    def size(cls, slots: int) -> int:
+        return cls.HEADER + slots
+
+    def _advance(self, epoch: int) -> None:
+        buffer, offset, slots = self._buffer, self._offset, self._slots
+        last = int(buffer[offset])
+        if epoch <= last:
+            return
+        if epoch - last >= slots:
+            for index in range(slots):
+                buffer[offset + self.HEADER + index] = 0.0
+            buffer[offset + 1] = 0.0
+        else:
+            for expired in range(last + 1, epoch + 1):
+                index = offset + self.HEADER + expired % slots
+                buffer[offset + 1] -= buffer[index]
+                buffer[index] = 0.0
+        buffer[offset] = float(epoch)
+
+    def add(self, now: float, amount: float = 1.0) -> None:
+        epoch = int(now // self._slot_seconds)
+        self._advance(epoch)
+        self._buffer[self._offset + self.HEADER + epoch % self._slots] += amount
+        self._buffer[self._offset + 1] += amount
+
+    def total(self, now: float) -> float:
+        self._advance(int(now // self._slot_seconds))
+        return self._buffer[self._offset + 1]
+
+
+@dataclass(frozen=True)
+class SurgeSettings:
+    window_seconds: float = 600.0
+    slot_seconds: float = 30.0
+    max_multiplier: float = 2.5
+    sensitivity: float = 0.5
+    smoothing: float = 0.3
+    driver_ping_seconds: float = 30.0
+    min_drivers: float = 1.0
+    min_requests: float = 5.0
+
+
+class SurgeEngine:
+    """Per-zone demand/supply windows and the smoothed multiplier derived from them."""
+
+    # Per zone: demand counter, supply counter, then [multiplier, computed_at].
+    _STATE = 2
+
+    def __init__(
+        self,
+        settings: SurgeSettings,
+        zones: Optional[List[str]] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.settings = settings
+        self._clock = clock
+        self._slots = max(1, math.ceil(settings.window_seconds / settings.slot_seconds))
+        self._zones = {name: index for index, name in enumerate(zones or [zone[0] for zone in ZONES] + [DEFAULT_ZONE])}
+        counter_size = RingBufferCounter.size(self._slots)
+        self._stride = 2 * counter_size + self._STATE
+        self._map = mmap.mmap(-1, 8 * self._stride * len(self._zones))
+        self._buffer = memoryview(self._map).cast("d")
+        self._lock = multiprocessing.Lock()
+        self._counters: Dict[str, Tuple[RingBufferCounter, RingBufferCounter, int]] = {}
+        for name, index in self._zones.items():
+            base = index * self._stride
+            demand = RingBufferCounter(self._buffer, base, self._slots, settings.slot_seconds)
+            supply = RingBufferCounter(self._buffer, base + counter_size, self._slots, settings.slot_seconds)
+            state = base + 2 * counter_size
+            self._buffer[state] = 1.0
+            self._counters[name] = (demand, supply, state)
+
+    def _zone(self, zone: str) -> Tuple[RingBufferCounter, RingBufferCounter, int]:
+        return self._counters.get(zone) or self._counters[DEFAULT_ZONE]
+
+    def record_request(self, zone: str) -> None:
+        demand, _, _ = self._zone(zone)
+        with self._lock:
+            demand.add(self._clock())
+
+    def record_driver_available(self, zone: str) -> None:
+        _, supply, _ = self._zone(zone)
+        with self._lock:
+            supply.add(self._clock())
+
+    def _target(self, demand: float, pings: float) -> float:
+        settings = self.settings
+        # Each available driver pings about once per ``driver_ping_seconds``.
+        drivers = pings * settings.driver_ping_seconds / settings.window_seconds
+        # Without a real supply signal (drivers that never ping) or with only a
+        # handful of requests, the ratio is noise; price at the base fare.
+        if drivers < settings.min_drivers or demand < settings.min_requests:
+            return 1.0
+        ratio = demand / max(drivers, 1.0)
+        return min(settings.max_multiplier, max(1.0, 1.0 + settings.sensitivity * (ratio - 1.0)))
+
+    def multiplier(self, zone: str) -> float:
+        """Return the smoothed multiplier, recomputing it at most once per slot."""
+
+        demand, supply, state = self._zone(zone)
+        buffer = self._buffer
+        now = self._clock()
+        with self._lock:
+            elapsed_slots = int((now - buffer[state + 1]) // self.settings.slot_seconds)
+            if elapsed_slots > 0:
+                target = self._target(demand.total(now), supply.total(now))
+                # Exponential smoothing applied once per elapsed slot, so an idle
+                # period decays the multiplier as if it had been updated throughout.
+                keep = (1.0 - self.settings.smoothing) ** min(elapsed_slots, self._slots)
+                buffer[state] = target + (buffer[state] - target) * keep
+                buffer[state + 1] = now
+            return round(buffer[state], 2)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        now = self._clock()
+        result = {}
+        for name in self._zones:
+            demand, supply, _ = self._counters[name]
+            multiplier = self.multiplier(name)
+            with self._lock:
+                result[name] = {
+                    "multiplier": multiplier,
+                    "requests_in_window": demand.total(now),
+                    "driver_pings_in_window": supply.total(now),
+                }
+        return result
+
+
+def init_surge(app: Flask) -> None:
+    """Create the app's surge engine (before any worker fork) when enabled."""
+
+    if not app.config.get("SURGE_ENABLED", False):
+        return
+    settings = SurgeSettings(
+        window_seconds=float(app.config.get("SURGE_WINDOW_SECONDS", 600)),
+        slot_seconds=float(app.config.get("SURGE_SLOT_SECONDS", 30)),
+        max_multiplier=float(app.config.get("SURGE_MAX_MULTIPLIER", 2.5)),
+        sensitivity=float(app.config.get("SURGE_SENSITIVITY", 0.5)),
+        smoothing=float(app.config.get("SURGE_SMOOTHING", 0.3)),
+        driver_ping_seconds=float(app.config.get("SURGE_DRIVER_PING_SECONDS", 30)),
+        min_drivers=float(app.config.get("SURGE_MIN_DRIVERS", 1)),
+        min_requests=float(app.config.get("SURGE_MIN_REQUESTS", 5)),
+    )
+    app.extensions["surge_engine"] = SurgeEngine(settings)
+
+
+def get_surge_engine() -> Optional[SurgeEngine]:
+    return current_app.extensions.get("surge_engine")
+
+
+def surge_multiplier(zone: str) -> float:
+    engine = get_surge_engine()
+    return engine.multiplier(zone) if engine is not None else 1.0
+
+
+def record_ride_request(zone: str) -> None:
+    engine = get_surge_engine()
+    if engine is not None:
+        engine.record_request(zone)
+
+
+def record_driver_available(lat: Optional[float], lon: Optional[float]) -> None:
+    engine = get_surge_engine()
+    if engine is not None:
+        engine.record_driver_available(zone_for_point(lat, lon))
+
+
+__all__ = [
+    "DEFAULT_ZONE",
+    "RingBufferCounter",
+    "SurgeEngine",
+    "SurgeSettings",
+    "ZONES",
+    "get_surge_engine",
+    "init_surge",
+    "record_driver_available",
+    "record_ride_request",
+    "surge_multiplier",
+    "zone_for_address",
+    "zone_for_point",
+]
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import time
+
+from src.services.admission import (
+    MemoryBucketStore,
+    SQLiteBucketStore,
+    parse_partner_keys,
+    parse_rate_limits,
+    queue_seconds,
+)
+
+_ESTIMATE = {
+    "pickup_address": "Kos Town Square",
+    "dropoff_address": "Kos Airport",
+    "scheduled_time": "2030-01-01T10:00:00Z",
+    "passenger_count": 1,
+}
+
+
+def test_bucket_stores_refill_at_configured_rate(tmp_path):
+    limit = parse_rate_limits("ride.estimate_ride=2/second")["ride.estimate_ride"]
+    for store in (MemoryBucketStore(), SQLiteBucketStore(str(tmp_path / "buckets.db"))):
+        assert store.consume("ip:1", limit, 100.0)[0]
+        assert store.consume("ip:1", limit, 100.0)[0]
+        allowed, tokens = store.consume("ip:1", limit, 100.0)
+        assert not allowed and tokens == 0
+        assert store.consume("ip:2", limit, 100.0)[0]  # separate client
+        assert store.consume("ip:1", limit, 100.5)[0]  # one token refilled
+
+
+def test_estimate_is_rate_limited_per_client(app, client):
+    settings = app.extensions["admission"].settings
+    settings.limits.update(parse_rate_limits("ride.estimate_ride=2/minute"))
+    settings.partner_keys = parse_partner_keys("partner-hotel, partner-ferry")
+
+    assert client.post("/api/rides/estimate", json=_ESTIMATE).status_code == 200
+    assert client.post("/api/rides/estimate", json=_ESTIMATE).status_code == 200
+    limited = client.post("/api/rides/estimate", json=_ESTIMATE)
+    assert limited.status_code == 429
+    assert int(limited.headers["Retry-After"]) == 30
+
+    other = client.post("/api/rides/estimate", json=_ESTIMATE, headers={"X-API-Key": "partner-hotel"})
+    assert other.status_code == 200
+
+
+def test_unknown_api_keys_share_the_ip_bucket(app, client):
+    settings = app.extensions["admission"].settings
+    settings.limits.update(parse_rate_limits("ride.estimate_ride=2/minute"))
+    settings.partner_keys = parse_partner_keys("partner-hotel")
+
+    statuses = [
+        client.post("/api/rides/estimate", json=_ESTIMATE, headers={"X-API-Key": f"random-{index}"}).status_code
+        for index in range(4)
+    ]
+    assert statuses == [200, 200, 429, 429]
+
+
+def test_load_shedding_on_queue_latency_and_in_flight(app, client):
+    settings = app.extensions["admission"].settings
+    settings.max_queue_seconds = 0.5
+
+    stale = f"t={int((time.time() - 2) * 1_000_000)}"
+    shed = client.get("/api/pricing", headers={"X-Request-Start": stale})
+    assert shed.status_code == 503
+    assert shed.headers["Retry-After"] == "1"
+    assert client.get("/api/pricing", headers={"X-Request-Start": f"t={time.time():.3f}"}).status_code == 200
+    assert client.get("/metrics").status_code == 200
+
+    settings.max_in_flight = 1
+    assert client.get("/api/pricing").status_code == 200  # the slot is released after each request
+    assert app.extensions["admission"].in_flight == 0
+    assert queue_seconds("1700000000500", 1700000001.0) == 0.5
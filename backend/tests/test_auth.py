@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from src.services.password_hashing import PasswordHasher
+
+_SIGNUP = {
+    "name": "Test Driver",
+    "email": "Driver@Example.com",
+    "password": "s3cret-pass",
+    "phone": "+302242000000",
+    "vehicle_model": "Skoda Octavia",
+    "vehicle_plate": "KOS-1234",
+}
+
+
+def test_driver_signup_and_login_hash_through_pool(client):
+    signup = client.post("/api/auth/driver/signup", json=_SIGNUP)
+    assert signup.status_code == 201
+    assert signup.get_json()["driver"]["email"] == "driver@example.com"
+
+    login = client.post(
+        "/api/auth/driver/login",
+        json={"email": "driver@example.com", "password": "s3cret-pass"},
+    )
+    assert login.status_code == 200
+    assert login.get_json()["token_type"] == "Bearer"
+
+    bad_login = client.post(
+        "/api/auth/driver/login",
+        json={"email": "driver@example.com", "password": "wrong"},
+    )
+    assert bad_login.status_code == 401
+
+
+def test_saturated_hashing_pool_returns_503_with_retry_after(app, client):
+    hasher = PasswordHasher(workers=0, max_pending=1, retry_after=7)
+    app.extensions["password_hasher"] = hasher
+    hasher._slots.acquire()
+    try:
+        response = client.post("/api/auth/driver/signup", json=_SIGNUP)
+    finally:
+        hasher._slots.release()
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "7"
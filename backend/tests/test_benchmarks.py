@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from benchmarks.http_load import prepare_app, run_load, serve_app
+from benchmarks.payloads import measure
+from benchmarks.read_path import measure as measure_read_path
+from benchmarks.micro import benchmark_app, build_cases, compare_to_baseline, load_baseline
+
+
+def test_http_load_drives_full_lifecycle_without_errors(tmp_path):
+    app, driver_ids = prepare_app(tmp_path / "bench.db", drivers=3, rides=20)
+
+    with serve_app(app) as base_url:
+        results, elapsed = run_load(base_url, driver_ids=driver_ids, users=2, iterations=2, admin_every=1)
+
+    assert elapsed > 0
+    assert set(results) == {
+        "GET /admin/overview",
+        "GET /rides/pending",
+        "POST /rides",
+        "POST /rides/<id>/accept",
+        "POST /rides/<id>/complete",
+        "POST /rides/estimate",
+    }
+    for summary in results.values():
+        assert summary["error_count"] == 0
+        assert summary["requests"] == 4
+        assert summary["p50_ms"] <= summary["p95_ms"] <= summary["p99_ms"]
+
+
+def test_micro_cases_execute_and_baseline_covers_them():
+    with benchmark_app():
+        cases = build_cases()
+        for case in cases.values():
+            case()
+
+    assert set(load_baseline()) == set(cases)
+
+
+def test_compare_to_baseline_flags_only_regressions_beyond_tolerance():
+    baseline = {"fast": 1000.0, "steady": 1000.0, "slower": 1000.0}
+    results = {"fast": 700.0, "steady": 1250.0, "slower": 1400.0, "new_case": 5.0}
+
+    regressions = compare_to_baseline(results, baseline, tolerance=0.3)
+
+    assert len(regressions) == 1
+    assert regressions[0].startswith("slower:")
+
+
+def test_v2_payloads_are_smaller_than_v1():
+    results = measure(rides=20, repeat=1)
+
+    assert set(results) == {"v1_json", "v2_json", "v2_msgpack"}
+    assert results["v2_json"]["bytes"] < results["v1_json"]["bytes"] / 2
+    assert results["v2_msgpack"]["bytes"] < results["v2_json"]["bytes"]
+
+
+def test_read_models_use_less_cpu_than_the_orm_path():
+    results = measure_read_path(rows=300, repeat=2)
+
+    assert set(results) == {"rides_orm", "rides_read_model", "drivers_orm", "drivers_read_model"}
+    assert results["rides_read_model"]["cpu_vs_orm"] < 1
+    assert results["rides_read_model"]["memory_vs_orm"] < 1
@@ -0,0 +1,55 @@
+import gzip
+import json
+
+from flask import Response, jsonify
+from prometheus_client import REGISTRY
+
+
+def _add_routes(app):
+    @app.route("/_test/large")
+    def large():
+        return jsonify({"rides": [{"id": index, "dest_address": "Kos International Airport"} for index in range(200)]})
+
+    @app.route("/_test/small")
+    def small():
+        return jsonify({"ok": True})
+
+    @app.route("/_test/text-stream")
+    def text_stream():
+        return Response((f"line {index}\n" for index in range(50)), mimetype="text/plain")
+
+
+def _saved_bytes() -> float:
+    return REGISTRY.get_sample_value("kos_taxi_http_compression_saved_bytes_total", {"encoding": "gzip"}) or 0.0
+
+
+def test_large_json_is_gzipped_and_small_bodies_are_left_alone(app, client):
+    _add_routes(app)
+    saved_before = _saved_bytes()
+
+    response = client.get("/_test/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert int(response.headers["Content-Length"]) == len(response.data)
+    payload = json.loads(gzip.decompress(response.data))
+    assert len(payload["rides"]) == 200
+    assert _saved_bytes() - saved_before > len(response.data)
+
+    plain = client.get("/_test/large")
+    assert "Content-Encoding" not in plain.headers
+    assert plain.get_json() == payload
+
+    small = client.get("/_test/small", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in small.headers
+
+    refused = client.get("/_test/large", headers={"Accept-Encoding": "gzip;q=0, identity"})
+    assert "Content-Encoding" not in refused.headers
+
+
+def test_streamed_responses_are_compressed_chunk_by_chunk(app, client):
+    _add_routes(app)
+
+    response = client.get("/_test/text-stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers
+    assert gzip.decompress(response.data).decode().splitlines()[-1] == "line 49"
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import threading
+from datetime import datetime, timedelta
+
+from src.models import db
+from src.models.idempotency import IdempotencyKey
+from src.models.ride import Ride
+from src.services.admission import parse_partner_keys
+from src.services.idempotency import REPLAYED_HEADER, _ReplayCache
+
+
+def _booking(minutes: int = 10) -> dict:
+    return {
+        "pickup_address": "Kos Town Square",
+        "dropoff_address": "Kos Airport",
+        "scheduled_time": (datetime.utcnow() + timedelta(minutes=minutes)).isoformat() + "Z",
+        "rider_email": "retry@example.com",
+    }
+
+
+def test_retried_booking_is_replayed_without_a_second_ride(app, client):
+    booking = _booking()
+    headers = {"Idempotency-Key": "booking-123"}
+
+    first = client.post("/api/rides", json=booking, headers=headers)
+    assert first.status_code == 201
+    assert REPLAYED_HEADER not in first.headers
+
+    app.extensions["idempotency"].cache = _ReplayCache()  # as if the retry reached another worker
+    for _ in range(2):
+        retry = client.post("/api/rides", json=booking, headers=headers)
+        assert retry.status_code == 201
+        assert retry.headers[REPLAYED_HEADER] == "true"
+        assert retry.get_json() == first.get_json()
+    assert Ride.query.count() == 1
+
+    reused = client.post("/api/rides", json=_booking(minutes=20), headers=headers)
+    assert reused.status_code == 422
+    assert client.post("/api/rides", json=booking).status_code == 201  # no key, no dedupe
+    assert Ride.query.count() == 2
+
+
+def test_concurrent_duplicate_waits_for_the_first_request(app, client):
+    booking = _booking()
+    now = datetime.utcnow()
+    db.session.add(
+        IdempotencyKey(
+            scope="ride.create_ride_request",
+            key="slow-key",
+            fingerprint="x" * 64,
+            locked_until=now + timedelta(minutes=1),
+            expires_at=now + timedelta(days=1),
+            created_at=now,
+        )
+    )
+    db.session.commit()
+    response = client.post("/api/rides", json=booking, headers={"Idempotency-Key": "slow-key"})
+    assert response.status_code == 422  # same key, different request
+
+    results = []
+
+    def book():
+        with app.test_client() as other:
+            results.append(other.post("/api/rides", json=booking, headers={"Idempotency-Key": "race"}))
+
+    threads = [threading.Thread(target=book) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(response.status_code for response in results) == [201, 201, 201]
+    assert sum(REPLAYED_HEADER in response.headers for response in results) == 2
+    assert Ride.query.filter_by(user_email="retry@example.com").count() == 1
+
+
+def test_expired_or_abandoned_claims_are_taken_over(app, client):
+    booking = _booking()
+    past = datetime.utcnow() - timedelta(minutes=5)
+    db.session.add(
+        IdempotencyKey(
+            scope="ride.create_ride_request",
+            key="crashed",
+            fingerprint="y" * 64,
+            locked_until=past,
+            expires_at=past + timedelta(days=1),
+            created_at=past,
+        )
+    )
+    db.session.commit()
+
+    response = client.post("/api/rides", json=booking, headers={"Idempotency-Key": "crashed"})
+    assert response.status_code == 201
+    row = db.session.get(IdempotencyKey, ("ride.create_ride_request", "crashed"), populate_existing=True)
+    assert row.status == "completed"
+
+
+def test_anonymous_retries_survive_an_ip_change(app, client):
+    booking = _booking()
+    first = client.post("/api/rides", json=booking, headers={"Idempotency-Key": "shared"})
+    assert first.status_code == 201
+
+    retry = client.post(
+        "/api/rides", json=booking, headers={"Idempotency-Key": "shared"}, environ_base={"REMOTE_ADDR": "10.0.0.9"}
+    )
+    assert retry.status_code == 201
+    assert retry.headers[REPLAYED_HEADER] == "true"
+    assert db.session.query(Ride).count() == 1
+
+
+def test_partner_keys_are_scoped_to_the_partner(app, client):
+    app.extensions["admission"].settings.partner_keys = parse_partner_keys("partner-hotel")
+    booking = _booking()
+    first = client.post("/api/rides", json=booking, headers={"Idempotency-Key": "shared"})
+    assert first.status_code == 201
+
+    other = client.post("/api/rides", json=booking, headers={"Idempotency-Key": "shared", "X-API-Key": "partner-hotel"})
+    assert other.status_code == 201
+    assert REPLAYED_HEADER not in other.headers
+    assert other.get_json()["payment"]["client_secret"] != first.get_json()["payment"]["client_secret"]
+
+
+def test_claim_is_retried_when_the_holder_released_the_key(app, client, monkeypatch):
+    store = app.extensions["idempotency"]
+    claim = store.claim
+    outcomes = [(False, None)]
+    monkeypatch.setattr(store, "claim", lambda *args: outcomes.pop() if outcomes else claim(*args))
+
+    response = client.post("/api/rides", json=_booking(), headers={"Idempotency-Key": "released"})
+    assert response.status_code == 201
+    assert not outcomes
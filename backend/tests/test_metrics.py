@@ -1,5 +1,11 @@
 from __future__ import annotations
 
+import logging
+
+from prometheus_client.values import MultiProcessValue
+
+from src.services.query_metrics import QueryMetricsSettings
+
 
 def test_metrics_endpoint_exposes_prometheus_payload(client):
     """The /metrics endpoint should be reachable and expose Prometheus metrics."""
@@ -10,3 +16,63 @@ def test_metrics_endpoint_exposes_prometheus_payload(client):
     payload = response.data.decode("utf-8")
     assert "http_request_duration_seconds" in payload
     assert "http_requests_total" in payload
+
+
+def test_sql_queries_are_timed_per_endpoint(client):
+    """Queries issued while serving a request are labelled with the endpoint and a fingerprint."""
+
+    client.get("/api/rides/pending")
+    payload = client.get("/metrics").data.decode("utf-8")
+
+    assert 'db_query_duration_seconds_count{endpoint="ride.get_pending_rides",fingerprint="select:rides:' in payload
+    assert 'db_queries_per_request_count{endpoint="ride.get_pending_rides"}' in payload
+
+
+def test_slow_queries_are_logged_with_plan(app, client, caplog):
+    app.extensions["query_metrics"] = QueryMetricsSettings(slow_query_threshold=0.0, explain_slow_queries=True)
+
+    with caplog.at_level(logging.WARNING, logger="src.sql.slow"):
+        client.get("/api/rides/pending")
+
+    messages = [record.getMessage() for record in caplog.records if record.name == "src.sql.slow"]
+    assert messages
+    assert "endpoint=ride.get_pending_rides" in messages[0]
+    assert "params=(str)" in messages[0]
+    assert "ix_rides_status_created_at_id" in messages[0]
+
+
+def test_plans_are_only_captured_for_sqlite_dml(app):
+    from src.models import db
+    from src.services.query_metrics import _explain
+
+    with db.engine.connect() as conn:
+        assert _explain(conn, "PRAGMA table_info(rides)", (), False) == []
+        assert _explain(conn, "SELECT id FROM rides", (), False)
+
+
+def test_failed_statements_do_not_leak_query_timers(app):
+    import pytest
+    from sqlalchemy import text
+    from sqlalchemy.exc import OperationalError
+
+    from src.models import db
+
+    with db.engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM no_such_table"))
+        assert conn.info.get("query_started_at") == []
+
+
+def test_metrics_endpoint_aggregates_worker_files_in_multiprocess_mode(client, tmp_path, monkeypatch):
+    metrics_dir = tmp_path / "prometheus"
+    metrics_dir.mkdir()
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(metrics_dir))
+    for worker_pid in (101, 102):
+        value_class = MultiProcessValue(process_identifier=lambda pid=worker_pid: pid)
+        value = value_class("counter", "kos_taxi_worker_jobs", "kos_taxi_worker_jobs_total", (), (), "Jobs.")
+        value.inc(2)
+
+    payload = client.get("/metrics").data.decode("utf-8")
+
+    assert "kos_taxi_worker_jobs_total 4.0" in payload
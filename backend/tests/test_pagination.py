@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import inspect
+
+from src.models import db
+from src.models.driver import Driver
+from src.models.ride import Ride
+from src.services.pagination import paginate
+
+
+def _seed_drivers(count: int, same_timestamp: bool = False) -> None:
+    start = datetime(2025, 6, 1, 8, 0)
+    for index in range(count):
+        db.session.add(
+            Driver(
+                name=f"Driver {index}",
+                email=f"driver{index}@example.com",
+                phone="+30 2242 000000",
+                vehicle_model="Skoda Octavia",
+                vehicle_plate=f"KOS-{index:04d}",
+                password_hash="not-a-real-hash",
+                created_at=start if same_timestamp else start + timedelta(minutes=index),
+            )
+        )
+    db.session.commit()
+
+
+def test_drivers_are_walked_by_cursor_without_gaps_or_repeats(client, app):
+    _seed_drivers(5, same_timestamp=True)
+
+    seen, cursor = [], None
+    while True:
+        url = "/api/drivers?limit=2" + (f"&cursor={cursor}" if cursor else "")
+        body = client.get(url).get_json()
+        seen.extend(driver["id"] for driver in body["drivers"])
+        cursor = body["next_cursor"]
+        assert body["has_more"] is (cursor is not None)
+        if cursor is None:
+            break
+    assert seen == [5, 4, 3, 2, 1]
+
+    assert client.get("/api/drivers?cursor=garbage").status_code == 400
+    assert client.get("/api/drivers?limit=0").status_code == 400
+
+
+def test_undated_rows_are_paged_after_dated_ones(client, app):
+    _seed_drivers(5)
+    db.session.execute(Driver.__table__.update().where(Driver.id.in_([2, 4])).values(created_at=None))
+    db.session.commit()
+
+    seen, cursor = [], None
+    while True:
+        body = client.get("/api/drivers?limit=2" + (f"&cursor={cursor}" if cursor else "")).get_json()
+        seen.extend(driver["id"] for driver in body["drivers"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == [5, 3, 1, 4, 2]
+
+
+def test_users_keep_the_plain_list_unless_paging_is_requested(client, app):
+    from src.models.user import User
+
+    for index in range(3):
+        db.session.add(User(username=f"user{index}", email=f"user{index}@example.com"))
+    db.session.commit()
+
+    plain = client.get("/api/users").get_json()
+    assert [user["username"] for user in plain] == ["user0", "user1", "user2"]
+
+    page = client.get("/api/users?limit=2").get_json()
+    assert [user["username"] for user in page["users"]] == ["user2", "user1"]
+    assert page["has_more"] is True and page["limit"] == 2
+
+    default = client.get("/api/drivers").get_json()
+    assert default["limit"] == 100
+
+
+def test_fields_project_responses_and_load_only_requested_columns(client, app):
+    _seed_drivers(3)
+
+    body = client.get("/api/drivers?fields=name,vehicle_plate").get_json()
+    assert body["drivers"][0] == {"id": 3, "name": "Driver 2", "vehicle_plate": "KOS-0002"}
+    response = client.get("/api/drivers?fields=password_hash")
+    assert response.status_code == 400
+    assert "Unknown fields" in response.get_json()["error"]
+
+    db.session.expunge_all()
+    page = paginate([Driver.query], limit=2, fields=["id", "name"])
+    unloaded = inspect(page.items[0]).unloaded
+    assert {"email", "phone", "password_hash", "vehicle_model"} <= unloaded
+    assert "name" not in unloaded
+
+
+def test_driver_rides_relationship_is_paginated_as_a_query(client, app):
+    _seed_drivers(1)
+    driver = db.session.get(Driver, 1)
+    for index in range(3):
+        db.session.add(
+            Ride(
+                driver_id=driver.id,
+                pickup_address="Kos Town Square",
+                dest_address="Kos Airport",
+                fare=20.0 + index,
+                distance_km=24.0,
+                status="completed",
+            )
+        )
+    db.session.commit()
+    assert driver.rides.count() == 3
+
+    body = client.get("/api/drivers/1/rides?limit=2&fields=fare,dropoff_address").get_json()
+    assert body["rides"] == [
+        {"id": 3, "fare": 22.0, "dropoff_address": "Kos Airport"},
+        {"id": 2, "fare": 21.0, "dropoff_address": "Kos Airport"},
+    ]
+    rest = client.get(f"/api/drivers/1/rides?cursor={body['next_cursor']}").get_json()
+    assert [ride["id"] for ride in rest["rides"]] == [1]
+    assert rest["has_more"] is False
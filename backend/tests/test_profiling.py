@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import pstats
+import threading
+
+import pytest
+
+from src.app import create_app
+from src.config import Config
+from src.services.profiling import StackSampler, create_profile_token
+
+
+@pytest.fixture
+def profiled_client(tmp_path):
+    class ProfilingConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'test.db'}"
+        SENTRY_DSN = None
+        SCHEMA_AUTO_CREATE = True
+        PROFILING_ENABLED = True
+        PROFILE_DIR = str(tmp_path / "profiles")
+
+    app = create_app(ProfilingConfig)
+    return app, app.test_client()
+
+
+def test_signed_header_writes_pstats_for_that_request(profiled_client, tmp_path):
+    app, client = profiled_client
+
+    unprofiled = client.get("/api/rides/pending")
+    assert "X-Profile-Id" not in unprofiled.headers
+
+    forged = client.get("/api/rides/pending", headers={"X-Profile-Token": "profile.forged.sig"})
+    assert "X-Profile-Id" not in forged.headers
+
+    token = create_profile_token(app)
+    response = client.get("/api/rides/pending", headers={"X-Profile-Token": token})
+
+    profile_id = response.headers["X-Profile-Id"]
+    assert profile_id.startswith("ride-get_pending_rides-")
+    stats = pstats.Stats(str(tmp_path / "profiles" / f"{profile_id}.pstats"))
+    assert stats.total_calls > 0
+
+
+def test_stack_sampler_aggregates_collapsed_stacks_per_endpoint():
+    sampler = StackSampler(interval=1.0)
+    sampler.track(threading.get_ident(), "ride.estimate_ride")
+
+    sampler.sample_once()
+    sampler.sample_once()
+
+    collapsed = sampler.collapsed("ride.estimate_ride")
+    assert "test_stack_sampler_aggregates_collapsed_stacks_per_endpoint" in collapsed
+    assert collapsed.strip().endswith(" 2")
+    assert sampler.endpoints() == ["ride.estimate_ride"]
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from src.models import Payment, db
+from src.models.archive import ArchivedPayment, ArchivedRide
+from src.models.driver import Driver
+from src.models.ride import Ride
+from src.services.archive import archive_finished_rides
+from src.services.read_models import RideRow, driver_rows, payment_rows, ride_rows
+
+
+def _seed():
+    driver = Driver(
+        name="Nikos",
+        email="nikos@example.com",
+        phone="+302242000001",
+        vehicle_model="Toyota Corolla",
+        vehicle_plate="KOS-7777",
+        password_hash="not-a-real-hash",
+        last_login_at=datetime(2025, 7, 1, 9, 0),
+    )
+    db.session.add(driver)
+    db.session.flush()
+    for index, status in enumerate(("completed", "pending")):
+        ride = Ride(
+            pickup_address="Kos Port Ferry Terminal",
+            dest_address="Kos International Airport",
+            user_phone="+306900000000",
+            fare=41.7 + index,
+            distance_km=25.8,
+            estimated_duration_minutes=50,
+            status=status,
+            driver_id=driver.id,
+            scheduled_time=datetime(2025, 7, 14, 17, 45),
+            created_at=datetime(2025, 7, 14, 8, index),
+        )
+        if status == "completed":
+            ride.payment = Payment(
+                stripe_payment_intent_id="pi_123",
+                client_secret="pi_123_secret",
+                status="succeeded",
+                amount=4170,
+                metadata_json={"ride_id": 1},
+            )
+        db.session.add(ride)
+    db.session.commit()
+
+
+def test_read_models_serialise_exactly_like_the_models(app):
+    _seed()
+
+    def orm(query):
+        return [row.to_dict() for row in query.order_by(None).order_by("id")]
+
+    rides = ride_rows().order_by(Ride.id).all()
+    assert all(isinstance(ride, RideRow) and not hasattr(ride, "__dict__") for ride in rides)
+    assert [ride.to_dict() for ride in rides] == orm(Ride.query)
+    assert [row.to_dict() for row in driver_rows().all()] == orm(Driver.query)
+    assert [row.to_dict() for row in payment_rows().all()] == [
+        payment.to_dict(include_client_secret=False) for payment in Payment.query
+    ]
+    assert ride_rows().filter(Ride.status == "pending").all()[0].payment is None
+
+    archive_finished_rides(timedelta(days=1), pause_seconds=0, now=datetime(2100, 1, 1))
+    archived = ride_rows(ArchivedRide, ArchivedPayment).all()
+    assert [ride.to_dict() for ride in archived] == orm(ArchivedRide.query)
+    assert archived[0].payment.to_dict() == ArchivedPayment.query.one().to_dict()
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.app import create_app
+from src.config import Config
+from src.models import db
+from src.models.driver import Driver
+from src.services.read_replica import STICKY_COOKIE, sync_sqlite_replica
+
+
+@pytest.fixture
+def replica_app(tmp_path):
+    class ReplicaConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'primary.db'}"
+        DATABASE_REPLICA_URL = f"sqlite:///{tmp_path / 'replica.db'}"
+        REPLICA_STICKY_SECONDS = 30
+        STRIPE_SECRET_KEY = None
+        SENTRY_DSN = None
+
+    app = create_app(ReplicaConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+def _sync(app):
+    sync_sqlite_replica(app.config["SQLALCHEMY_DATABASE_URI"], app.config["DATABASE_REPLICA_URL"])
+
+
+def _add_driver(index: int) -> None:
+    db.session.add(Driver(
+        name=f"Driver {index}",
+        email=f"driver{index}@example.com",
+        phone="+302242000000",
+        vehicle_model="Skoda Octavia",
+        vehicle_plate=f"KOS-{index:04d}",
+        password_hash="not-a-real-hash",
+    ))
+    db.session.commit()
+
+
+def test_list_reads_use_the_replica_until_it_is_synced(replica_app):
+    client = replica_app.test_client()
+    _add_driver(1)
+    _sync(replica_app)
+    _add_driver(2)
+
+    assert [d["id"] for d in client.get("/api/drivers").get_json()["drivers"]] == [1]
+    assert client.get("/api/drivers/2").status_code == 200  # not opted in: primary
+
+    _sync(replica_app)
+    assert [d["id"] for d in client.get("/api/drivers").get_json()["drivers"]] == [2, 1]
+
+
+def test_writers_read_their_own_writes_from_the_primary(replica_app):
+    _sync(replica_app)
+    writer, other = replica_app.test_client(), replica_app.test_client()
+
+    created = writer.post("/api/rides", json={
+        "pickup_address": "Kos Town Square",
+        "dropoff_address": "Kos Airport",
+        "scheduled_time": (datetime.utcnow() + timedelta(minutes=10)).isoformat() + "Z",
+        "rider_email": "sticky@example.com",
+    })
+    assert created.status_code == 201
+    assert STICKY_COOKIE in created.headers["Set-Cookie"]
+    ride_id = created.get_json()["ride"]["id"]
+
+    assert [r["id"] for r in writer.get("/api/rides/pending").get_json()["rides"]] == [ride_id]
+    assert other.get("/api/rides/pending").get_json()["rides"] == []
+    assert "Set-Cookie" not in other.get("/api/rides/pending").headers
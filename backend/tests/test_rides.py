@@ -3,8 +3,8 @@ from __future__ import annotations
 from datetime import datetime, timedelta
 
 
-def _future_time() -> str:
-    return (datetime.utcnow() + timedelta(hours=1)).isoformat() + "Z"
+def _future_time(minutes: int = 10) -> str:
+    return (datetime.utcnow() + timedelta(minutes=minutes)).isoformat() + "Z"
 
 
 def test_ride_estimate_validates_required_fields(client):
@@ -53,3 +53,355 @@ def test_create_ride_returns_placeholder_payment_payload(client):
     assert payment["placeholder"] is True
     assert payment["message"].startswith("Stripe not configured")
     assert payment["payment_intent_id"].startswith("pi_")
+
+
+def test_ride_changes_feed_tails_lifecycle_events_by_cursor(client):
+    created = client.post(
+        "/api/rides",
+        json={
+            "pickup_address": "Kos Town Square",
+            "dropoff_address": "Tigaki Beach",
+            "scheduled_time": _future_time(),
+            "rider_email": "feed@example.com",
+        },
+    )
+    ride_id = created.get_json()["ride"]["id"]
+    assert client.post(f"/api/rides/{ride_id}/accept", json={"driver_id": 7}).status_code == 200
+    assert client.post(f"/api/rides/{ride_id}/complete").status_code == 200
+
+    first = client.get("/api/rides/changes?after=0&limit=2").get_json()
+    assert [event["event_type"] for event in first["events"]] == ["created", "accepted"]
+    assert first["events"][1]["driver_id"] == 7
+    assert first["has_more"] is True
+
+    second = client.get(f"/api/rides/changes?after={first['next_cursor']}").get_json()
+    assert [(event["from_status"], event["to_status"]) for event in second["events"]] == [("accepted", "completed")]
+    assert second["has_more"] is False
+
+    idle = client.get(f"/api/rides/changes?after={second['next_cursor']}").get_json()
+    assert idle["events"] == [] and idle["next_cursor"] == second["next_cursor"]
+    assert idle["gap"] is False
+
+    assert client.get("/api/rides/changes?after=abc").status_code == 400
+
+
+def test_feed_writers_are_serialised_on_postgresql():
+    from types import SimpleNamespace
+
+    from src.services.ride_events import FEED_LOCK_KEY, _lock_feed
+
+    executed = []
+
+    def connection(dialect):
+        def execute(statement, params):
+            executed.append((str(statement), params))
+
+        return SimpleNamespace(dialect=SimpleNamespace(name=dialect), execute=execute)
+
+    _lock_feed(connection("sqlite"))  # the single writer lock already orders commits
+    assert executed == []
+    _lock_feed(connection("postgresql"))
+    assert executed == [("SELECT pg_advisory_xact_lock(:key)", {"key": FEED_LOCK_KEY})]
+
+
+def test_admin_timeseries_reads_incremental_rollups(client, app):
+    from src.services.rollups import rebuild_rollups
+
+    ride_ids = []
+    for index in range(3):
+        response = client.post(
+            "/api/rides",
+            json={
+                "pickup_address": "Kos Town Square",
+                "dropoff_address": f"Kefalos Bay {index}",
+                "scheduled_time": _future_time(),
+                "rider_email": "rollup@example.com",
+            },
+        )
+        ride_ids.append(response.get_json()["ride"]["id"])
+    for ride_id in ride_ids[:2]:
+        client.post(f"/api/rides/{ride_id}/accept", json={"driver_id": 3})
+        client.post(f"/api/rides/{ride_id}/complete")
+    client.post(f"/api/rides/{ride_ids[2]}/cancel")
+
+    def latest(metric, bucket="hour"):
+        body = client.get(f"/api/admin/timeseries?metric={metric}&bucket={bucket}").get_json()
+        return body["points"][-1]["value"]
+
+    fares = [client.get(f"/api/rides/{ride_id}").get_json()["fare"] for ride_id in ride_ids[:2]]
+    incremental = {
+        metric: latest(metric)
+        for metric in ("rides_created", "rides_completed", "rides_cancelled", "revenue_eur", "driver_utilisation")
+    }
+    assert incremental["rides_created"] == 3
+    assert incremental["rides_completed"] == 2
+    assert incremental["rides_cancelled"] == 1
+    assert incremental["revenue_eur"] == round(sum(fares), 2)
+    assert 0 < incremental["driver_utilisation"] <= 1
+    assert latest("avg_fare", "day") == round(sum(fares) / 2, 2)
+
+    rebuild_rollups()
+    assert {metric: latest(metric) for metric in incremental} == incremental
+
+    assert client.get("/api/admin/timeseries?metric=nope").status_code == 400
+    assert client.get("/api/admin/timeseries?bucket=hour&from=2020-01-01T00:00:00Z").status_code == 400
+
+
+def test_prebooked_ride_is_held_until_release_time(client, app):
+    response = client.post(
+        "/api/rides",
+        json={
+            "pickup_address": "Kos International Airport",
+            "dropoff_address": "Kos Town Square",
+            "scheduled_time": _future_time(minutes=24 * 60),
+            "rider_phone": "+30 2242 000000",
+        },
+    )
+    ride = response.get_json()["ride"]
+    assert ride["status"] == "scheduled"
+    assert response.get_json()["estimate"]["surgeMultiplier"] == 1.0
+
+    pending_ids = [item["id"] for item in client.get("/api/rides/pending").get_json()["rides"]]
+    assert ride["id"] not in pending_ids
+    assert client.post(f"/api/rides/{ride['id']}/accept", json={"driver_id": 1}).status_code == 400
+
+    scheduler = app.extensions["ride_scheduler"]
+    assert scheduler.release_due() == []
+    released = scheduler.release_due(now=datetime.utcnow() + timedelta(hours=24))
+    assert released == [ride["id"]]
+    assert scheduler.release_due(now=datetime.utcnow() + timedelta(days=2)) == []
+
+    pending_ids = [item["id"] for item in client.get("/api/rides/pending").get_json()["rides"]]
+    assert ride["id"] in pending_ids
+    events = client.get("/api/rides/changes").get_json()["events"]
+    assert events[-1]["event_type"] == "released"
+
+
+def test_scheduler_reloads_scheduled_rides_and_skips_cancelled(client, app):
+    ids = []
+    for hours in (3, 5):
+        response = client.post(
+            "/api/rides",
+            json={
+                "pickup_address": "Kefalos Bay",
+                "dropoff_address": "Kos Town Square",
+                "scheduled_time": _future_time(minutes=hours * 60),
+                "rider_email": "later@example.com",
+            },
+        )
+        ids.append(response.get_json()["ride"]["id"])
+    client.post(f"/api/rides/{ids[0]}/cancel")
+
+    scheduler = app.extensions["ride_scheduler"]
+    scheduler._pid = None  # simulate a freshly forked worker
+    scheduler.ensure_started()
+    assert scheduler.pending_count() == 1
+    assert scheduler.release_due(now=datetime.utcnow() + timedelta(hours=6)) == [ids[1]]
+
+
+def test_archiving_moves_finished_rides_out_of_hot_tables(client, app):
+    from src.models.ride import Ride
+    from src.services.archive import archive_finished_rides
+
+    ids = []
+    for index in range(3):
+        response = client.post(
+            "/api/rides",
+            json={
+                "pickup_address": "Kos Town Square",
+                "dropoff_address": "Tigaki Beach",
+                "scheduled_time": _future_time(),
+                "rider_email": f"archive{index}@example.com",
+            },
+        )
+        ids.append(response.get_json()["ride"]["id"])
+    client.post(f"/api/rides/{ids[0]}/accept", json={"driver_id": 1})
+    client.post(f"/api/rides/{ids[0]}/complete")
+    client.post(f"/api/rides/{ids[1]}/cancel")
+
+    with app.app_context():
+        later = datetime.utcnow() + timedelta(seconds=1)
+        result = archive_finished_rides(timedelta(0), batch_size=1, pause_seconds=0, now=later)
+        assert (result.rides, result.payments, result.batches) == (2, 2, 2)
+        assert result.events >= 5
+        assert [ride.id for ride in Ride.query.all()] == [ids[2]]
+
+    assert client.get(f"/api/rides/{ids[0]}").status_code == 404
+    archived = client.get(f"/api/rides/{ids[0]}?include_archived=true").get_json()
+    assert archived["status"] == "completed"
+    assert archived["payment"]["payment_intent_id"].startswith("pi_")
+
+    overview = client.get("/api/admin/overview").get_json()
+    assert overview["totals"]["rides_total"] == 1
+    overview = client.get("/api/admin/overview?include_archived=true").get_json()
+    assert overview["totals"]["rides_total"] == 3
+    assert [ride["id"] for ride in overview["rides"]] == sorted(ids, reverse=True)
+
+    assert client.get("/api/rides/changes?after=0").get_json()["gap"] is True
+    with app.app_context():
+        from src.models.archive import ArchivedRideEvent
+
+        archived_through = max(event.id for event in ArchivedRideEvent.query)
+    assert client.get(f"/api/rides/changes?after={archived_through}").get_json()["gap"] is False
+
+
+def test_archived_ids_are_not_reused(client, app):
+    from src.services.archive import archive_finished_rides
+
+    booking = {
+        "pickup_address": "Kos Town Square",
+        "dropoff_address": "Tigaki Beach",
+        "scheduled_time": _future_time(),
+        "rider_email": "reuse@example.com",
+    }
+    ids = []
+    for _ in range(2):
+        ride_id = client.post("/api/rides", json=booking).get_json()["ride"]["id"]
+        client.post(f"/api/rides/{ride_id}/cancel")
+        with app.app_context():
+            later = datetime.utcnow() + timedelta(seconds=1)
+            assert archive_finished_rides(timedelta(0), pause_seconds=0, now=later).rides == 1
+        ids.append(ride_id)
+
+    assert ids[1] > ids[0]
+
+
+def test_legacy_tables_without_autoincrement_are_detected_and_rebuilt(client, app):
+    import pytest
+    from sqlalchemy import text
+    from sqlalchemy.schema import CreateTable
+
+    from src.models import db
+    from src.models.ride import Ride
+    from src.models.schema import missing_autoincrement
+    from src.services.archive import ArchiveCollisionError, archive_finished_rides
+
+    booking = {
+        "pickup_address": "Kos Town Square",
+        "dropoff_address": "Tigaki Beach",
+        "scheduled_time": _future_time(),
+        "rider_email": "legacy@example.com",
+    }
+    with app.app_context():
+        # The rides table as builds before sqlite_autoincrement created it.
+        legacy = str(CreateTable(Ride.__table__).compile(dialect=db.engine.dialect)).replace(" AUTOINCREMENT", "")
+        db.session.execute(text("DROP TABLE rides"))
+        db.session.execute(text(legacy))
+        db.session.commit()
+        assert missing_autoincrement() == ["rides"]
+
+    def book_and_archive() -> int:
+        ride_id = client.post("/api/rides", json=booking).get_json()["ride"]["id"]
+        client.post(f"/api/rides/{ride_id}/cancel")
+        with app.app_context():
+            archive_finished_rides(timedelta(0), pause_seconds=0, now=datetime.utcnow() + timedelta(seconds=1))
+        return ride_id
+
+    first = book_and_archive()
+    with pytest.raises(ArchiveCollisionError, match="--rebuild-autoincrement"):
+        book_and_archive()
+
+    result = app.test_cli_runner().invoke(args=["init-db", "--rebuild-autoincrement"])
+    assert result.exit_code == 0, result.output
+    assert "Rebuilt rides with AUTOINCREMENT" in result.output
+    with app.app_context():
+        assert missing_autoincrement() == []
+        assert [ride.id for ride in Ride.query] == [first]  # rows survive the rebuild
+    assert client.post("/api/rides", json=booking).get_json()["ride"]["id"] > first
+
+
+def test_booking_with_fare_quote_skips_reestimation(client, monkeypatch):
+    request = {
+        "pickup_address": "Kos Town Square",
+        "dropoff_address": "Kos Airport",
+        "scheduled_time": _future_time(),
+        "passenger_count": 2,
+    }
+    estimate = client.post("/api/rides/estimate", json=request).get_json()
+    assert estimate["quoteToken"] and estimate["quoteExpiresAt"]
+
+    import src.routes.ride as ride_routes
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("quoted bookings must not re-estimate")
+
+    monkeypatch.setattr(ride_routes, "estimate_distance_km", _fail)
+    booking = {**request, "rider_email": "quote@example.com", "quoteToken": estimate["quoteToken"]}
+    created = client.post("/api/rides", json=booking).get_json()
+    assert created["estimate"]["quoted"] is True
+    assert created["ride"]["fare"] == estimate["fare"]
+    assert created["ride"]["distance_km"] == estimate["distanceKm"]
+    monkeypatch.undo()
+
+    # A quote for other inputs, a tampered quote, or one priced before a pricing change is ignored.
+    for body in (
+        {**booking, "passenger_count": 3},
+        {**booking, "quoteToken": estimate["quoteToken"][:-2] + "xx"},
+    ):
+        assert client.post("/api/rides", json=body).get_json()["estimate"]["quoted"] is False
+    assert client.put("/api/pricing", json={"base_fare": 5.0}).status_code == 200
+    repriced = client.post("/api/rides", json=booking).get_json()
+    assert repriced["estimate"]["quoted"] is False
+    assert repriced["ride"]["fare"] == round(estimate["fare"] + 2.0, 2)
+
+
+def test_bulk_booking_shares_one_payment_and_reports_per_item(client, app):
+    from src.models import Payment
+    from src.models.booking_batch import BookingBatch
+    from src.models.ride import RideEvent
+    from src.services.rollups import rebuild_rollups
+
+    response = client.post(
+        "/api/rides/bulk",
+        json={
+            "partner": {"name": "Aegean Hotel", "email": "desk@aegean.example"},
+            "rides": [
+                {"pickup_address": "Aegean Hotel", "dropoff_address": "Kos Airport", "scheduled_time": _future_time()},
+                {"pickup_address": "", "dropoff_address": "Kos Airport", "scheduled_time": _future_time()},
+                {
+                    "pickup_address": "Aegean Hotel",
+                    "dropoff_address": "Kos Airport",
+                    "scheduled_time": _future_time(),
+                    "rider_email": "guest@example.com",
+                },
+            ],
+        },
+    )
+
+    assert response.status_code == 201
+    body = response.get_json()
+    assert (body["created"], body["failed"]) == (2, 1)
+    assert [result["ok"] for result in body["results"]] == [True, False, True]
+    assert "pickup_address" in body["results"][1]["errors"]
+
+    rides = [body["results"][index]["ride"] for index in (0, 2)]
+    assert rides[0]["user_email"] == "desk@aegean.example"
+    assert rides[1]["user_email"] == "guest@example.com"
+    batch = body["batch"]
+    assert batch["placeholder"] is True
+    assert batch["ride_count"] == 2
+    assert batch["amount"] == sum(round(ride["fare"] * 100) for ride in rides)
+    assert {ride["payment_intent_id"] for ride in rides} == {batch["payment_intent_id"]}
+
+    intent = client.post(f"/api/rides/{rides[0]['id']}/payment-intent")
+    assert intent.status_code == 200
+    assert intent.get_json()["payment_intent_id"] == batch["payment_intent_id"]
+    assert intent.get_json()["batch_id"] == batch["id"]
+    status = client.get(f"/api/rides/{rides[1]['id']}/payment-status").get_json()
+    assert status["batch"]["payment_intent_id"] == batch["payment_intent_id"]
+
+    with app.app_context():
+        assert BookingBatch.query.count() == 1
+        assert Payment.query.count() == 0  # no per-ride intent next to the batch's
+        assert RideEvent.query.filter(RideEvent.ride_id.in_([ride["id"] for ride in rides])).count() == 2
+
+    created = client.get("/api/admin/timeseries?metric=rides_created&bucket=hour").get_json()["points"][-1]["value"]
+    assert created == 2
+    with app.app_context():
+        rebuild_rollups()
+    assert client.get("/api/admin/timeseries?metric=rides_created&bucket=hour").get_json()["points"][-1]["value"] == 2
+
+    assert client.post("/api/rides/bulk", json={"rides": []}).status_code == 400
+    invalid_only = client.post("/api/rides/bulk", json={"rides": [{"pickup_address": "Kos Town"}]})
+    assert invalid_only.status_code == 400
+    assert invalid_only.get_json()["results"][0]["ok"] is False
@@ -0,0 +1,73 @@
+import pytest
+import requests
+
+from benchmarks.server_compare import free_port, launch_server, prefork_server_command
+from src.config import Config
+from src.models import db
+from src.models.schema import ensure_schema
+from src.serve import build_options, reinit_after_fork
+
+
+def test_build_options_prefers_overrides_and_selects_threaded_worker():
+    class ServeConfig(Config):
+        WEB_BIND = "0.0.0.0:8000"
+        WEB_CONCURRENCY = 3
+        WEB_THREADS = 1
+
+    options = build_options(ServeConfig)
+    assert options["workers"] == 3
+    assert options["worker_class"] == "sync"
+    assert options["preload_app"] is True
+
+    options = build_options(ServeConfig, bind="127.0.0.1:9000", workers=2, threads=4)
+    assert (options["bind"], options["workers"], options["worker_class"]) == ("127.0.0.1:9000", 2, "gthread")
+
+
+def test_reinit_after_fork_drops_inherited_connections(app):
+    with app.app_context():
+        db.session.execute(db.text("SELECT 1"))
+        db.session.remove()
+        assert db.engine.pool.checkedin() == 1
+
+    reinit_after_fork(app)
+
+    with app.app_context():
+        assert db.engine.pool.checkedin() == 0
+
+
+def test_reinit_after_fork_drops_inherited_replica_connections(app, tmp_path):
+    from sqlalchemy import create_engine, text
+
+    from src.models.session import REPLICA_EXTENSION
+
+    replica = app.extensions[REPLICA_EXTENSION] = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    with replica.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert replica.pool.checkedin() == 1
+
+    reinit_after_fork(app)
+
+    assert replica.pool.checkedin() == 0
+
+
+def test_prefork_server_serves_requests_from_preloaded_app(tmp_path):
+    pytest.importorskip("gunicorn")
+    from src.app import create_app
+
+    database_path = tmp_path / "serve.db"
+
+    class SeedConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{database_path}"
+        SENTRY_DSN = None
+
+    seed_app = create_app(SeedConfig)
+    with seed_app.app_context():
+        ensure_schema()
+        db.engine.dispose()
+
+    port = free_port()
+    command = prefork_server_command(port, workers=2, threads=2)
+    with launch_server(command, database_path, port, log_path=tmp_path / "serve.log") as base_url:
+        for _ in range(4):
+            assert requests.get(f"{base_url}/api/rides/pending", timeout=5).status_code == 200
+        assert "http_requests_total" in requests.get(f"{base_url}/metrics", timeout=5).text
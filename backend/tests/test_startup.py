@@ -0,0 +1,85 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from sqlalchemy import delete, text
+
+from src.app import create_app
+from src.config import Config
+from src.models import db
+from src.models.schema import SchemaVersion, schema_is_current
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+# ``import src.app`` takes about 0.8s on a laptop; the default leaves CI runners headroom.
+IMPORT_BUDGET_SECONDS = float(os.environ.get("IMPORT_TIME_BUDGET_SECONDS", "3.0"))
+
+
+def test_importing_the_app_defers_heavy_sdks():
+    probe = (
+        "import sys, src.app\n"
+        "eager = [name for name in ('sentry_sdk', 'alembic', 'flask_migrate', 'passlib') if name in sys.modules]\n"
+        "stripe = type(sys.modules.get('stripe')).__name__\n"
+        "print(','.join(eager) + '|' + stripe)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", probe], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    eager, stripe_type = result.stdout.strip().rsplit("|", 1)
+    assert eager == ""
+    assert stripe_type == "_LazyModule"
+
+
+def test_importing_the_app_stays_within_budget():
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src.app"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    )
+    # Lines read "import time: <self us> | <cumulative us> | <module>".
+    cumulative = next(
+        int(line.split("|")[1]) for line in result.stderr.splitlines() if line.split("|")[-1].strip() == "src.app"
+    )
+    assert cumulative / 1_000_000 <= IMPORT_BUDGET_SECONDS
+
+
+def test_schema_is_created_once_and_phases_are_timed(tmp_path):
+    class StartupConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'startup.db'}"
+        SENTRY_DSN = None
+        SCHEMA_AUTO_CREATE = False
+
+    app = create_app(StartupConfig)
+    with app.app_context():
+        assert not schema_is_current()
+
+    assert app.test_cli_runner().invoke(args=["init-db"]).exit_code == 0
+
+    app = create_app(StartupConfig)
+    with app.app_context():
+        assert schema_is_current()
+    timings = app.extensions["startup_timings"]
+    assert {"config", "extensions", "schema_check", "blueprints", "static_manifest"} <= set(timings)
+
+
+def test_init_db_refuses_to_record_a_version_over_drifted_tables(tmp_path):
+    class StartupConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'drift.db'}"
+        SENTRY_DSN = None
+        SCHEMA_AUTO_CREATE = False
+
+    app = create_app(StartupConfig)
+    runner = app.test_cli_runner()
+    assert runner.invoke(args=["init-db"]).exit_code == 0
+    with app.app_context():
+        # An older build's table: create_all would leave it as is.
+        db.session.execute(text("ALTER TABLE rides DROP COLUMN notes"))
+        db.session.execute(delete(SchemaVersion))
+        db.session.commit()
+
+    result = runner.invoke(args=["init-db"])
+    assert result.exit_code != 0
+    assert "rides.notes is missing" in result.output
+    with app.app_context():
+        assert not schema_is_current()
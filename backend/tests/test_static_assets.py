@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import gzip
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+from src.app import create_app
+from src.config import Config
+from src.services.static_assets import AssetManifest
+
+_BUNDLE = b"console.log('kos taxi');\n" * 400
+
+
+@pytest.fixture
+def static_client(tmp_path):
+    static_dir = tmp_path / "static"
+    (static_dir / "assets").mkdir(parents=True)
+    (static_dir / "index.html").write_text("<!doctype html><div id=root></div>" * 20)
+    bundle = static_dir / "assets" / "index-D8kQ2x_a.js"
+    bundle.write_bytes(_BUNDLE)
+    (static_dir / "assets" / "index-D8kQ2x_a.js.gz").write_bytes(gzip.compress(_BUNDLE))
+
+    class StaticConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'test.db'}"
+        SENTRY_DSN = None
+        SCHEMA_AUTO_CREATE = True
+        STATIC_FOLDER = str(static_dir)
+        STATIC_MEMORY_CACHE_MAX_BYTES = 1024
+
+    return create_app(StaticConfig).test_client()
+
+
+def test_fingerprinted_bundle_is_precompressed_and_immutable(static_client):
+    response = static_client.get("/assets/index-D8kQ2x_a.js", headers={"Accept-Encoding": "gzip, br"})
+
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "immutable" in response.headers["Cache-Control"]
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert gzip.decompress(response.data) == _BUNDLE
+
+    identity = static_client.get("/assets/index-D8kQ2x_a.js", headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in identity.headers
+    assert identity.data == _BUNDLE
+
+
+def test_index_uses_etag_revalidation_and_spa_fallback(static_client):
+    first = static_client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"] == "no-cache"
+    assert first.headers["Content-Encoding"] == "gzip"
+
+    revalidated = static_client.get("/", headers={"Accept-Encoding": "gzip", "If-None-Match": first.headers["ETag"]})
+    assert revalidated.status_code == 304
+    assert revalidated.data == b""
+
+    deep_link = static_client.get("/driver/dashboard")
+    assert deep_link.status_code == 200
+    assert b"<div id=root>" in deep_link.data
+
+
+def test_only_vite_hashed_assets_are_fingerprinted(tmp_path):
+    names = [
+        "assets/index-D8kQ2x_a.js",
+        "assets/logo-Ab3_9xYz.svg",
+        "apple-touch-icon.png",
+        "android-chrome-192x192.png",
+        "logo-original.svg",
+        "assets/vendor-chunk-longer-than-eight.js",
+    ]
+    for name in names:
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_bytes(b"x")
+
+    manifest = AssetManifest.build(tmp_path)
+
+    assert {name for name in names if manifest.get(name).fingerprinted} == {
+        "assets/index-D8kQ2x_a.js",
+        "assets/logo-Ab3_9xYz.svg",
+    }
+
+
+def _load_build_script():
+    script = Path(__file__).resolve().parents[1] / "scripts" / "build_static.py"
+    spec = importlib.util.spec_from_file_location("build_static", script)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_build_static_is_incremental_and_swaps_releases(tmp_path, monkeypatch):
+    build_static = _load_build_script()
+    dist = tmp_path / "dist"
+    (dist / "assets").mkdir(parents=True)
+    (dist / "index.html").write_text("<!doctype html><script src=/assets/app-Abc12345.js></script>" * 10)
+    (dist / "assets" / "app-Abc12345.js").write_bytes(_BUNDLE)
+    (dist / "assets" / "old-Zzz99999.css").write_text("body{}" * 100)
+    static_dir = tmp_path / "src" / "static"
+    monkeypatch.setattr(build_static, "DIST_DIR", dist)
+    monkeypatch.setattr(build_static, "STATIC_DIR", static_dir)
+    monkeypatch.setattr(build_static, "RELEASES_DIR", tmp_path / "src" / ".static-releases")
+
+    first = build_static.copy_assets(use_brotli=False)
+    first_release = static_dir.resolve()
+    assert first == {"files": 3, "changed": 3, "reused": 0, "deleted": 0, "pruned_releases": 0}
+    assert static_dir.is_symlink()
+    assert gzip.decompress((static_dir / "assets" / "app-Abc12345.js.gz").read_bytes()) == _BUNDLE
+
+    (dist / "assets" / "old-Zzz99999.css").unlink()
+    (dist / "index.html").write_text("<!doctype html><p>v2</p>" * 20)
+    second = build_static.copy_assets(use_brotli=False)
+
+    assert second["changed"] == 1
+    assert second["reused"] == 1
+    assert second["deleted"] == 1
+    assert static_dir.resolve() != first_release
+    assert first_release.exists(), "previous release is kept for servers still using it"
+    assert not (static_dir / "assets" / "old-Zzz99999.css").exists()
+
+    manifest = AssetManifest.build(static_dir)
+    assert set(manifest.assets) == {"index.html", "assets/app-Abc12345.js"}
+    assert "gzip" in manifest.get("assets/app-Abc12345.js").variants
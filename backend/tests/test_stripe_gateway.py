@@ -0,0 +1,81 @@
+import pytest
+import stripe
+
+from src.services.stripe_gateway import (
+    CircuitBreaker,
+    StripeGateway,
+    StripeGatewayError,
+    StripeUnavailable,
+)
+
+
+class _FakePaymentIntents:
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = []
+
+    def create(self, params, options=None):
+        self.calls.append(options)
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def _gateway(outcomes, *, max_retries=2, threshold=2, clock=None):
+    breaker = CircuitBreaker(threshold, 30.0, clock=clock or (lambda: 0.0))
+    gateway = StripeGateway("sk_test_123", max_retries=max_retries, backoff_seconds=0, breaker=breaker)
+    intents = _FakePaymentIntents(outcomes)
+    gateway._client = type("Client", (), {"v1": type("V1", (), {"payment_intents": intents})()})()
+    return gateway, intents
+
+
+def test_transient_failures_are_retried_with_one_idempotency_key():
+    gateway, intents = _gateway([stripe.APIConnectionError("reset"), {"id": "pi_1"}])
+
+    assert gateway.create_payment_intent({"amount": 100}) == {"id": "pi_1"}
+    assert len(intents.calls) == 2
+    assert intents.calls[0]["idempotency_key"] == intents.calls[1]["idempotency_key"]
+    assert gateway.breaker.state == "closed"
+
+
+def test_breaker_opens_after_consecutive_failures_and_recovers_after_reset():
+    now = [0.0]
+    failures = [stripe.APIError("down", http_status=503) for _ in range(2)]
+    gateway, intents = _gateway([*failures, {"id": "pi_2"}], max_retries=0, clock=lambda: now[0])
+
+    for _ in range(2):
+        with pytest.raises(StripeGatewayError):
+            gateway.create_payment_intent({"amount": 100})
+    assert gateway.breaker.state == "open"
+
+    with pytest.raises(StripeUnavailable):
+        gateway.create_payment_intent({"amount": 100})
+    assert len(intents.calls) == 2
+
+    now[0] = 31.0
+    assert gateway.breaker.state == "half_open"
+    assert gateway.create_payment_intent({"amount": 100}) == {"id": "pi_2"}
+    assert gateway.breaker.state == "closed"
+
+
+def test_card_errors_are_not_retried_and_do_not_trip_the_breaker():
+    declined = stripe.CardError("Your card was declined.", param=None, code="card_declined", http_status=402)
+    gateway, intents = _gateway([declined], threshold=1)
+
+    with pytest.raises(StripeGatewayError) as excinfo:
+        gateway.create_payment_intent({"amount": 100})
+    assert excinfo.value.user_message == "Your card was declined."
+    assert len(intents.calls) == 1
+    assert gateway.breaker.state == "closed"
+
+
+def test_webhook_rejects_bad_signature(client, app):
+    app.config["STRIPE_WEBHOOK_SECRET"] = "whsec_test"
+
+    response = client.post(
+        "/api/payments/webhook", data=b'{"type": "payment_intent.succeeded"}', headers={"Stripe-Signature": "t=1,v1=bad"}
+    )
+
+    assert response.status_code == 400
+    assert response.get_data(as_text=True) == "Invalid signature"
@@ -0,0 +1,114 @@
+import multiprocessing
+from datetime import datetime, timedelta
+
+from src.services.surge import (
+    RingBufferCounter,
+    SurgeEngine,
+    SurgeSettings,
+    zone_for_address,
+    zone_for_point,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_ring_buffer_counts_only_the_sliding_window():
+    buffer = memoryview(bytearray(8 * RingBufferCounter.size(4))).cast("d")
+    counter = RingBufferCounter(buffer, 0, slots=4, slot_seconds=10)
+
+    counter.add(100.0)
+    counter.add(105.0, 2)
+    counter.add(125.0)
+    assert counter.total(125.0) == 4
+    assert counter.total(141.0) == 1  # slot starting at 100 expired
+    assert counter.total(500.0) == 0
+
+
+def test_ferry_arrival_raises_multiplier_smoothly_and_decays():
+    clock = FakeClock()
+    engine = SurgeEngine(SurgeSettings(window_seconds=600, slot_seconds=30, max_multiplier=2.5), clock=clock)
+    zone = zone_for_address("Kos Port Ferry Terminal")
+    assert zone == "kos_town"
+    assert engine.multiplier(zone) == 1.0
+
+    for _ in range(40):  # ~2 available drivers in the window
+        engine.record_driver_available(zone_for_point(36.894, 27.289))
+    for _ in range(50):
+        engine.record_request(zone)
+
+    clock.now += 30
+    first = engine.multiplier(zone)
+    clock.now += 60
+    later = engine.multiplier(zone)
+    assert 1.0 < first < later <= 2.5
+    assert engine.multiplier("kefalos") == 1.0
+
+    clock.now += 3600
+    assert engine.multiplier(zone) == 1.0
+
+
+def test_estimate_applies_surge_multiplier(client, app):
+    payload = {
+        "pickup_address": "Kos Port Ferry Terminal",
+        "dropoff_address": "Kardamena Beach",
+        "scheduled_time": (datetime.utcnow() + timedelta(minutes=5)).isoformat() + "Z",
+    }
+    calm = client.post("/api/rides/estimate", json=payload).get_json()
+    assert calm["surgeMultiplier"] == 1.0
+
+    clock = FakeClock()
+    engine = app.extensions["surge_engine"] = SurgeEngine(SurgeSettings(), clock=clock)
+    for _ in range(20):  # one driver pinging throughout the window
+        engine.record_driver_available(zone_for_point(36.894, 27.289))
+    for _ in range(60):
+        engine.record_request("kos_town")
+    clock.now += 120
+
+    surged = client.post("/api/rides/estimate", json=payload).get_json()
+    assert surged["surgeMultiplier"] > 1.0
+    assert surged["fare"] > calm["fare"]
+    assert client.get("/api/pricing/surge").get_json()["zones"]["kos_town"]["requests_in_window"] == 60
+
+
+def test_no_surge_without_supply_signal_or_real_demand():
+    clock = FakeClock()
+    engine = SurgeEngine(SurgeSettings(), clock=clock)
+
+    for _ in range(4):  # a few bookings, no driver app pinging
+        engine.record_request("kos_town")
+        clock.now += 150
+        assert engine.multiplier("kos_town") == 1.0
+
+    for _ in range(60):  # busy, but still no supply signal
+        engine.record_request("kos_town")
+    clock.now += 60
+    assert engine.multiplier("kos_town") == 1.0
+
+    for _ in range(40):
+        engine.record_driver_available(zone_for_point(36.894, 27.289))
+    engine.record_request("airport")
+    clock.now += 60
+    assert engine.multiplier("kos_town") > 1.0
+    assert engine.multiplier("airport") == 1.0
+
+
+def test_counters_are_shared_with_forked_workers():
+    engine = SurgeEngine(SurgeSettings())
+
+    def worker() -> None:
+        for _ in range(5):
+            engine.record_request("airport")
+
+    processes = [multiprocessing.get_context("fork").Process(target=worker) for _ in range(2)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    assert engine.snapshot()["airport"]["requests_in_window"] == 10
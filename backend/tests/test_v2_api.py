@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+import msgpack
+
+from src.auth.jwt import create_token
+from src.models import db
+from src.models.driver import Driver
+from src.models.ride import Ride
+from src.services.compact import PAYMENT_STATUS_CODES, RIDE_STATUS_CODES
+
+
+def _seed():
+    driver = Driver(
+        name="Nikos",
+        email="nikos@example.com",
+        phone="+302242000001",
+        vehicle_model="Toyota Corolla",
+        vehicle_plate="KOS-7777",
+        password_hash="not-a-real-hash",
+    )
+    db.session.add(driver)
+    db.session.flush()
+    ride = Ride(
+        pickup_address="Kos Port Ferry Terminal",
+        dest_address="Kos International Airport",
+        user_phone="+306900000000",
+        fare=41.7,
+        distance_km=25.8,
+        estimated_duration_minutes=50,
+        passenger_count=3,
+        status="accepted",
+        driver_id=driver.id,
+        payment_status="pending",
+        scheduled_time=datetime(2025, 7, 14, 17, 45),
+    )
+    db.session.add(ride)
+    db.session.commit()
+    return driver, ride
+
+
+def test_v2_ride_is_compact_and_uses_integer_enums(client, app):
+    _, ride = _seed()
+
+    body = client.get(f"/api/v2/rides/{ride.id}").get_json()
+    assert body["status"] == RIDE_STATUS_CODES["accepted"]
+    assert body["payment"] == PAYMENT_STATUS_CODES["pending"]
+    assert body["dropoff"] == "Kos International Airport"
+    assert body["scheduled_at"] == 1752515100
+    assert "notes" not in body and "dest_address" not in body
+    assert len(body) <= len(client.get(f"/api/rides/{ride.id}").get_json()) / 2
+
+    enums = client.get("/api/v2/enums").get_json()
+    assert enums["ride_status"]["accepted"] == body["status"]
+    assert client.get("/api/v2/rides/999").status_code == 404
+
+
+def test_v2_negotiates_msgpack_from_accept_header(client, app):
+    driver, ride = _seed()
+    headers = {
+        "Authorization": f"Bearer {create_token(driver.id, 'access', 900)}",
+        "Accept": "application/msgpack",
+    }
+
+    response = client.get("/api/v2/drivers/me/assigned-rides", headers=headers)
+    assert response.status_code == 200
+    assert response.mimetype == "application/msgpack"
+    assert "Accept" in response.headers["Vary"]
+    payload = msgpack.unpackb(response.data)
+    assert [item["id"] for item in payload["rides"]] == [ride.id]
+    assert payload["has_more"] is False
+
+    json_response = client.get("/api/v2/drivers/me/assigned-rides?status=completed", headers={
+        "Authorization": headers["Authorization"],
+        "Accept": "application/msgpack;q=0.5, application/json",
+    })
+    assert json_response.mimetype == "application/json"
+    assert json_response.get_json()["rides"] == []
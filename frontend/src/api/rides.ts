@@ -16,6 +16,8 @@ export interface RideEstimateResponse {
   distanceKm: number
   durationMinutes: number
   fare: number
+  quoteToken?: string
+  quoteExpiresAt?: string
 }
 
 export interface CreateRidePayload extends RideEstimatePayload {
@@ -23,6 +25,7 @@ export interface CreateRidePayload extends RideEstimatePayload {
   riderEmail: string
   riderPhone: string
   notes?: string
+  quoteToken?: string
 }
 
 export type RideDto = Ride
@@ -81,10 +81,11 @@ const RiderView = ({ onSubmitting, onRideCreated, onError }: RiderViewProps) =>
         passengerCount: values.passengerCount,
       }
 
-      await estimateRide(estimatePayload)
+      const estimate = await estimateRide(estimatePayload)
 
       const rideResponse = await createRide({
         ...estimatePayload,
+        quoteToken: estimate.quoteToken,
         riderName: values.riderName,
         riderEmail: values.riderEmail,
         riderPhone: values.riderPhone,
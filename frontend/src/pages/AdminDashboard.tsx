@@ -6,7 +6,7 @@ import { fetchAdminOverview, type AdminOverviewResponse } from '../api/admin'
 import { normaliseError } from '../api/rides'
 import { PaymentStatusBadge } from '../components/Payments'
 
-const rideStatuses = ['all', 'pending', 'accepted', 'in_progress', 'completed', 'cancelled'] as const
+const rideStatuses = ['all', 'scheduled', 'pending', 'accepted', 'in_progress', 'completed', 'cancelled'] as const
 const paymentStatuses = ['all', 'requires_payment_method', 'processing', 'succeeded', 'payment_failed', 'canceled', 'unpaid'] as const
 
 const formatDateTime = (value: string | null) => (value ? new Date(value).toLocaleString() : '—')
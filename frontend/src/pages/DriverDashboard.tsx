@@ -23,6 +23,7 @@ import {
 import { Ride, RideStatus } from '../types/ride'
 
 const statusColours: Record<RideStatus, string> = {
+  scheduled: 'bg-slate-500/20 text-slate-200 border-slate-300/30',
   pending: 'bg-yellow-500/20 text-yellow-200 border-yellow-300/30',
   accepted: 'bg-blue-500/20 text-blue-200 border-blue-300/30',
   in_progress: 'bg-indigo-500/20 text-indigo-200 border-indigo-300/30',
@@ -1,6 +1,6 @@
 import type { PaymentSummary } from './payment'
 
-export type RideStatus = 'pending' | 'accepted' | 'in_progress' | 'completed' | 'cancelled'
+export type RideStatus = 'scheduled' | 'pending' | 'accepted' | 'in_progress' | 'completed' | 'cancelled'
 
 export interface Ride {
   id: number